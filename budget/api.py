@@ -0,0 +1,232 @@
+"""
+Versioned JSON API for integrations (/api/v1/).
+
+Each resource is a list endpoint for the logged-in user's rows:
+
+    GET /api/v1/categories/?fields=name,amount&include=payments&limit=50
+    GET /api/v1/categories/?cursor=<next_cursor of the previous page>
+    GET /api/v1/payments/?ids=4,8,15
+
+fields= picks the columns to return (id is always included), include=
+embeds related rows, and ids= fetches up to API_MAX_IDS rows by id in one
+request instead of one request per row. Lists are keyset-paginated (see
+budget/pagination.py) and return next_cursor until the last page. Money
+is sent as a decimal string ("1500.00"), as DjangoJSONEncoder does, so
+integrations get the exact amount.
+
+Embedded rows are loaded with select_related() (one row) or one
+prefetch_related() query (many rows), never a query per row, and every
+endpoint declares its query budget (see budget/querybudget.py).
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import Prefetch
+from django.views.decorators.http import require_GET
+
+from .models import Category, MonthlyBudget, Payment, Transaction
+from .pagination import InvalidCursor, keyset_page
+from .querybudget import query_budget
+from .responses import FastJsonResponse
+from .routers import read_from_replica
+from .views import redirect_staff_to_admin, user_data_conditional
+
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+API_MAX_IDS = 100
+
+CATEGORY_FIELDS = [
+    'id', 'name', 'amount', 'original_amount', 'due_date', 'category_type', 'is_active', 'is_monthly',
+    'payment_status', 'payment_date', 'paid_to_date', 'payment_count', 'last_payment_date',
+    'gcash_number', 'category_id', 'created_at', 'updated_at',
+]
+PAYMENT_FIELDS = [
+    'id', 'category_id', 'amount_paid', 'payment_date', 'status', 'payment_method', 'payment_type',
+    'transaction_id', 'gcash_account_used', 'notes', 'created_at', 'updated_at',
+]
+TRANSACTION_FIELDS = [
+    'id', 'title', 'amount', 'transaction_type', 'category_id', 'date', 'description', 'created_at', 'updated_at',
+]
+BUDGET_FIELDS = ['id', 'month', 'total_budget', 'created_at', 'updated_at']
+BUDGET_HISTORY_FIELDS = ['id', 'budget_id', 'amount_added', 'added_at', 'notes']
+
+# includes maps an include= name to (model relation, fields of the embedded rows)
+Resource = namedtuple('Resource', ['model', 'owner', 'fields', 'ordering', 'includes'])
+
+API_RESOURCES = {
+    'categories': Resource(
+        Category, 'user', CATEGORY_FIELDS, ['due_date', 'id'],
+        {'payments': ('payment', PAYMENT_FIELDS)}
+    ),
+    'payments': Resource(
+        Payment, 'category__user', PAYMENT_FIELDS, ['-payment_date', '-id'],
+        {'category': ('category', CATEGORY_FIELDS)}
+    ),
+    'transactions': Resource(
+        Transaction, 'user', TRANSACTION_FIELDS, ['-date', '-id'],
+        {'category': ('category', CATEGORY_FIELDS)}
+    ),
+    'budgets': Resource(
+        MonthlyBudget, 'user', BUDGET_FIELDS, ['-month', '-id'],
+        {'history': ('history', BUDGET_HISTORY_FIELDS)}
+    ),
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+
+def _requested_fields(resource, value):
+    fields = _split(value)
+    unknown = [field for field in fields if field not in resource.fields]
+    if unknown:
+        raise BadRequest(f'Unknown field: {", ".join(unknown)}')
+    if not fields:
+        return resource.fields
+    return ['id'] + [field for field in fields if field != 'id']
+
+
+def _requested_includes(resource, value):
+    includes = _split(value)
+    unknown = [name for name in includes if name not in resource.includes]
+    if unknown:
+        raise BadRequest(f'Unknown include: {", ".join(unknown)}')
+    return list(dict.fromkeys(includes))
+
+
+def _requested_ids(value):
+    try:
+        ids = [int(item) for item in _split(value)]
+    except ValueError:
+        raise BadRequest('ids must be a comma-separated list of numbers') from None
+    if len(ids) > API_MAX_IDS:
+        raise BadRequest(f'At most {API_MAX_IDS} ids can be fetched at once')
+    return list(dict.fromkeys(ids))
+
+
+def _page_size(value):
+    if not value:
+        return API_PAGE_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        raise BadRequest('limit must be a number') from None
+    return min(max(size, 1), API_MAX_PAGE_SIZE)
+
+
+def _queryset(resource, user, fields, includes):
+    """The resource's rows with only the columns and relations asked for"""
+    queryset = resource.model.objects.filter(**{resource.owner: user})
+    load = set(fields) | {name.lstrip('-') for name in resource.ordering}
+    for name in includes:
+        relation, related_fields = resource.includes[name]
+        field = resource.model._meta.get_field(relation)
+        if field.many_to_one:
+            queryset = queryset.select_related(relation)
+            load.update(f'{relation}__{related}' for related in related_fields)
+        else:
+            related = field.related_model.objects.only(*related_fields, field.field.attname)
+            if not field.related_model._meta.ordering:
+                related = related.order_by('id')
+            queryset = queryset.prefetch_related(Prefetch(field.get_accessor_name(), queryset=related))
+    return queryset.only(*load)
+
+
+def _values(obj, fields):
+    data = {}
+    for field in fields:
+        value = getattr(obj, field)
+        data[field] = str(value) if isinstance(value, Decimal) else value
+    return data
+
+
+def _serialize(resource, obj, fields, includes):
+    data = _values(obj, fields)
+    for name in includes:
+        relation, related_fields = resource.includes[name]
+        field = resource.model._meta.get_field(relation)
+        if field.many_to_one:
+            related = getattr(obj, relation)
+            data[name] = _values(related, related_fields) if related else None
+        else:
+            data[name] = [_values(related, related_fields) for related in getattr(obj, field.get_accessor_name()).all()]
+    return data
+
+
+def resource_list(request, name):
+    resource = API_RESOURCES[name]
+    try:
+        fields = _requested_fields(resource, request.GET.get('fields'))
+        includes = _requested_includes(resource, request.GET.get('include'))
+        ids = _requested_ids(request.GET.get('ids'))
+        page_size = _page_size(request.GET.get('limit'))
+    except BadRequest as exc:
+        return FastJsonResponse({'error': str(exc)}, status=400)
+
+    queryset = _queryset(resource, request.user, fields, includes)
+    if ids:
+        # Bulk fetch: rows come back in the order asked for
+        found = queryset.in_bulk(ids)
+        return FastJsonResponse({
+            'results': [_serialize(resource, found[pk], fields, includes) for pk in ids if pk in found],
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+    try:
+        items, next_cursor = keyset_page(queryset, resource.ordering, request.GET.get('cursor'), page_size)
+    except InvalidCursor:
+        return FastJsonResponse({'error': 'Invalid cursor'}, status=400)
+    return FastJsonResponse({
+        'results': [_serialize(resource, item, fields, includes) for item in items],
+        'next_cursor': next_cursor,
+    })
+
+
+@require_GET
+@login_required
+@redirect_staff_to_admin
+@user_data_conditional
+@read_from_replica
+@query_budget(2)
+def categories(request):
+    """Bills; include=payments adds each bill's payments"""
+    return resource_list(request, 'categories')
+
+
+@require_GET
+@login_required
+@redirect_staff_to_admin
+@user_data_conditional
+@read_from_replica
+@query_budget(1)
+def payments(request):
+    """Recorded payments, newest first; include=category adds the bill"""
+    return resource_list(request, 'payments')
+
+
+@require_GET
+@login_required
+@redirect_staff_to_admin
+@user_data_conditional
+@read_from_replica
+@query_budget(1)
+def transactions(request):
+    """Income and expenses, newest first; include=category adds the bill"""
+    return resource_list(request, 'transactions')
+
+
+@require_GET
+@login_required
+@redirect_staff_to_admin
+@user_data_conditional
+@read_from_replica
+@query_budget(2)
+def budgets(request):
+    """Monthly budgets, newest first; include=history adds the budget additions"""
+    return resource_list(request, 'budgets')
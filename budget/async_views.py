@@ -0,0 +1,186 @@
+"""
+Async versions of the read-only JSON endpoints, used under ASGI.
+
+Under an ASGI server a sync view holds a worker thread for the whole
+request, and the home page fires several of these fetches at once. These
+views share their queries and response building with the sync views in
+budget/views.py. Queries that don't depend on each other run concurrently
+with asyncio.gather().
+
+budget/urls.py routes the endpoints here when ASYNC_VIEWS is on, which
+payflow/asgi.py does by default. Under WSGI every async view would need its
+own event loop, so the sync views stay the default there.
+
+live_events keeps a server-sent events stream open for the notification
+bell and budget tiles. The stream does not touch the database while nothing
+changes: every few seconds it compares the user's data version and today's
+date (a cache read) with what it sent last.
+"""
+import asyncio
+from calendar import month_name
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.db import connections
+from django.db.models import Sum
+from django.shortcuts import redirect
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_data_version
+from .responses import FastJsonResponse
+from .routers import read_from_replica
+from .views import (
+    JSON_CACHE_MAX_AGE, LIVE_HEARTBEAT_SECONDS, LIVE_POLL_SECONDS, LIVE_RETRY_MS, LIVE_STREAM_SECONDS,
+    _user_data_etag, _user_data_last_modified, live_event_id, live_events_response, live_last_event_id, live_state,
+    month_transactions_queries, monthly_overview_data, monthly_overview_queries, overview_months,
+    parse_month_key, search_suggestion_queries, search_suggestions_data, sse_message,
+    unpaid_bills_data, unpaid_bills_queryset,
+)
+
+
+async def _list(queryset):
+    return [item async for item in queryset]
+
+
+def login_required(view_func):
+    """Async login_required that also sends staff to the admin dashboard.
+
+    request.user is loaded once in a thread (Django 4.2 has no
+    request.auser()); the lazy object keeps it, so the view and the
+    decorators inside it never trigger a sync lookup.
+    """
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        if not await sync_to_async(lambda: request.user.is_authenticated)():
+            return redirect_to_login(request.get_full_path())
+        if request.user.is_staff:
+            return redirect('admin_dashboard')
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+def user_data_conditional(view_func):
+    """Async counterpart of budget.views.user_data_conditional"""
+    def _validators(request, *args, **kwargs):
+        last_modified = _user_data_last_modified(request, *args, **kwargs)
+        return quote_etag(_user_data_etag(request, *args, **kwargs)), int(last_modified.timestamp())
+
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        etag, last_modified = await sync_to_async(_validators)(request, *args, **kwargs)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await view_func(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            if not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(last_modified)
+            if not response.has_header('ETag'):
+                response.headers['ETag'] = etag
+        version = await sync_to_async(get_data_version)(request.user.pk)
+        current = request.GET.get('v') == str(version)
+        patch_cache_control(response, private=True, max_age=JSON_CACHE_MAX_AGE if current else 0)
+        patch_vary_headers(response, ['Cookie'])
+        return response
+    return _wrapped_view
+
+
+@login_required
+@user_data_conditional
+@read_from_replica
+async def monthly_overview(request):
+    """API endpoint to get monthly overview data for the last 12 months"""
+    months = overview_months(timezone.now().date())
+    budgets, totals = monthly_overview_queries(request.user, months)
+    budgets, totals = await asyncio.gather(_list(budgets), _list(totals))
+    return FastJsonResponse(monthly_overview_data(months, budgets, totals))
+
+
+@login_required
+@user_data_conditional
+@read_from_replica
+async def month_transactions(request, month_key):
+    """API endpoint to get transactions for a specific month"""
+    try:
+        month_date, end_date = parse_month_key(month_key)
+    except (ValueError, IndexError):
+        return FastJsonResponse({'error': 'Invalid month format'}, status=400)
+
+    budget, history, expenses, transactions = month_transactions_queries(request.user, month_date, end_date)
+    budget, history, expenses, transactions = await asyncio.gather(
+        budget.afirst(), _list(history), expenses.aaggregate(total=Sum('amount')), _list(transactions)
+    )
+    return FastJsonResponse({
+        'month_name': month_name[month_date.month] + ' ' + str(month_date.year),
+        'budget': budget or 0,
+        'expenses': expenses['total'] or 0,
+        'transactions': transactions,
+        'budget_history': history
+    })
+
+
+@login_required
+@user_data_conditional
+async def unpaid_bills(request, month):
+    """API endpoint to get unpaid bills for a specific month"""
+    month_num = int(month)
+    if month_num < 1 or month_num > 12:
+        return FastJsonResponse({'error': 'Invalid month'}, status=400)
+    categories = await _list(unpaid_bills_queryset(request.user, month_num))
+    return FastJsonResponse(unpaid_bills_data(month_num, categories))
+
+
+@login_required
+@read_from_replica
+async def search_suggestions(request):
+    """API endpoint for search suggestions"""
+    query = request.GET.get('q', '').strip().lower()
+    if not query:
+        return FastJsonResponse({'results': []})
+
+    categories, transactions, payments, date_categories, month_counts, type_counts = search_suggestion_queries(request.user, query)
+    counts = [queryset.acount() for _, queryset in month_counts + type_counts]
+    categories, transactions, payments, date_categories, *counts = await asyncio.gather(
+        _list(categories), _list(transactions), _list(payments), _list(date_categories), *counts
+    )
+    return FastJsonResponse(search_suggestions_data(
+        query, categories, transactions, payments, date_categories,
+        [(i, count) for (i, _), count in zip(month_counts, counts)],
+        [(cat_type, count) for (cat_type, _), count in zip(type_counts, counts[len(month_counts):])]
+    ))
+
+
+def _live_snapshot(user):
+    try:
+        return live_state(user)
+    finally:
+        # Don't keep a database connection for the life of the stream
+        connections.close_all()
+
+
+async def _live_stream(user, last_event_id):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LIVE_STREAM_SECONDS
+    yield sse_message(retry=LIVE_RETRY_MS)
+    last_sent = loop.time()
+    while loop.time() < deadline:
+        event_id = await sync_to_async(live_event_id)(user.pk)
+        if event_id != last_event_id:
+            state = await sync_to_async(_live_snapshot)(user)
+            yield sse_message(state, event_id)
+            last_event_id, last_sent = event_id, loop.time()
+        elif loop.time() - last_sent >= LIVE_HEARTBEAT_SECONDS:
+            # Comment line so proxies don't time out an idle stream
+            yield b': keep-alive\n\n'
+            last_sent = loop.time()
+        await asyncio.sleep(LIVE_POLL_SECONDS)
+    # Ending after LIVE_STREAM_SECONDS bounds streams whose client went away
+    # unnoticed; EventSource reconnects with Last-Event-ID
+
+
+@login_required
+async def live_events(request):
+    """Live notification and budget updates as server-sent events"""
+    return live_events_response(_live_stream(request.user, live_last_event_id(request)))
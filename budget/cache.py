@@ -0,0 +1,129 @@
+"""
+Per-user data versioning for cached results.
+
+Every user has a version number that changes whenever one of their rows
+changes (see budget/signals.py). Cached results are keyed by that version,
+so a change simply makes the old entries unreachable and they expire on
+their own - nothing ever has to be flushed by hand.
+
+The version is a counter that starts at the clock (in microseconds) and
+is raised with cache.incr(), so two changes committed at the same moment
+in different workers still get different versions. If the cache evicts the
+counter it is recreated from the clock, which is newer than any version
+handed out before (no user changes data a million times a second), so
+stale entries can never come back. The time of the
+last change is kept next to it for Last-Modified.
+
+Queryset update(), bulk_create() and bulk_update() do not send model
+signals; code that uses them must call bump_data_version_on_commit().
+"""
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+_MISSING = object()
+
+
+def _version_key(user_id):
+    return f'payflow:data-version:{user_id}'
+
+
+def _modified_key(user_id):
+    return f'payflow:data-modified:{user_id}'
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def _now_us():
+    return time.time_ns() // 1000
+
+
+def _get_or_start(key, clock):
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, clock(), timeout=None)
+        value = cache.get(key) or clock()
+    return value
+
+
+def get_data_version(user_id):
+    """Return the current data version for a user"""
+    return _get_or_start(_version_key(user_id), _now_us)
+
+
+def get_data_last_modified(user_id):
+    """When the user's data last changed, as an aware UTC datetime.
+
+    Unknown (e.g. evicted) counts as now.
+    """
+    return datetime.fromtimestamp(_get_or_start(_modified_key(user_id), _now_ms) / 1000, tz=dt_timezone.utc)
+
+
+def bump_data_version(user_id):
+    """Move a user to a new data version, invalidating their cached results"""
+    # The time goes first: a reader that sees the new version must not see
+    # the old time
+    cache.set(_modified_key(user_id), _now_ms(), timeout=None)
+    key = _version_key(user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # No counter yet; whoever adds it first starts it from the clock
+        if cache.add(key, _now_us(), timeout=None):
+            return cache.get(key)
+        return cache.incr(key)
+
+
+def bump_data_version_on_commit(user_id):
+    """Bump the version once the current transaction commits.
+
+    Bumping before the commit would let a concurrent request cache the
+    not-yet-committed (old) data under the new version.
+    """
+    if user_id is not None:
+        transaction.on_commit(lambda: bump_data_version(user_id))
+
+
+def cached_per_user(ttl=300):
+    """Memoize a view or service function per user and data version.
+
+    The first argument may be a request (views) or a user (services). Keys
+    also include today's date, because due-soon/overdue state and the
+    current month change with the calendar, not only with the data. Only
+    GET/HEAD requests are cached; anything else always runs the function.
+    """
+    def decorator(func):
+        prefix = f'payflow:cached:{func.__module__}.{func.__qualname__}'
+
+        @wraps(func)
+        def wrapper(subject, *args, **kwargs):
+            user = getattr(subject, 'user', subject)
+            if not getattr(user, 'is_authenticated', False):
+                return func(subject, *args, **kwargs)
+
+            parts = [str(user.pk), str(get_data_version(user.pk)), timezone.localdate().isoformat()]
+            if hasattr(subject, 'get_full_path'):
+                if subject.method not in ('GET', 'HEAD'):
+                    return func(subject, *args, **kwargs)
+                parts.append(subject.get_full_path())
+            parts.append(repr(args))
+            parts.append(repr(sorted(kwargs.items())))
+            digest = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+            key = f'{prefix}:{user.pk}:{digest}'
+
+            result = cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = func(subject, *args, **kwargs)
+                cache.set(key, result, ttl)
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
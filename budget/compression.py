@@ -0,0 +1,110 @@
+"""
+Compression and minification of dynamic responses.
+
+Used by budget.middleware.CompressionMiddleware and the bench_compression
+command. Static files are compressed ahead of time by WhiteNoise instead.
+
+Brotli needs the optional Brotli package; without it everything falls back
+to gzip. Brotli runs at a low quality (BROTLI_QUALITY) because responses
+are compressed on every request, where the top levels cost far more CPU
+than the few bytes they save.
+"""
+import re
+import secrets
+
+from django.conf import settings
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_BROTLI_QUALITY = 5
+
+# Random bytes added to gzip output, as Django's GZipMiddleware does, to
+# make BREACH-style length attacks impractical
+GZIP_MAX_RANDOM_BYTES = 100
+# Brotli has no header field to pad, so brotli HTML (which carries CSRF
+# tokens next to reflected input) ends with an HTML comment of random
+# length and content instead. JSON is not padded.
+BROTLI_MAX_RANDOM_BYTES = 100
+
+# Blocks whose whitespace is significant or that contain code
+PROTECTED_RE = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.S | re.I)
+COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.S)
+LEADING_WHITESPACE_RE = re.compile(r'\n[ \t]+')
+BLANK_LINES_RE = re.compile(r'\n{2,}')
+
+
+def accepted_encoding(accept_encoding):
+    """Pick 'br', 'gzip' or None from an Accept-Encoding header"""
+    accepted = {}
+    for part in (accept_encoding or '').lower().split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', accepted.get('*', 0)) > 0:
+        return 'gzip'
+    return None
+
+
+def minify_html(html):
+    """Remove comments, indentation and blank lines from rendered HTML.
+
+    Only whitespace at the start of a line is removed, and a line break is
+    always kept, so text never runs together. <pre>, <textarea>, <script>
+    and <style> blocks are left exactly as they are.
+    """
+    parts = PROTECTED_RE.split(html)
+    # split() yields text, protected block, tag name, text, ...
+    out = []
+    for index in range(0, len(parts), 3):
+        text = COMMENT_RE.sub('', parts[index])
+        text = LEADING_WHITESPACE_RE.sub('\n', text)
+        out.append(BLANK_LINES_RE.sub('\n', text))
+        if index + 1 < len(parts):
+            out.append(parts[index + 1])
+    return ''.join(out)
+
+
+def _brotli_quality():
+    return getattr(settings, 'BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY)
+
+
+def _random_comment():
+    length = secrets.randbelow(BROTLI_MAX_RANDOM_BYTES + 1)
+    return b'<!--' + secrets.token_hex(BROTLI_MAX_RANDOM_BYTES // 2 + 1)[:length].encode() + b'-->'
+
+
+def compress(data, encoding, html=False):
+    if encoding == 'br':
+        if html:
+            data += _random_comment()
+        return brotli.compress(data, quality=_brotli_quality())
+    return compress_string(data, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def compress_stream(chunks, encoding, html=False):
+    """Compress an iterator of chunks, flushing after each one"""
+    if encoding == 'gzip':
+        return compress_sequence(chunks, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+    return _brotli_stream(chunks, html)
+
+
+def _brotli_stream(chunks, html=False):
+    compressor = brotli.Compressor(quality=_brotli_quality())
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    tail = compressor.process(_random_comment()) if html else b''
+    yield tail + compressor.finish()
@@ -20,7 +20,24 @@ class UserRegistrationForm(UserCreationForm):
         model = User
         fields = ('username', 'first_name', 'last_name', 'password1', 'password2')
 
-class UserProfileForm(forms.ModelForm):
+class RejectedUploadsMixin:
+    """Show uploads refused by the upload handler as field errors.
+
+    Refused files never reach request.FILES (see budget/uploadhandlers.py),
+    so pass rejected_uploads=getattr(request, 'rejected_uploads', None).
+    """
+    def __init__(self, *args, rejected_uploads=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rejected_uploads = rejected_uploads or {}
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field, message in self.rejected_uploads.items():
+            if field in self.fields:
+                self.add_error(field, message)
+        return cleaned_data
+
+class UserProfileForm(RejectedUploadsMixin, forms.ModelForm):
     username = forms.CharField(
         max_length=150,
         required=True,
@@ -129,7 +146,7 @@ class CategoryEditForm(forms.ModelForm):
             'is_monthly': 'Automatically remind every month',
         }
 
-class PaymentForm(forms.ModelForm):
+class PaymentForm(RejectedUploadsMixin, forms.ModelForm):
     class Meta:
         model = Payment
         fields = ['payment_type', 'amount_paid', 'payment_date', 'payment_method', 'transaction_id', 'gcash_account_used', 'proof_image', 'notes']
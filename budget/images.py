@@ -0,0 +1,109 @@
+"""
+Resized copies of uploaded images.
+
+Uploads are phone screenshots and camera photos, often several megabytes.
+Pages should never serve those originals, so every upload gets smaller
+variants that are stored next to it and referenced from extra image fields
+on the model:
+
+    Payment.proof_image          ->  proof_display (max 1600px JPEG)
+                                     proof_thumbnail (192px WebP)
+    UserProfile.profile_picture  ->  avatar_32, avatar_64, avatar_256
+                                     (square WebP crops)
+
+Variants are re-encoded from the decoded pixels, so EXIF data (GPS
+position, camera serial numbers, ...) is never copied into them. The EXIF
+orientation is applied first so the pixels end up the right way up.
+"""
+import logging
+import os
+from collections import namedtuple
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# crop=True center-crops to a max_size square instead of fitting inside it
+Variant = namedtuple('Variant', ['max_size', 'format', 'quality', 'crop'], defaults=[False])
+
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp', 'PNG': 'png'}
+
+PROOF_VARIANTS = {
+    'proof_display': Variant(max_size=1600, format='JPEG', quality=85),
+    'proof_thumbnail': Variant(max_size=192, format='WEBP', quality=80),
+}
+
+AVATAR_VARIANTS = {
+    f'avatar_{size}': Variant(max_size=size, format='WEBP', quality=85, crop=True)
+    for size in (32, 64, 256)
+}
+
+
+def open_image(file, max_size=None):
+    """Decode an uploaded image, upright and fully loaded"""
+    file.seek(0)
+    image = Image.open(file)
+    if max_size and image.format == 'JPEG':
+        # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding,
+        # which is much faster than decoding full size and resizing
+        image.draft('RGB', (max_size, max_size))
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    return image
+
+
+def render_variant(image, variant):
+    """Encode a resized copy of image and return its bytes"""
+    if variant.crop:
+        copy = ImageOps.fit(image, (variant.max_size, variant.max_size), Image.LANCZOS)
+    else:
+        copy = image.copy()
+        copy.thumbnail((variant.max_size, variant.max_size), Image.LANCZOS)
+    if variant.format == 'JPEG' and copy.mode != 'RGB':
+        # JPEG has no alpha channel; flatten transparent screenshots on white
+        background = Image.new('RGB', copy.size, 'white')
+        rgba = copy.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        copy = background
+    elif copy.mode not in ('RGB', 'RGBA'):
+        copy = copy.convert('RGBA' if 'A' in copy.getbands() or 'transparency' in copy.info else 'RGB')
+
+    buffer = BytesIO()
+    # No exif= argument, so none of the original metadata is written
+    copy.save(buffer, variant.format, quality=variant.quality, optimize=True)
+    return buffer.getvalue()
+
+
+def generate_variants(instance, source_field, variants):
+    """Create the variants of instance.<source_field> and store them.
+
+    variants maps the name of an image field on the model to its Variant.
+    The new paths are written with a queryset update(), so no save signals
+    fire and the caller's instance is updated in place. Returns False if
+    the source isn't a readable image.
+    """
+    source = getattr(instance, source_field)
+    if not source:
+        return False
+    try:
+        with source.open('rb') as file:
+            image = open_image(file, max(variant.max_size for variant in variants.values()))
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning('Could not process %s %s: %s', instance._meta.label, source.name, exc)
+        return False
+
+    stem = os.path.splitext(os.path.basename(source.name))[0]
+    paths = {}
+    for field_name, variant in variants.items():
+        field_file = getattr(instance, field_name)
+        if field_file:
+            field_file.delete(save=False)
+        content = ContentFile(render_variant(image, variant))
+        field_file.save(f'{stem}.{EXTENSIONS[variant.format]}', content, save=False)
+        paths[field_name] = field_file.name
+    image.close()
+
+    type(instance).objects.filter(pk=instance.pk).update(**paths)
+    return True
@@ -0,0 +1,78 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Q
+
+from budget.models import Payment, UserProfile
+
+# name: (model, source field, a variant field, method that creates the variants)
+TARGETS = {
+    'proofs': (Payment, 'proof_image', 'proof_thumbnail', 'generate_proof_variants'),
+    'avatars': (UserProfile, 'profile_picture', 'avatar_32', 'generate_avatar_variants'),
+}
+
+
+def _init_worker():
+    # Needed when the pool spawns fresh interpreters instead of forking
+    django.setup()
+
+
+def _process_batch(target, pks):
+    model, _, _, method = TARGETS[target]
+    processed = failed = 0
+    for instance in model.objects.filter(pk__in=pks):
+        if getattr(instance, method)():
+            processed += 1
+        else:
+            failed += 1
+    connections.close_all()
+    return processed, failed
+
+
+class Command(BaseCommand):
+    help = 'Create the resized variants of existing payment proofs and profile pictures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=sorted(TARGETS), help='Only process payment proofs or avatars')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--batch-size', type=int, default=50, help='Images per task')
+        parser.add_argument('--all', action='store_true', help='Also regenerate images that already have variants')
+
+    def handle(self, *args, **options):
+        batches = []
+        for target, (model, source_field, variant_field, _) in TARGETS.items():
+            if options['only'] and target != options['only']:
+                continue
+            queryset = model.objects.exclude(**{source_field: ''}).exclude(**{f'{source_field}__isnull': True})
+            if not options['all']:
+                queryset = queryset.filter(Q(**{variant_field: ''}) | Q(**{f'{variant_field}__isnull': True}))
+            pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+            batch_size = options['batch_size']
+            batches += [(target, pks[i:i + batch_size]) for i in range(0, len(pks), batch_size)]
+
+        total = sum(len(pks) for _, pks in batches)
+        if not total:
+            self.stdout.write('No images to process.')
+            return
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+
+        start = time.perf_counter()
+        processed = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            futures = [pool.submit(_process_batch, target, pks) for target, pks in batches]
+            for future in as_completed(futures):
+                batch_processed, batch_failed = future.result()
+                processed += batch_processed
+                failed += batch_failed
+                self.stdout.write(f'{processed + failed}/{total} images done')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {processed} images in {time.perf_counter() - start:.1f}s'
+            + (f', {failed} could not be read' if failed else '')
+        ))
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from django.utils import timezone
+
+MODES = ('wsgi', 'asgi')
+
+
+def fetch_urls():
+    """The JSON requests the home page fires in parallel"""
+    today = timezone.localdate()
+    return [
+        reverse('monthly_overview'),
+        reverse('month_transactions', args=[f'{today.year}-{today.month:02d}']),
+        reverse('unpaid_bills', args=[today.month]),
+        reverse('search_suggestions') + '?q=rent',
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compare WSGI (sync views) and ASGI (async views) throughput of the JSON endpoints under concurrent fetches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to fetch as (default: first non-staff user)')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per mode (default: 400)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight at once (default: 16)')
+        parser.add_argument('--threads', type=int, default=4, help='WSGI worker threads (default: 4)')
+        # Each mode runs in its own process so it gets its own URLconf
+        parser.add_argument('--mode', choices=MODES, help='Run one mode only')
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            user = self.get_user(options['user'])
+            run = self.run_wsgi if options['mode'] == 'wsgi' else self.run_asgi
+            elapsed, latencies = run(user, options)
+            latencies.sort()
+            self.stdout.write('RESULT %f %f %f' % (
+                len(latencies) / elapsed,
+                statistics.median(latencies),
+                latencies[int(len(latencies) * 0.95) - 1],
+            ))
+            return
+
+        self.get_user(options['user'])
+        self.stdout.write(
+            f'{options["requests"]} requests, {options["concurrency"]} in flight, '
+            f'{options["threads"]} WSGI threads\n'
+        )
+        self.stdout.write(f'{"":<28}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}')
+        for mode in MODES:
+            env = dict(os.environ, PAYFLOW_ASYNC_VIEWS='1' if mode == 'asgi' else '0')
+            env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+            command = [
+                sys.executable, '-m', 'django', 'bench_asgi', '--mode', mode,
+                '--requests', str(options['requests']), '--concurrency', str(options['concurrency']),
+                '--threads', str(options['threads']),
+            ]
+            if options['user']:
+                command += ['--user', options['user']]
+            result = subprocess.run(command, env=env, capture_output=True, text=True)
+            lines = [line for line in result.stdout.splitlines() if line.startswith('RESULT ')]
+            if result.returncode or not lines:
+                raise CommandError(f'{mode} run failed:\n{result.stderr}')
+            rate, p50, p95 = (float(value) for value in lines[-1].split()[1:])
+            label = 'WSGI, sync views' if mode == 'wsgi' else 'ASGI, async views'
+            self.stdout.write(f'{label:<28}{rate:>10.1f}{p50:>10.2f}{p95:>10.2f}')
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+        else:
+            user = User.objects.filter(is_staff=False).order_by('pk').first()
+        if user is None:
+            raise CommandError('No user to fetch as.')
+        return user
+
+    def requests(self, options):
+        urls = fetch_urls()
+        return [urls[i % len(urls)] for i in range(options['requests'])]
+
+    def run_wsgi(self, user, options):
+        # A WSGI server serves at most one request per thread; the rest wait
+        login = Client(SERVER_NAME='localhost')
+        login.force_login(user)
+        local = threading.local()
+
+        def fetch(url):
+            if not hasattr(local, 'client'):
+                local.client = Client(SERVER_NAME='localhost')
+                local.client.cookies = login.cookies
+            start = time.perf_counter()
+            local.client.get(url)
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(min(options['threads'], options['concurrency'])) as pool:
+            latencies = list(pool.map(fetch, self.requests(options)))
+        return time.perf_counter() - start, latencies
+
+    def run_asgi(self, user, options):
+        login = Client(SERVER_NAME='localhost')
+        login.force_login(user)
+        urls = self.requests(options)
+
+        async def main():
+            client = AsyncClient(headers={'Host': 'localhost'})
+            client.cookies = login.cookies
+            slots = asyncio.Semaphore(options['concurrency'])
+
+            async def fetch(url):
+                async with slots:
+                    start = time.perf_counter()
+                    await client.get(url)
+                    return (time.perf_counter() - start) * 1000
+
+            return await asyncio.gather(*(fetch(url) for url in urls))
+
+        start = time.perf_counter()
+        latencies = asyncio.run(main())
+        return time.perf_counter() - start, list(latencies)
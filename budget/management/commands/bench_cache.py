@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from django.core.management.commands.createcachetable import Command as CreateCacheTable
+from django.db import DEFAULT_DB_ALIAS, connection
+
+from payflow.sqlite_cache import SQLiteCache
+
+BENCH_TABLE = 'payflow_bench_cache'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the shared SQLite cache against LocMemCache and the database cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ops', type=int, default=5000, help='Operations per measurement')
+
+    def handle(self, *args, **options):
+        ops = options['ops']
+        tmpdir = tempfile.mkdtemp(prefix='payflow-bench-')
+        create_table = CreateCacheTable()
+        create_table.verbosity = 0
+        create_table.create_table(DEFAULT_DB_ALIAS, BENCH_TABLE, False)
+        try:
+            backends = [
+                ('LocMemCache (per process)', LocMemCache('bench', {'OPTIONS': {'MAX_ENTRIES': ops * 2}})),
+                ('DatabaseCache', DatabaseCache(BENCH_TABLE, {'OPTIONS': {'MAX_ENTRIES': ops * 2}})),
+                ('SQLiteCache (shared)', SQLiteCache(os.path.join(tmpdir, 'cache.sqlite3'), {'OPTIONS': {'MAX_ENTRIES': ops * 2}})),
+            ]
+            self.stdout.write(f'{ops} operations each, microseconds per operation\n')
+            self.stdout.write(f'{"backend":<28}{"set":>10}{"get hit":>10}{"get miss":>10}{"incr":>10}')
+            for name, cache in backends:
+                results = self.run_backend(cache, ops)
+                self.stdout.write(
+                    f'{name:<28}' + ''.join(f'{results[op]:>10.1f}' for op in ('set', 'get hit', 'get miss', 'incr'))
+                )
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE {connection.ops.quote_name(BENCH_TABLE)}')
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def run_backend(self, cache, ops):
+        payload = {'due_soon': list(range(20)), 'name': 'Rent'}
+        results = {}
+
+        start = time.perf_counter()
+        for i in range(ops):
+            cache.set(f'key:{i}', payload)
+        results['set'] = self.per_op(start, ops)
+
+        start = time.perf_counter()
+        for i in range(ops):
+            cache.get(f'key:{i}')
+        results['get hit'] = self.per_op(start, ops)
+
+        start = time.perf_counter()
+        for i in range(ops):
+            cache.get(f'missing:{i}')
+        results['get miss'] = self.per_op(start, ops)
+
+        cache.set('counter', 0)
+        start = time.perf_counter()
+        for i in range(ops):
+            cache.incr('counter')
+        results['incr'] = self.per_op(start, ops)
+
+        cache.clear()
+        return results
+
+    def per_op(self, start, ops):
+        return (time.perf_counter() - start) / ops * 1_000_000
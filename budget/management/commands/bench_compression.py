@@ -0,0 +1,70 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from budget.compression import brotli, compress, minify_html
+
+from .measure_page_sizes import PAGES
+
+
+def _timed(func, *args, repeat):
+    """Return (result, milliseconds per call)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+class Command(BaseCommand):
+    help = 'Compare the CPU cost of minifying and compressing the main pages with the bytes saved'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to render the pages as (default: first non-staff user)')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per measurement (default: 20)')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_staff=False).order_by('pk').first()
+        if user is None:
+            raise CommandError('No user to render the pages as.')
+        repeat = max(options['repeat'], 1)
+
+        # Without Accept-Encoding and with HTML_MINIFY off, the middleware
+        # returns the page exactly as the template rendered it
+        with override_settings(HTML_MINIFY=False):
+            self._bench(user, repeat)
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('Brotli is not installed; responses fall back to gzip.'))
+
+    def _bench(self, user, repeat):
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(user)
+        self.stdout.write(f'Pages rendered as "{user.username}"; bytes, then ms per response\n')
+        self.stdout.write(
+            f'{"page":<14}{"html":>9}{"minified":>10}{"gzip":>8}{"brotli":>8}'
+            f'{"render":>9}{"minify":>8}{"gzip":>8}{"brotli":>8}'
+        )
+        for name in PAGES:
+            response, render_ms = _timed(client.get, reverse(name), repeat=repeat)
+            if response.status_code != 200:
+                self.stdout.write(f'{name:<14}{"HTTP " + str(response.status_code):>9}')
+                continue
+            charset = response.charset
+            html = response.content.decode(charset)
+            minified, minify_ms = _timed(minify_html, html, repeat=repeat)
+            data = minified.encode(charset)
+            gzipped, gzip_ms = _timed(compress, data, 'gzip', repeat=repeat)
+            if brotli is not None:
+                brotlied, brotli_ms = _timed(compress, data, 'br', repeat=repeat)
+                br_size, br_time = len(brotlied), f'{brotli_ms:.2f}'
+            else:
+                br_size = br_time = '-'
+            self.stdout.write(
+                f'{name:<14}{len(html.encode(charset)):>9}{len(data):>10}{len(gzipped):>8}{br_size:>8}'
+                f'{render_ms:>9.2f}{minify_ms:>8.2f}{gzip_ms:>8.2f}{br_time:>8}'
+            )
@@ -0,0 +1,79 @@
+import datetime
+import json
+import random
+import time
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.management.base import BaseCommand
+
+from budget import responses
+
+
+def _rows(count):
+    """Rows shaped like month_transactions' .values() query"""
+    start = datetime.date(2024, 1, 1)
+    return [
+        {
+            'title': f'Payment for Bill {i % 40}',
+            'amount': Decimal(random.randint(100, 500000)) / 100,
+            'transaction_type': 'expense' if i % 5 else 'income',
+            'date': start + datetime.timedelta(days=i % 31),
+            'description': 'Paid via GCash' if i % 3 else '',
+            'category_name': f'Bill {i % 40}' if i % 7 else None,
+        }
+        for i in range(count)
+    ]
+
+
+def _legacy(rows):
+    # What the views did before: a new dict per row with float() and
+    # strftime(), then JsonResponse's DjangoJSONEncoder
+    data = [
+        {
+            'title': row['title'],
+            'amount': float(row['amount']),
+            'transaction_type': row['transaction_type'],
+            'date': row['date'].strftime('%B %d, %Y'),
+            'category': row['category_name'],
+            'description': row['description'],
+        }
+        for row in rows
+    ]
+    return json.dumps({'transactions': data}, cls=DjangoJSONEncoder).encode()
+
+
+def _stdlib(rows):
+    return json.dumps({'transactions': rows}, cls=responses.FastJSONEncoder, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _orjson(rows):
+    return responses.orjson.dumps({'transactions': rows}, default=responses._orjson_default)
+
+
+class Command(BaseCommand):
+    help = 'Time encoding a month of transactions with the old JSON path, the stdlib fallback and orjson'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000, help='Transactions in the month (default: 10000)')
+        parser.add_argument('--repeat', type=int, default=10, help='Runs per encoder (default: 10)')
+
+    def handle(self, *args, **options):
+        rows = _rows(options['rows'])
+        repeat = max(options['repeat'], 1)
+        encoders = [('legacy JsonResponse', _legacy), ('stdlib fallback', _stdlib)]
+        if responses.orjson is not None:
+            encoders.append(('orjson', _orjson))
+
+        self.stdout.write(f'{len(rows)} transactions, best of {repeat} runs\n')
+        self.stdout.write(f'{"encoder":<22}{"ms":>10}{"bytes":>12}')
+        for label, encode in encoders:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                body = encode(rows)
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            self.stdout.write(f'{label:<22}{best:>10.2f}{len(body):>12}')
+        if responses.orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJsonResponse uses the stdlib fallback.'))
@@ -0,0 +1,90 @@
+import hashlib
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.utils import timezone
+
+from budget.models import Payment, UserProfile
+from budget.storage import BLOB_DIR, ContentAddressedStorage, blob_name
+
+MODELS = [Payment, UserProfile]
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = 'Move existing uploads into the content-addressed storage, keeping one copy of each file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+        parser.add_argument('--keep-originals', action='store_true', help='Leave the old files in place')
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('The default storage is not budget.storage.ContentAddressedStorage.')
+        dry_run = options['dry_run']
+
+        moved = {}  # old name -> blob name
+        references = 0
+        missing = set()
+        for model in MODELS:
+            fields = [field.attname for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+            changed = []
+            for row in model.objects.only('pk', *fields).iterator():
+                row_changed = False
+                for attname in fields:
+                    name = getattr(row, attname).name
+                    if not name or name.startswith(f'{BLOB_DIR}/') or name in missing:
+                        continue
+                    if name in moved:
+                        # Every row using the blob holds its own reference
+                        if not dry_run:
+                            default_storage.retain(moved[name])
+                    else:
+                        path = default_storage.path(name)
+                        if not os.path.exists(path):
+                            missing.add(name)
+                            continue
+                        if dry_run:
+                            moved[name] = blob_name(file_digest(path), os.path.splitext(name)[1])
+                        else:
+                            moved[name] = default_storage.save_existing(path)
+                    setattr(row, attname, moved[name])
+                    references += 1
+                    row_changed = True
+                if row_changed:
+                    changed.append(row)
+            if changed and not dry_run:
+                update_fields = list(fields)
+                if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+                    # bulk_update() doesn't apply auto_now, and the delta
+                    # sync (budget/sync.py) finds changed rows by updated_at
+                    now = timezone.now()
+                    for row in changed:
+                        row.updated_at = now
+                    update_fields.append('updated_at')
+                with transaction.atomic():
+                    model.objects.bulk_update(changed, update_fields, batch_size=500)
+
+        # Bytes taken by the old files versus by one copy of each blob
+        sizes = {name: os.path.getsize(default_storage.path(name)) for name in moved}
+        unique_size = sum({blob: sizes[name] for name, blob in moved.items()}.values())
+        if not dry_run and not options['keep_originals']:
+            for name in moved:
+                os.remove(default_storage.path(name))
+
+        prefix = '[dry run] ' if dry_run else ''
+        for name in sorted(missing):
+            self.stdout.write(self.style.WARNING(f'{prefix}Missing file: {name}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{references} references to {len(moved)} files now use '
+            f'{len(set(moved.values()))} unique blobs, {(sum(sizes.values()) - unique_size) / 1024:.1f} KB of duplicate copies'
+        ))
@@ -0,0 +1,120 @@
+import gzip
+import json
+import re
+
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PAGES = ['welcome', 'home', 'transactions', 'profile', 'help', 'about']
+BUNDLES = ['css/base.css', 'css/home.css', 'js/base.js', 'js/home.js']
+INLINE_RE = re.compile(rb'<(script|style)\b[^>]*>(.*?)</\1>', re.S | re.I)
+
+
+def change(before, after):
+    """after - before as "+12 (+3.4%)", or '' without a before value"""
+    if not isinstance(before, int) or not isinstance(after, int):
+        return ''
+    percent = f' ({(after - before) / before:+.1%})' if before else ''
+    return f'{after - before:+d}{percent}'
+
+
+class Command(BaseCommand):
+    help = 'Report the HTML bytes of the main pages and the size of the static bundles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to render the pages as (default: first non-staff user)')
+        parser.add_argument('--unminified', action='store_true', help='Render the pages with HTML_MINIFY off, as a baseline')
+        parser.add_argument('--save', metavar='FILE', help='Write the sizes to FILE as JSON')
+        parser.add_argument('--compare', metavar='FILE', help='Show the change against sizes saved with --save')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_staff=False).order_by('pk').first()
+        if user is None:
+            raise CommandError('No user to render the pages as.')
+        baseline = {'pages': {}, 'bundles': {}}
+        if options['compare']:
+            try:
+                with open(options['compare']) as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Cannot read {options["compare"]}: {exc}')
+
+        # The middleware reads HTML_MINIFY when the client loads it
+        with override_settings(HTML_MINIFY=not options['unminified']):
+            pages = self.measure_pages(user)
+        bundles = self.measure_bundles()
+
+        mode = 'unminified' if options['unminified'] else 'minified'
+        self.stdout.write(f'Pages rendered as "{user.username}" ({mode}), in bytes\n')
+        self.stdout.write(f'{"page":<16}{"html":>10}{"gzip":>10}{"inline js/css":>16}{"change":>20}')
+        total = before_total = 0
+        for name, sizes in pages.items():
+            if 'status' in sizes:
+                self.stdout.write(f'{name:<16}{"HTTP " + str(sizes["status"]):>10}')
+                continue
+            before = baseline['pages'].get(name, {})
+            total += sizes['html']
+            # A page missing from the baseline counts as unchanged
+            before_total += before.get('html', sizes['html'])
+            self.stdout.write(
+                f'{name:<16}{sizes["html"]:>10}{sizes["gzip"]:>10}{sizes["inline"]:>16}'
+                f'{change(before.get("html"), sizes["html"]):>20}'
+            )
+        summary = f'Total HTML: {total} bytes'
+        if baseline['pages']:
+            summary += f', {change(before_total, total)} against {options["compare"]}'
+        self.stdout.write(self.style.SUCCESS(summary + '\n'))
+
+        # Bundles are downloaded once and then cached by the browser
+        self.stdout.write(f'{"static bundle":<16}{"raw":>10}{"gzip":>10}{"brotli":>10}{"change":>20}')
+        for path, sizes in bundles.items():
+            before = baseline['bundles'].get(path, {})
+            self.stdout.write(
+                f'{path:<16}{sizes["raw"]:>10}{sizes["gzip"]:>10}{sizes["brotli"] or "-":>10}'
+                f'{change(before.get("raw"), sizes["raw"]):>20}'
+            )
+
+        if options['save']:
+            with open(options['save'], 'w') as file:
+                json.dump({'pages': pages, 'bundles': bundles}, file, indent=2)
+            self.stdout.write(f'Saved to {options["save"]}')
+
+    def measure_pages(self, user):
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(user)
+        pages = {}
+        for name in PAGES:
+            response = client.get(reverse(name))
+            if response.status_code != 200:
+                pages[name] = {'status': response.status_code}
+                continue
+            html = response.content
+            inline = sum(len(match.group(2)) for match in INLINE_RE.finditer(html))
+            pages[name] = {'html': len(html), 'gzip': len(gzip.compress(html)), 'inline': inline}
+        return pages
+
+    def measure_bundles(self):
+        bundles = {}
+        for path in BUNDLES:
+            found = finders.find(path)
+            if not found:
+                continue
+            with open(found, 'rb') as file:
+                data = file.read()
+            bundles[path] = {
+                'raw': len(data),
+                'gzip': len(gzip.compress(data)),
+                'brotli': len(brotli.compress(data)) if brotli else None,
+            }
+        return bundles
@@ -0,0 +1,197 @@
+"""
+Serving uploaded media with permission checks.
+
+Uploads are private: a payment proof is only shown to the owner of its
+category, and a profile picture only to its owner and to staff (the admin
+user list shows everyone's avatar). The site's own images and videos listed
+in PUBLIC_MEDIA_FILES, such as the logo, are served to everyone. Anything
+else is a 404.
+
+Names are normalized before any check, and names that are absolute or
+climb out of MEDIA_ROOT with '..' are refused, so a public name can't be
+used as a path prefix to reach a private file.
+
+Once a request is allowed, the bytes are sent in one of three ways,
+chosen by MEDIA_SENDFILE:
+
+* 'x-accel-redirect': nginx serves MEDIA_ACCEL_PREFIX + name from an
+  internal location;
+* 'x-sendfile': Apache (mod_xsendfile) or lighttpd serves the file;
+* None: Django streams the file, honouring single byte-range requests so
+  browsers can resume downloads. Under ASGI the file is read by an async
+  iterator one chunk at a time; Django 4.2 would read a sync iterator
+  (including FileResponse) into memory in full before sending it.
+
+Content-addressed files (budget/storage.py) never change, so they are
+cached for a year and marked immutable.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date
+
+from .models import Payment, UserProfile
+from .storage import BLOB_DIR
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _references(model, name):
+    fields = [field.name for field in model._meta.concrete_fields if hasattr(field, 'upload_to')]
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{field: name})
+    return model.objects.filter(condition)
+
+
+def clean_media_name(name):
+    """Return the normalized name, or None if it leaves MEDIA_ROOT"""
+    name = posixpath.normpath(name)
+    if name in ('', '.') or name.startswith('/') or '..' in name.split('/'):
+        return None
+    return name
+
+
+def is_public_media(name):
+    return name in getattr(settings, 'PUBLIC_MEDIA_FILES', ())
+
+
+def can_view_media(user, name):
+    """Whether user may see name, which must already be cleaned"""
+    if is_public_media(name):
+        return True
+    if not user.is_authenticated:
+        return False
+    # Content-addressed files can be shared, so allow anyone who has one
+    if _references(Payment, name).filter(category__user=user).exists():
+        return True
+    profiles = _references(UserProfile, name)
+    return profiles.exists() if user.is_staff else profiles.filter(user=user).exists()
+
+
+def _byte_range(header, size):
+    """Return (start, end) for a single satisfiable range, None to send all.
+
+    Raises ValueError for a range outside the file.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        # Missing, malformed or multi-range: answer with the whole file
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        # bytes=-N is the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        raise ValueError('Unsatisfiable range')
+    return start, end
+
+
+def _stream(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+async def _astream(path, start, length):
+    """_stream for ASGI; every read runs in a worker thread"""
+    file = await sync_to_async(open, thread_sensitive=False)(path, 'rb')
+    try:
+        await sync_to_async(file.seek, thread_sensitive=False)(start)
+        while length > 0:
+            chunk = await sync_to_async(file.read, thread_sensitive=False)(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        await sync_to_async(file.close, thread_sensitive=False)()
+
+
+def serve_media(request, name, asynchronous=False):
+    """Serve media file name; pass asynchronous=True when running under ASGI"""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405, headers={'Allow': 'GET, HEAD'})
+    name = clean_media_name(name)
+    if name is None:
+        raise Http404('Not found')
+    try:
+        path = default_storage.path(name)
+    except SuspiciousFileOperation:
+        raise Http404('Not found')
+    if not os.path.isfile(path) or not can_view_media(request.user, name):
+        raise Http404('Not found')
+
+    stat = os.stat(path)
+    immutable = name.startswith(f'{BLOB_DIR}/')
+    if immutable:
+        etag = '"%s"' % os.path.splitext(os.path.basename(name))[0]
+    else:
+        etag = '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = _file_response(request, name, path, stat.st_size, asynchronous)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    cache_options = {'public': True} if is_public_media(name) else {'private': True}
+    if immutable:
+        patch_cache_control(response, max_age=IMMUTABLE_MAX_AGE, immutable=True, **cache_options)
+    else:
+        patch_cache_control(response, max_age=0, must_revalidate=True, **cache_options)
+    return response
+
+
+def _file_response(request, name, path, size, asynchronous=False):
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    sendfile = getattr(settings, 'MEDIA_SENDFILE', None)
+    if sendfile == 'x-accel-redirect':
+        # nginx also takes care of Range requests
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/') + quote(name)
+        return response
+    if sendfile == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+
+    try:
+        byte_range = _byte_range(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None and not asynchronous:
+        # FileResponse lets the server use wsgi.file_wrapper (sendfile)
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    elif byte_range is None:
+        response = StreamingHttpResponse(_astream(path, 0, size), content_type=content_type)
+        response['Content-Length'] = str(size)
+        response['Content-Disposition'] = content_disposition_header(False, os.path.basename(path))
+    else:
+        start, end = byte_range
+        stream = _astream if asynchronous else _stream
+        response = StreamingHttpResponse(stream(path, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,171 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .compression import accepted_encoding, compress, compress_stream, minify_html
+from .media import serve_media
+from .routers import pin_user_to_primary
+
+
+class SyncAndAsyncMiddleware:
+    """Base for middleware that runs natively under both WSGI and ASGI.
+
+    Under ASGI, Django runs a sync-only middleware in a thread and the rest
+    of the chain, async views included, through async_to_sync, so one sync
+    middleware is enough to tie up a thread for the whole request.
+    Subclasses implement __call__ for WSGI and __acall__ for ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class StaticFilesMiddleware(SyncAndAsyncMiddleware, WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware that also works as async middleware.
+
+    WhiteNoise 6.6 is sync-only. Finding a static file is a dict lookup
+    (unless WHITENOISE_AUTOREFRESH is on), so the async path only leaves the
+    event loop for autorefresh lookups.
+    """
+
+    def __init__(self, get_response):
+        WhiteNoiseMiddleware.__init__(self, get_response)
+        SyncAndAsyncMiddleware.__init__(self, get_response)
+
+    def handle(self, request):
+        return WhiteNoiseMiddleware.__call__(self, request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class ReplicaPinMiddleware(SyncAndAsyncMiddleware):
+    """Pin a user to the primary database after they change something"""
+
+    def handle(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            self.pin(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            await sync_to_async(self.pin)(request)
+        return response
+
+    @staticmethod
+    def pin(request):
+        if request.user.is_authenticated:
+            pin_user_to_primary(request.user.pk)
+
+
+class MediaMiddleware(SyncAndAsyncMiddleware):
+    """Serve MEDIA_URL through budget.media.serve_media.
+
+    Place it right after AuthenticationMiddleware: media requests need the
+    user for the permission check but skip URL resolution and the rest of
+    the middleware stack.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.prefix = settings.MEDIA_URL if settings.MEDIA_URL.startswith('/') else f'/{settings.MEDIA_URL}'
+
+    def handle(self, request):
+        if request.path_info.startswith(self.prefix):
+            return serve_media(request, request.path_info[len(self.prefix):])
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.path_info.startswith(self.prefix):
+            return await sync_to_async(serve_media)(request, request.path_info[len(self.prefix):], asynchronous=True)
+        return await self.get_response(request)
+
+
+class CompressionMiddleware(SyncAndAsyncMiddleware):
+    """Minify HTML and compress HTML and JSON responses with brotli or gzip.
+
+    Place it right after the static files middleware so static files, which
+    WhiteNoise serves precompressed, never reach it. Responses smaller than
+    COMPRESSION_MIN_SIZE are sent as they are: below a few hundred bytes the
+    headers and CPU cost more than compression saves. Streaming responses
+    are compressed chunk by chunk; event streams and partial content are
+    left alone.
+    """
+
+    COMPRESSIBLE_TYPES = ('text/html', 'application/json')
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 500)
+        self.minify = getattr(settings, 'HTML_MINIFY', True)
+
+    def handle(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if (
+            response.status_code != 200
+            or content_type not in self.COMPRESSIBLE_TYPES
+            or response.has_header('Content-Encoding')
+            or getattr(response, 'is_async', False)
+        ):
+            return response
+
+        if self.minify and content_type == 'text/html' and not response.streaming:
+            charset = response.charset
+            response.content = minify_html(response.content.decode(charset)).encode(charset)
+            # CommonMiddleware has already set the length of the unminified body
+            response['Content-Length'] = str(len(response.content))
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = accepted_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding, html=content_type == 'text/html')
+            del response['Content-Length']
+        else:
+            if len(response.content) < self.min_size:
+                return response
+            compressed = compress(response.content, encoding, html=content_type == 'text/html')
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The body differs per encoding, so a strong ETag must not be reused
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:32
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def backfill_payment_counters(apps, schema_editor):
+    Category = apps.get_model('budget', 'Category')
+    Payment = apps.get_model('budget', 'Payment')
+    totals = {
+        row['category_id']: row
+        for row in Payment.objects.values('category_id').annotate(
+            total=Sum('amount_paid'), count=Count('id'), last=Max('payment_date')
+        )
+    }
+    # Partial payments reduced the bill amount in place; add back the ones
+    # made since the bill was last paid in full to recover the original
+    last_full = dict(
+        Payment.objects.filter(payment_type='full').values('category_id')
+        .annotate(last=Max('payment_date')).values_list('category_id', 'last')
+    )
+    categories = list(Category.objects.all())
+    for category in categories:
+        row = totals.get(category.pk)
+        partials = Payment.objects.filter(category_id=category.pk, payment_type='partial')
+        if category.pk in last_full:
+            partials = partials.filter(payment_date__gt=last_full[category.pk])
+        category.original_amount = category.amount + (partials.aggregate(total=Sum('amount_paid'))['total'] or 0)
+        if row:
+            category.paid_to_date = row['total']
+            category.payment_count = row['count']
+            category.last_payment_date = row['last']
+    Category.objects.bulk_update(
+        categories,
+        ['original_amount', 'paid_to_date', 'payment_count', 'last_payment_date'],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget', '0009_payment_payment_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='last_payment_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='original_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Bill amount before any partial payments', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='paid_to_date',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Total of all payments recorded for this bill', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='payment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_payment_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget', '0010_category_payment_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['category', '-payment_date', '-id'], name='payment_history_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget', '0012_payment_proof_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_256',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profile_pics/256/'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_32',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profile_pics/32/'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_64',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profile_pics/64/'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget', '0014_mediablob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='proof_display',
+            field=models.ImageField(blank=True, db_index=True, editable=False, null=True, upload_to='payment_proofs/display/'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='proof_image',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='payment_proofs/'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='proof_thumbnail',
+            field=models.ImageField(blank=True, db_index=True, editable=False, null=True, upload_to='payment_proofs/thumbs/'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='avatar_256',
+            field=models.ImageField(blank=True, db_index=True, editable=False, null=True, upload_to='profile_pics/256/'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='avatar_32',
+            field=models.ImageField(blank=True, db_index=True, editable=False, null=True, upload_to='profile_pics/32/'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='avatar_64',
+            field=models.ImageField(blank=True, db_index=True, editable=False, null=True, upload_to='profile_pics/64/'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='profile_pics/'),
+        ),
+    ]
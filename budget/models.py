@@ -1,11 +1,17 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import datetime, timedelta
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
-    profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True, db_index=True)
+    # Square, metadata-free copies of profile_picture (see budget/images.py)
+    avatar_32 = models.ImageField(upload_to='profile_pics/32/', null=True, blank=True, editable=False, db_index=True)
+    avatar_64 = models.ImageField(upload_to='profile_pics/64/', null=True, blank=True, editable=False, db_index=True)
+    avatar_256 = models.ImageField(upload_to='profile_pics/256/', null=True, blank=True, editable=False, db_index=True)
     birth_date = models.DateField(null=True, blank=True)
     address = models.TextField(blank=True)
     phone_number = models.CharField(max_length=15, blank=True)
@@ -13,6 +19,32 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name}"
     
+    def save(self, *args, **kwargs):
+        new_upload = bool(self.profile_picture) and not self.profile_picture._committed
+        super().save(*args, **kwargs)
+        if new_upload:
+            transaction.on_commit(self.generate_avatar_variants)
+    
+    def generate_avatar_variants(self):
+        from .images import AVATAR_VARIANTS, generate_variants
+        return generate_variants(self, 'profile_picture', AVATAR_VARIANTS)
+    
+    def _avatar_url(self, size):
+        image = getattr(self, f'avatar_{size}') or self.profile_picture
+        return image.url if image else None
+    
+    @property
+    def avatar_32_url(self):
+        return self._avatar_url(32)
+    
+    @property
+    def avatar_64_url(self):
+        return self._avatar_url(64)
+    
+    @property
+    def avatar_256_url(self):
+        return self._avatar_url(256)
+    
     @property
     def age(self):
         if self.birth_date:
@@ -51,11 +83,44 @@ class Category(models.Model):
     payment_date = models.DateField(null=True, blank=True, help_text="Date when payment was made")
     gcash_number = models.CharField(max_length=15, blank=True, help_text="GCash account number for payments")
     category_id = models.CharField(max_length=50, blank=True, help_text="Category ID for identification")
+    original_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, help_text="Bill amount before any partial payments")
+    paid_to_date = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Total of all payments recorded for this bill")
+    payment_count = models.PositiveIntegerField(default=0)
+    last_payment_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Queryset update() and bulk_update() must set updated_at themselves
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            # Serves the delta sync (see budget/sync.py)
+            models.Index(fields=['user', 'updated_at', 'id'], name='category_sync_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.user.username}"
     
+    def save(self, *args, **kwargs):
+        if self.original_amount is None:
+            self.original_amount = self.amount
+        super().save(*args, **kwargs)
+    
+    @property
+    def paid_this_cycle(self):
+        """How much of the current bill has been covered by partial payments"""
+        if self.original_amount is None:
+            return 0
+        return max(self.original_amount - self.amount, 0)
+    
+    @property
+    def payment_progress(self):
+        """Share of the current bill that is paid, as a whole percentage"""
+        if self.payment_status == 'paid':
+            return 100
+        if not self.original_amount:
+            return 0
+        return int(self.paid_this_cycle * 100 / self.original_amount)
+    
     @property
     def is_due_soon(self):
         today = timezone.now().date()
@@ -82,6 +147,29 @@ class Category(models.Model):
             return current_due
         return self.due_date
     
+    def record_payment(self, payment):
+        """Apply a saved payment to the bill's balance and counters.
+
+        Everything is done in one UPDATE with F() expressions, so concurrent
+        payments on the same bill can't overwrite each other's totals.
+        """
+        changes = {
+            'paid_to_date': F('paid_to_date') + payment.amount_paid,
+            'payment_count': F('payment_count') + 1,
+            'last_payment_date': Greatest(
+                Coalesce('last_payment_date', Value(payment.payment_date)),
+                Value(payment.payment_date)
+            ),
+            'updated_at': timezone.now(),
+        }
+        if payment.payment_type == 'full':
+            changes['payment_status'] = 'paid'
+            changes['payment_date'] = timezone.now().date()
+        else:
+            changes['amount'] = F('amount') - payment.amount_paid
+        Category.objects.filter(pk=self.pk).update(**changes)
+        self.refresh_from_db(fields=['amount', 'payment_status', 'payment_date', 'paid_to_date', 'payment_count', 'last_payment_date', 'updated_at'])
+    
     def mark_as_paid(self):
         """Mark category as paid without changing the due date"""
         from django.utils import timezone
@@ -127,6 +215,9 @@ class Category(models.Model):
             self.payment_status = 'unpaid'
             self.payment_date = None
             self.due_date = new_due
+            if self.original_amount is not None:
+                # Partial payments only reduced last month's bill
+                self.amount = self.original_amount
             self.save()
             return True
         
@@ -158,11 +249,45 @@ class Payment(models.Model):
     payment_type = models.CharField(max_length=10, choices=PAYMENT_TYPE_CHOICES, default='full')
     transaction_id = models.CharField(max_length=100, blank=True)
     gcash_account_used = models.CharField(max_length=20, blank=True)
-    proof_image = models.ImageField(upload_to='payment_proofs/', null=True, blank=True)
+    proof_image = models.ImageField(upload_to='payment_proofs/', null=True, blank=True, db_index=True)
+    # Resized, metadata-free copies of proof_image (see budget/images.py)
+    proof_display = models.ImageField(upload_to='payment_proofs/display/', null=True, blank=True, editable=False, db_index=True)
+    proof_thumbnail = models.ImageField(upload_to='payment_proofs/thumbs/', null=True, blank=True, editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            # Serves the keyset-paginated payment history of a category
+            models.Index(fields=['category', '-payment_date', '-id'], name='payment_history_idx'),
+            models.Index(fields=['updated_at', 'id'], name='payment_sync_idx'),
+        ]
     
     def __str__(self):
         return f"{self.category.name} - {self.amount_paid} - {self.payment_date}"
+    
+    def save(self, *args, **kwargs):
+        new_upload = bool(self.proof_image) and not self.proof_image._committed
+        super().save(*args, **kwargs)
+        if new_upload:
+            # Resize after the commit so the write transaction isn't held
+            # open while the image is processed
+            transaction.on_commit(self.generate_proof_variants)
+    
+    def generate_proof_variants(self):
+        from .images import PROOF_VARIANTS, generate_variants
+        return generate_variants(self, 'proof_image', PROOF_VARIANTS)
+    
+    @property
+    def proof_display_url(self):
+        """Display-size proof, falling back to the original until it exists"""
+        image = self.proof_display or self.proof_image
+        return image.url if image else None
+    
+    @property
+    def proof_thumbnail_url(self):
+        image = self.proof_thumbnail or self.proof_display or self.proof_image
+        return image.url if image else None
 
 class Transaction(models.Model):
     TRANSACTION_TYPES = [
@@ -178,6 +303,12 @@ class Transaction(models.Model):
     date = models.DateField()
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at', 'id'], name='transaction_sync_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.amount} - {self.date}"
@@ -187,9 +318,13 @@ class MonthlyBudget(models.Model):
     month = models.DateField()  # Store as first day of month
     total_budget = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['user', 'month']
+        indexes = [
+            models.Index(fields=['user', 'updated_at', 'id'], name='monthlybudget_sync_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.month.strftime('%B %Y')}"
@@ -219,9 +354,39 @@ class BudgetHistory(models.Model):
     amount_added = models.DecimalField(max_digits=10, decimal_places=2)
     added_at = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True, help_text="Optional notes for this budget addition")
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-added_at']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='budgethistory_sync_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.budget.user.username} - {self.amount_added} on {self.added_at.strftime('%Y-%m-%d')}"
+
+class MediaBlob(models.Model):
+    """A stored media file and how many rows use it (see budget/storage.py)"""
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.refcount} references)"
+
+class Tombstone(models.Model):
+    """A deleted row, kept so sync clients learn about the deletion (see budget/sync.py)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    stream = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at', 'id'], name='tombstone_sync_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_prune_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.budget.user.username} - {self.amount_added} on {self.added_at.strftime('%Y-%m-%d')}"
\ No newline at end of file
+        return f"{self.stream} {self.object_id} deleted {self.deleted_at:%Y-%m-%d}"
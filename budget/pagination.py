@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination.
+
+OFFSET pagination makes the database walk past every skipped row, so page
+200 of a long history is much slower than page 1. A keyset page instead
+continues from the sort key of the last row it returned:
+
+    WHERE (payment_date, id) < (:last_date, :last_id) ORDER BY payment_date DESC, id DESC
+
+which uses the index and costs the same on every page. The position is
+handed to the client as an opaque cursor string.
+
+The ordering must end with a unique field (normally the primary key) so
+that rows sharing the other sort values are neither skipped nor repeated,
+and none of the ordering fields may be nullable.
+"""
+import base64
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    data = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    """Turn a cursor back into Python values for the given model fields"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except Exception as exc:
+        raise InvalidCursor('Invalid cursor') from exc
+
+
+def keyset_after(ordering, values):
+    """Q() for the rows after the row with these values in this ordering"""
+    # (a, b, c) after (x, y, z) is: a > x, or a = x and b > y, or ...
+    condition = Q()
+    for index, (name, value) in enumerate(zip(ordering, values)):
+        field = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        clause = Q(**{f'{field}__{lookup}': value})
+        for previous, previous_value in zip(ordering[:index], values[:index]):
+            clause &= Q(**{previous.lstrip('-'): previous_value})
+        condition |= clause
+    return condition
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=20):
+    """Return one page of the queryset as (items, next_cursor).
+
+    ordering is a list of field names as for order_by(), e.g.
+    ['-payment_date', '-id']. next_cursor is None on the last page. Raises
+    InvalidCursor for a cursor that wasn't produced by this function.
+    """
+    fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in ordering]
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(keyset_after(ordering, decode_cursor(cursor, fields)))
+
+    # Fetch one extra row to learn whether there is a next page
+    items = list(queryset[:page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+    items = items[:page_size]
+    last = items[-1]
+    return items, encode_cursor([getattr(last, field.attname) for field in fields])
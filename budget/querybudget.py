@@ -0,0 +1,56 @@
+"""
+Per-view query budgets.
+
+@query_budget(n) declares that a view runs at most n SQL queries, counted
+on every database connection while the view runs (queries made by outer
+decorators, such as loading request.user, are not counted). A view that
+goes over raises QueryBudgetExceeded when QUERY_BUDGET_STRICT is on (the
+default under DEBUG) and logs a warning otherwise, so an N+1 query slipped
+into a view shows up in development instead of as a slow page in
+production.
+
+The count is left on request.query_count. The API endpoints are held to
+their budgets by the tests in budget/tests.py.
+"""
+import logging
+from contextlib import ExitStack
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def query_budget(max_queries):
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            counter = _QueryCounter()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = view_func(request, *args, **kwargs)
+            request.query_count = counter.count
+            if counter.count > max_queries:
+                message = f'{view_func.__name__} ran {counter.count} queries, its budget is {max_queries}'
+                if settings.QUERY_BUDGET_STRICT:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        _wrapped_view.query_budget = max_queries
+        return _wrapped_view
+    return decorator
@@ -0,0 +1,65 @@
+"""
+JSON responses for the API views.
+
+FastJsonResponse encodes with orjson when it is installed and with the
+standard library otherwise; both produce the same JSON:
+
+* Decimal becomes a number (amounts are shown, never summed, by the
+  front-end, so float precision is enough);
+* date and datetime become ISO 8601 strings;
+* querysets, including .values() querysets, and other iterables become
+  lists, so views can pass query results straight through.
+"""
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.query import QuerySet
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONEncoder(DjangoJSONEncoder):
+    """Standard library fallback, matching orjson's output"""
+
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return float(o)
+        if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, (QuerySet, set, frozenset)) or hasattr(o, '__next__'):
+            return list(o)
+        return super().default(o)
+
+
+def _orjson_default(o):
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, (QuerySet, set, frozenset)) or hasattr(o, '__next__'):
+        return list(o)
+    # Lazy translation strings and anything else DjangoJSONEncoder handles
+    return FastJSONEncoder().default(o)
+
+
+def dumps(data):
+    """Encode data as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_orjson_default)
+    return json.dumps(data, cls=FastJSONEncoder, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+class FastJsonResponse(HttpResponse):
+    """Drop-in replacement for JsonResponse using budget.responses.dumps"""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                'In order to allow non-dict objects to be serialized set the safe parameter to False.'
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
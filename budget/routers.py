@@ -0,0 +1,121 @@
+"""
+Database routing for the read replica.
+
+Views decorated with @read_from_replica run their reads against the
+'replica' database alias when one is configured (see REPLICA_SQLITE_PATH in
+settings). Writes always go to the primary.
+
+A user only reads from the replica when it already holds their latest
+change: their data version (budget/cache.py) must be older than the time
+the replica is known to be current to, which is the last sync_replica run
+for SQLite and the last replayed transaction for PostgreSQL. Otherwise the
+view reads from the primary, so a response never carries an ETag or
+max-age for data it doesn't contain. After a user POSTs anything,
+ReplicaPinMiddleware also pins that user to the primary for
+REPLICA_PIN_SECONDS.
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .cache import get_data_last_modified
+
+REPLICA_ALIAS = 'replica'
+REPLICA_SYNCED_KEY = 'payflow:replica-synced-at'
+
+_use_replica = ContextVar('payflow_use_replica', default=False)
+
+
+def _pin_key(user_id):
+    return f'payflow:replica-pin:{user_id}'
+
+
+def pin_user_to_primary(user_id):
+    cache.set(_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id):
+    return cache.get(_pin_key(user_id), False)
+
+
+def record_replica_sync(when):
+    """Remember that the SQLite replica holds everything committed before when"""
+    cache.set(REPLICA_SYNCED_KEY, when.timestamp(), None)
+
+
+def replica_synced_at():
+    """Time the replica is current to, or None if that isn't known"""
+    if settings.DATABASES[REPLICA_ALIAS]['ENGINE'] == 'django.db.backends.postgresql':
+        # NULL when the server isn't a standby or hasn't replayed anything
+        with connections[REPLICA_ALIAS].cursor() as cursor:
+            cursor.execute('SELECT pg_last_xact_replay_timestamp()')
+            return cursor.fetchone()[0]
+    synced = cache.get(REPLICA_SYNCED_KEY)
+    return datetime.fromtimestamp(synced, tz=dt_timezone.utc) if synced is not None else None
+
+
+def replica_has_user_data(user_id):
+    """Whether the replica already holds the user's latest change"""
+    if is_pinned_to_primary(user_id):
+        return False
+    synced = replica_synced_at()
+    return synced is not None and get_data_last_modified(user_id) < synced
+
+
+def _should_use_replica(request):
+    if REPLICA_ALIAS not in settings.DATABASES or request.method not in ('GET', 'HEAD'):
+        return False
+    return not request.user.is_authenticated or replica_has_user_data(request.user.pk)
+
+
+def read_from_replica(view_func):
+    """Serve a read-only view from the replica unless the user just wrote.
+
+    Works on async views too: sync_to_async() copies the context, so ORM
+    calls made from the view still see the replica flag.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_wrapped_view(request, *args, **kwargs):
+            if not await sync_to_async(_should_use_replica)(request):
+                return await view_func(request, *args, **kwargs)
+            token = _use_replica.set(True)
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+        return _async_wrapped_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if not _should_use_replica(request):
+            return view_func(request, *args, **kwargs)
+        token = _use_replica.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return _wrapped_view
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and REPLICA_ALIAS in settings.DATABASES:
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary, never migrated on its own
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,132 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .cache import bump_data_version_on_commit
+from .models import Category, Payment, Transaction, MonthlyBudget, BudgetHistory, UserProfile
+from .sync import record_deletion
+
+
+def _related_user_id(instance, field_name):
+    """Owner of a row that only points at a user through a parent row"""
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        return getattr(instance, field_name).user_id
+    parent_id = getattr(instance, field.attname)
+    # Remembered so the other receivers for the same save or delete don't
+    # query again
+    cached = getattr(instance, '_owner', None)
+    if cached is None or cached[0] != parent_id:
+        user_id = field.related_model.objects.filter(pk=parent_id).values_list('user_id', flat=True).first()
+        instance._owner = cached = (parent_id, user_id)
+    return cached[1]
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=MonthlyBudget)
+@receiver(post_delete, sender=MonthlyBudget)
+def bump_owner_version(sender, instance, **kwargs):
+    bump_data_version_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def bump_payment_owner_version(sender, instance, **kwargs):
+    bump_data_version_on_commit(_related_user_id(instance, 'category'))
+
+
+@receiver(post_save, sender=BudgetHistory)
+@receiver(post_delete, sender=BudgetHistory)
+def bump_budget_history_owner_version(sender, instance, **kwargs):
+    bump_data_version_on_commit(_related_user_id(instance, 'budget'))
+
+
+def _deleting_user(origin):
+    # Tombstones of a deleted account would be deleted with it
+    return isinstance(origin, User) or getattr(origin, 'model', None) is User
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=MonthlyBudget)
+def record_owner_tombstone(sender, instance, origin=None, **kwargs):
+    if not _deleting_user(origin):
+        record_deletion(instance, instance.user_id)
+
+
+@receiver(post_delete, sender=Payment)
+def record_payment_tombstone(sender, instance, origin=None, **kwargs):
+    if not _deleting_user(origin):
+        record_deletion(instance, _related_user_id(instance, 'category'))
+
+
+@receiver(post_delete, sender=BudgetHistory)
+def record_budget_history_tombstone(sender, instance, origin=None, **kwargs):
+    if not _deleting_user(origin):
+        record_deletion(instance, _related_user_id(instance, 'budget'))
+
+
+@receiver(pre_delete, sender=Category)
+def touch_orphaned_transactions(sender, instance, origin=None, **kwargs):
+    # on_delete=SET_NULL clears the category with a queryset update, which
+    # leaves updated_at alone; touching the rows first makes them sync again
+    if not _deleting_user(origin):
+        Transaction.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+def _file_fields(model):
+    return [field for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+
+
+@receiver(pre_save, sender=Payment)
+@receiver(pre_save, sender=UserProfile)
+def remember_replaced_files(sender, instance, **kwargs):
+    if instance._state.adding:
+        return
+    fields = _file_fields(sender)
+    old = sender.objects.filter(pk=instance.pk).values(*[field.attname for field in fields]).first() or {}
+    instance._replaced_files = [
+        (field, old[field.attname])
+        for field in fields
+        if old.get(field.attname) and old[field.attname] != getattr(instance, field.attname).name
+    ]
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_save, sender=UserProfile)
+def release_replaced_files(sender, instance, **kwargs):
+    # Released after the new file is saved, so re-uploading the same image
+    # never drops its blob to zero references in between
+    for field, name in getattr(instance, '_replaced_files', ()):
+        transaction.on_commit(lambda field=field, name=name: field.storage.delete(name))
+    instance._replaced_files = []
+
+
+@receiver(post_delete, sender=Payment)
+@receiver(post_delete, sender=UserProfile)
+def release_deleted_files(sender, instance, **kwargs):
+    # Shared files only disappear once no other row references them
+    for field in _file_fields(sender):
+        name = getattr(instance, field.attname).name
+        if name:
+            transaction.on_commit(lambda field=field, name=name: field.storage.delete(name))
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Apply settings.SQLITE_PRAGMAS to every new SQLite connection"""
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    if 'mode=ro' in str(connection.settings_dict['NAME']):
+        # Read-only connections (the replica) can't change the journal mode
+        pragmas = {name: value for name, value in pragmas.items() if name != 'journal_mode'}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
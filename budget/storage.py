@@ -0,0 +1,107 @@
+"""
+Content-addressed, deduplicated media storage.
+
+Users often upload the same screenshot several times. This storage names
+every file after the SHA-256 of its content, so identical uploads share one
+file on disk:
+
+    blobs/3f/a2/3fa2...e91c.jpg
+
+The first two byte pairs of the hash are used as directories, so no single
+directory grows to hundreds of thousands of entries. The hash is computed
+while the upload is streamed to a temporary file, so the file is read once.
+
+Because a file can be shared, each one has a MediaBlob row counting its
+references: save() adds one and delete() drops one. The file is only
+removed from disk when the last reference is gone. The signals in
+budget/signals.py drop the references of deleted and replaced files.
+
+Files saved before this storage was enabled have no MediaBlob row and are
+never deleted by it; `python manage.py dedupe_media` moves them in.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+BLOB_DIR = 'blobs'
+
+
+def blob_name(digest, extension):
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content in _save(); never rename
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1]
+        temp_dir = self.path(os.path.join(BLOB_DIR, 'tmp'))
+        os.makedirs(temp_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+                    temp_file.write(chunk)
+            name = blob_name(digest.hexdigest(), extension)
+            # Count the reference before the file is placed, so a concurrent
+            # delete of the same blob can't remove it from under us. A delete
+            # that got there first has removed the row and the file in one
+            # transaction, so the file is placed again below.
+            self.retain(name, size)
+            path = self.path(name)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def retain(self, name, size=0):
+        """Add a reference to a stored blob"""
+        from .models import MediaBlob
+
+        if MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1):
+            return
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(name=name, size=size, refcount=1)
+        except IntegrityError:
+            MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+    def delete(self, name):
+        """Drop one reference; remove the file once nothing uses it"""
+        from .models import MediaBlob
+
+        if not name:
+            return
+        # The decrement locks the row until the file is gone, so a
+        # concurrent retain() of the same content waits, then finds no row
+        # and no file and stores both again
+        with transaction.atomic():
+            if not MediaBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1):
+                # Not a tracked blob (e.g. an upload from before this storage)
+                return
+            deleted, _ = MediaBlob.objects.filter(name=name, refcount__lte=0).delete()
+            if deleted:
+                super().delete(name)
+
+    def save_existing(self, path):
+        """Store a file from the local filesystem and return its blob name"""
+        with open(path, 'rb') as file:
+            return self.save(os.path.basename(path), File(file))
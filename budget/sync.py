@@ -0,0 +1,138 @@
+"""
+Delta sync: the rows of a user that changed since a cursor.
+
+A client mirroring a user's data keeps the cursor from its last sync and
+asks only for what changed after it, instead of downloading everything
+again. Every synced model has an updated_at column, and deletions leave a
+Tombstone row (see budget/signals.py). Each stream of rows is read in
+(updated_at, id) order, so the cursor holds the position reached in every
+stream, the same way a keyset page continues (see budget/pagination.py).
+
+updated_at is set when a row is saved, not when its transaction commits.
+A transaction that commits late could otherwise add rows behind a cursor
+that was already handed out, so rows changed in the last
+SYNC_SETTLE_SECONDS are left for the next sync.
+
+Tombstones are pruned after SYNC_TOMBSTONE_DAYS (manage.py
+prune_tombstones). A cursor whose last complete sync is older than that
+may have missed deletions and is refused with SyncExpired; the client then
+starts over without a cursor.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import BudgetHistory, Category, MonthlyBudget, Payment, Tombstone, Transaction
+from .pagination import decode_cursor, encode_cursor, keyset_after
+
+SYNC_BATCH_SIZE = 500
+SYNC_SETTLE_SECONDS = 5
+
+Stream = namedtuple('Stream', ['model', 'owner', 'fields'])
+
+# Clients apply the streams in this order, parents before children
+SYNC_STREAMS = {
+    'categories': Stream(Category, 'user', [
+        'id', 'name', 'amount', 'original_amount', 'due_date', 'category_type', 'is_active', 'is_monthly',
+        'payment_status', 'payment_date', 'paid_to_date', 'payment_count', 'last_payment_date',
+        'gcash_number', 'category_id',
+    ]),
+    'payments': Stream(Payment, 'category__user', [
+        'id', 'category_id', 'amount_paid', 'payment_date', 'status', 'payment_method', 'payment_type',
+        'transaction_id', 'gcash_account_used', 'notes',
+    ]),
+    'transactions': Stream(Transaction, 'user', [
+        'id', 'title', 'amount', 'transaction_type', 'category_id', 'date', 'description',
+    ]),
+    'budgets': Stream(MonthlyBudget, 'user', ['id', 'month', 'total_budget']),
+    'budget_history': Stream(BudgetHistory, 'budget__user', ['id', 'budget_id', 'amount_added', 'added_at', 'notes']),
+}
+
+STREAM_NAMES = {stream.model: name for name, stream in SYNC_STREAMS.items()}
+
+
+class SyncExpired(Exception):
+    pass
+
+
+def _cursor_fields():
+    # The time of the last complete sync, then (updated_at, id) per stream
+    # and (deleted_at, id) for the tombstones
+    fields = [Tombstone._meta.get_field('deleted_at')]
+    for stream in SYNC_STREAMS.values():
+        fields += [stream.model._meta.get_field('updated_at'), stream.model._meta.pk]
+    fields += [Tombstone._meta.get_field('deleted_at'), Tombstone._meta.pk]
+    return fields
+
+
+def _read(queryset, time_field, fields, position, until, limit):
+    """Up to limit rows after position, plus the new position"""
+    queryset = queryset.filter(**{f'{time_field}__lte': until})
+    if position[0] is not None:
+        queryset = queryset.filter(keyset_after([time_field, 'id'], position))
+    rows = list(queryset.order_by(time_field, 'id').values_list(*fields, time_field, 'id')[:limit + 1])
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        position = rows[-1][-2:]
+    return [row[:-2] for row in rows], position, more
+
+
+def changes_since(user, cursor=None, batch_size=SYNC_BATCH_SIZE):
+    """Return the user's changes after cursor as a JSON-ready dict.
+
+    Changed rows come as {"fields": [...], "rows": [[...], ...]} per stream
+    and deleted ids as lists per stream; streams without changes are left
+    out. At most batch_size rows are returned; while "more" is true the
+    client should ask again at once with the new cursor. Raises
+    InvalidCursor or SyncExpired for a cursor that can't be continued.
+    """
+    now = timezone.now()
+    until = now - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    fields = _cursor_fields()
+    values = decode_cursor(cursor, fields) if cursor else [None] * len(fields)
+    synced, positions = values[0], [values[i:i + 2] for i in range(1, len(values), 2)]
+    if synced is not None and synced < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        raise SyncExpired('Cursor is too old, sync again without one')
+
+    changes = {}
+    deleted = {}
+    remaining = batch_size
+    more = False
+    for index, (name, stream) in enumerate(SYNC_STREAMS.items()):
+        queryset = stream.model.objects.filter(**{stream.owner: user})
+        rows, positions[index], more = _read(queryset, 'updated_at', stream.fields, positions[index], until, remaining)
+        if rows:
+            changes[name] = {'fields': stream.fields, 'rows': rows}
+            remaining -= len(rows)
+        if more:
+            break
+    else:
+        rows, positions[-1], more = _read(
+            Tombstone.objects.filter(user=user), 'deleted_at', ['stream', 'object_id'], positions[-1], until, remaining
+        )
+        for stream_name, object_id in rows:
+            deleted.setdefault(stream_name, []).append(object_id)
+
+    if not more:
+        synced = until
+    next_cursor = [synced]
+    for position in positions:
+        next_cursor += position
+    # isoformat() keeps the microseconds that DjangoJSONEncoder would cut
+    next_cursor = [value.isoformat() if hasattr(value, 'isoformat') else value for value in next_cursor]
+    return {'changes': changes, 'deleted': deleted, 'cursor': encode_cursor(next_cursor), 'more': more}
+
+
+def record_deletion(instance, user_id):
+    """Leave a tombstone for a deleted synced row"""
+    if user_id is not None:
+        Tombstone.objects.create(user_id=user_id, stream=STREAM_NAMES[type(instance)], object_id=instance.pk)
+
+
+def prune_tombstones(days=None):
+    days = settings.SYNC_TOMBSTONE_DAYS if days is None else days
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
@@ -1,3 +1,871 @@
-from django.test import TestCase
+import inspect
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from payflow.sqlite_cache import CULL_CHECK_INTERVAL, SQLiteCache
+
+from . import api, compression, routers
+from .sync import SyncExpired, changes_since
+from .cache import bump_data_version, get_data_last_modified, get_data_version
+from .models import BudgetHistory, Category, MediaBlob, MonthlyBudget, Payment, Tombstone, Transaction, UserProfile
+from .views import current_month_summary, due_soon_categories, overview_months
+
+# Keep the tests out of the shared SQLite cache file
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+# Pages render without running collectstatic first
+TEST_STORAGES = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ApiQueryBudgetTests(TestCase):
+    """Every /api/v1/ endpoint stays within its @query_budget"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('budget-user', password='pw')
+        other = User.objects.create_user('other-user', password='pw')
+        today = timezone.localdate()
+
+        categories = [
+            Category.objects.create(
+                user=cls.user, name=f'Bill {i}', amount=Decimal('1500.50'), due_date=today + timedelta(days=i % 3)
+            )
+            for i in range(5)
+        ]
+        for category in categories:
+            for days in range(3):
+                Payment.objects.create(
+                    category=category, amount_paid=Decimal('100.25'), payment_date=timezone.now() - timedelta(days=days)
+                )
+        for i, category in enumerate(categories + [None, None]):
+            Transaction.objects.create(
+                user=cls.user, title=f'Expense {i}', amount=Decimal('42.10'), transaction_type='expense',
+                category=category, date=today - timedelta(days=i)
+            )
+        for months in range(3):
+            month = (today.replace(day=1) - timedelta(days=31 * months)).replace(day=1)
+            budget = MonthlyBudget.objects.create(user=cls.user, month=month, total_budget=Decimal('800.00'))
+            BudgetHistory.objects.create(budget=budget, amount_added=Decimal('500.00'))
+            BudgetHistory.objects.create(budget=budget, amount_added=Decimal('300.00'))
+
+        other_category = Category.objects.create(user=other, name='Not mine', amount=10, due_date=today)
+        Payment.objects.create(category=other_category, amount_paid=10, payment_date=timezone.now())
+
+    def fetch(self, name, **params):
+        """Run the endpoint's view body and count its queries against the budget"""
+        view = getattr(api, name)
+        request = RequestFactory().get(f'/api/v1/{name}/', params)
+        request.user = self.user
+        # The decorators around the body (login, conditional GET) are not
+        # part of the budget
+        with self.assertNumQueries(view.query_budget):
+            response = inspect.unwrap(view)(request)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_lists_with_every_include(self):
+        for name, resource in api.API_RESOURCES.items():
+            with self.subTest(name):
+                data = self.fetch(name, include=','.join(resource.includes))
+                self.assertTrue(data['results'])
+                self.assertIsNone(data['next_cursor'])
+
+    def test_paginated_lists(self):
+        for name, resource in api.API_RESOURCES.items():
+            with self.subTest(name):
+                include = ','.join(resource.includes)
+                first = self.fetch(name, include=include, limit=2)
+                self.assertEqual(len(first['results']), 2)
+                second = self.fetch(name, include=include, limit=2, cursor=first['next_cursor'])
+                self.assertTrue(second['results'])
+                seen = {row['id'] for row in first['results']}
+                self.assertFalse(seen & {row['id'] for row in second['results']})
+
+    def test_bulk_fetch_by_ids(self):
+        for name, resource in api.API_RESOURCES.items():
+            with self.subTest(name):
+                ids = list(resource.model.objects.filter(**{resource.owner: self.user}).values_list('id', flat=True))
+                ids.reverse()
+                data = self.fetch(name, include=','.join(resource.includes), ids=','.join(map(str, ids + [99999])))
+                self.assertEqual([row['id'] for row in data['results']], ids)
+                self.assertEqual(data['missing'], [99999])
+
+    def test_embedded_rows(self):
+        categories = self.fetch('categories', include='payments')['results']
+        self.assertTrue(all(len(category['payments']) == 3 for category in categories))
+        transactions = self.fetch('transactions', include='category')['results']
+        self.assertEqual(sum(1 for row in transactions if row['category'] is None), 2)
+        budgets = self.fetch('budgets', include='history')['results']
+        self.assertTrue(all(len(budget['history']) == 2 for budget in budgets))
+
+    def test_money_is_sent_as_decimal_strings(self):
+        payment = self.fetch('payments', include='category', limit=1)['results'][0]
+        self.assertEqual(payment['amount_paid'], '100.25')
+        self.assertEqual(payment['category']['amount'], '1500.50')
+        budget = self.fetch('budgets', include='history', limit=1)['results'][0]
+        self.assertEqual(budget['total_budget'], '800.00')
+        self.assertEqual({row['amount_added'] for row in budget['history']}, {'500.00', '300.00'})
+
+
+# The tests below run on the configured database: SQLite by default and
+# PostgreSQL with DATABASE_URL=postgres://... python manage.py test budget.
+# They cover the queries whose SQL differs between the two.
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class DatabaseParityTests(TestCase):
+    """Grouping, conditional updates and expressions behave alike on every backend"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('parity-user', password='pw')
+        cls.today = timezone.now().date()
+        cls.this_month, cls.last_month = overview_months(cls.today)[:2]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def set_budget(self, amount):
+        return MonthlyBudget.objects.create(user=self.user, month=self.this_month, total_budget=Decimal(amount))
+
+    def add_transaction(self, amount, date, transaction_type='expense', category=None):
+        return Transaction.objects.create(
+            user=self.user, title='Spent', amount=Decimal(amount), transaction_type=transaction_type,
+            category=category, date=date
+        )
+
+    def add_bill(self, name, amount):
+        return Category.objects.create(user=self.user, name=name, amount=Decimal(amount), due_date=self.today)
+
+    def test_monthly_overview_groups_by_month(self):
+        # TruncMonth: the first and last day of a month fall in that month
+        self.set_budget('1000.00')
+        self.add_transaction('10.00', self.this_month)
+        self.add_transaction('20.00', self.today)
+        self.add_transaction('500.00', self.today, transaction_type='income')
+        self.add_transaction('5.50', self.last_month)
+        self.add_transaction('4.50', self.this_month - timedelta(days=1))
+
+        months = {row['month_key']: row for row in self.client.get(reverse('monthly_overview')).json()['months']}
+        this_month = months[self.this_month.strftime('%Y-%m')]
+        last_month = months[self.last_month.strftime('%Y-%m')]
+        self.assertEqual((Decimal(str(this_month['expenses'])), this_month['transaction_count']), (Decimal('30'), 3))
+        self.assertEqual(Decimal(str(this_month['budget'])), Decimal('1000'))
+        self.assertEqual((Decimal(str(last_month['expenses'])), last_month['transaction_count']), (Decimal('10'), 2))
+
+    def test_month_transactions(self):
+        bill = self.add_bill('Water', '15.00')
+        self.add_transaction('15.00', self.today, category=bill)
+        self.add_transaction('3.00', self.this_month)
+
+        data = self.client.get(reverse('month_transactions', args=[self.this_month.strftime('%Y-%m')])).json()
+        self.assertEqual(Decimal(str(data['expenses'])), Decimal('18'))
+        self.assertEqual({row['category_name'] for row in data['transactions']}, {'Water', None})
+        self.assertIn(self.today.isoformat(), {row['date'] for row in data['transactions']})
+
+    def test_toggle_payment_checks_remaining_budget(self):
+        # The UPDATE is conditional on a Coalesce(Subquery) of the expenses
+        self.set_budget('100.00')
+        self.add_transaction('30.00', self.today)
+        cheap = self.add_bill('Internet', '70.00')
+        expensive = self.add_bill('Rent', '70.01')
+        toggle = lambda bill: self.client.post(reverse('toggle_payment_status', args=[bill.id])).json()
+
+        self.assertEqual(toggle(expensive)['status'], 'error')
+        self.assertEqual(toggle(cheap)['new_status'], 'paid')
+        cheap.refresh_from_db()
+        self.assertEqual((cheap.payment_status, cheap.payment_date), ('paid', self.today))
+        self.assertEqual(Transaction.objects.filter(category=cheap).count(), 1)
+
+        self.assertEqual(toggle(cheap)['new_status'], 'unpaid')
+        cheap.refresh_from_db()
+        self.assertEqual((cheap.payment_status, cheap.payment_date), ('unpaid', None))
+
+    def test_toggle_payment_without_budget(self):
+        bill = self.add_bill('Phone', '10.00')
+        response = self.client.post(reverse('toggle_payment_status', args=[bill.id])).json()
+        self.assertEqual(response['status'], 'error')
+        self.assertEqual(Category.objects.get(id=bill.id).payment_status, 'unpaid')
+
+    def test_pay_bills(self):
+        self.set_budget('100.00')
+        bills = [self.add_bill('Power', '30.00'), self.add_bill('Gas', '40.00')]
+        ids = [bill.id for bill in bills]
+
+        response = self.client.post(reverse('pay_bills'), {'category_ids': ids}).json()
+        self.assertEqual(response['status'], 'success')
+        for bill in Category.objects.filter(id__in=ids):
+            self.assertEqual((bill.payment_status, bill.payment_count), ('paid', 1))
+            self.assertEqual(bill.paid_to_date, bill.amount)
+            self.assertEqual(bill.last_payment_date, self.today)
+        self.assertEqual(Payment.objects.filter(category_id__in=ids).count(), 2)
+        self.assertEqual(Transaction.objects.filter(category_id__in=ids).count(), 2)
+
+        # Paying them again changes nothing
+        response = self.client.post(reverse('pay_bills'), {'category_ids': ids}).json()
+        self.assertEqual(response['status'], 'error')
+        self.assertEqual(Payment.objects.filter(category_id__in=ids).count(), 2)
+
+    def test_toggle_and_pay_bills_record_the_same_payment(self):
+        self.set_budget('100.00')
+        toggled, bulk = self.add_bill('Power', '30.00'), self.add_bill('Gas', '30.00')
+        self.client.post(reverse('toggle_payment_status', args=[toggled.id]))
+        self.client.post(reverse('pay_bills'), {'category_ids': [bulk.id]})
+
+        fields = ['payment_status', 'payment_date', 'amount', 'paid_to_date', 'payment_count', 'last_payment_date']
+        state = lambda bill: (
+            Category.objects.filter(id=bill.id).values(*fields).get(),
+            list(Payment.objects.filter(category=bill).values('amount_paid', 'payment_date', 'status', 'payment_method', 'payment_type')),
+            list(Transaction.objects.filter(category=bill).values('amount', 'transaction_type', 'date', 'description')),
+        )
+        self.assertEqual(state(toggled), state(bulk))
+        self.assertEqual(state(toggled)[0]['payment_count'], 1)
+
+    def test_pay_bills_over_budget(self):
+        self.set_budget('50.00')
+        bills = [self.add_bill('Power', '30.00'), self.add_bill('Gas', '40.00')]
+        response = self.client.post(reverse('pay_bills'), {'category_ids': [bill.id for bill in bills]}).json()
+        self.assertEqual(response['status'], 'error')
+        self.assertFalse(Category.objects.filter(user=self.user, payment_status='paid').exists())
+
+    def test_record_payment_keeps_latest_payment_date(self):
+        # Greatest() of a NULL is NULL on SQLite but not on PostgreSQL; the
+        # Coalesce makes the first payment set the date on both
+        bill = self.add_bill('Loan', '100.00')
+        recent = Payment.objects.create(category=bill, amount_paid=Decimal('25.00'), payment_date=self.today, payment_type='partial')
+        bill.record_payment(recent)
+        self.assertEqual((bill.amount, bill.last_payment_date), (Decimal('75.00'), self.today))
+
+        older = Payment.objects.create(category=bill, amount_paid=Decimal('75.00'), payment_date=self.today - timedelta(days=3))
+        bill.record_payment(older)
+        self.assertEqual(bill.last_payment_date, self.today)
+        self.assertEqual((bill.paid_to_date, bill.payment_count, bill.payment_status), (Decimal('100.00'), 2, 'paid'))
+
+    def test_search_is_case_insensitive(self):
+        # icontains is LIKE on SQLite and UPPER(...) LIKE UPPER(...) on PostgreSQL
+        self.add_bill('Electric Company', '10.00')
+        Transaction.objects.create(
+            user=self.user, title='ELECTRIC bill', amount=Decimal('1.00'), transaction_type='expense', date=self.today
+        )
+        response = self.client.get(reverse('search_results'), {'q': 'electric'})
+        self.assertEqual(response.context['categories'].count(), 1)
+        self.assertEqual(response.context['transactions'].count(), 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RowLockingTests(TransactionTestCase):
+    """select_for_update() runs inside the views' own transactions.
+
+    A TransactionTestCase runs each request in autocommit mode, so on
+    PostgreSQL a lock taken outside atomic() fails here instead of being
+    hidden by the test's transaction. SQLite ignores FOR UPDATE.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('locking-user', password='pw')
+        self.client.force_login(self.user)
+        today = timezone.now().date()
+        MonthlyBudget.objects.create(user=self.user, month=today.replace(day=1), total_budget=Decimal('100.00'))
+        self.bill = Category.objects.create(user=self.user, name='Power', amount=Decimal('30.00'), due_date=today)
+
+    def test_backend(self):
+        self.assertIn(connection.vendor, ('sqlite', 'postgresql'))
+
+    def test_pay_bills(self):
+        response = self.client.post(reverse('pay_bills'), {'category_ids': [self.bill.id]}).json()
+        self.assertEqual(response['status'], 'success')
+        self.assertEqual(Category.objects.get(id=self.bill.id).payment_status, 'paid')
+
+    def test_bulk_edit_categories(self):
+        response = self.client.post(
+            reverse('bulk_edit_categories'),
+            json.dumps({'updates': [{'id': self.bill.id, 'amount': '45.00'}]}),
+            content_type='application/json'
+        ).json()
+        self.assertEqual(response['status'], 'success')
+        self.assertEqual(Category.objects.get(id=self.bill.id).amount, Decimal('45.00'))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReplicaRoutingTests(TestCase):
+    """Users only read from the replica once it holds their latest change"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('replica-user', password='pw')
+        self.replica = mock.patch.dict(settings.DATABASES, {routers.REPLICA_ALIAS: {'ENGINE': 'django.db.backends.sqlite3'}})
+        self.replica.start()
+        self.addCleanup(self.replica.stop)
+
+    def test_unknown_sync_time_reads_from_primary(self):
+        self.assertIsNone(routers.replica_synced_at())
+        self.assertFalse(routers.replica_has_user_data(self.user.pk))
+
+    def test_replica_synced_after_the_last_change(self):
+        routers.record_replica_sync(get_data_last_modified(self.user.pk) + timedelta(seconds=1))
+        self.assertTrue(routers.replica_has_user_data(self.user.pk))
+
+    def test_change_after_the_sync_reads_from_primary(self):
+        routers.record_replica_sync(timezone.now() - timedelta(seconds=1))
+        bump_data_version(self.user.pk)
+        self.assertFalse(routers.replica_has_user_data(self.user.pk))
+
+    def test_pinned_user_reads_from_primary(self):
+        routers.record_replica_sync(timezone.now() + timedelta(minutes=1))
+        routers.pin_user_to_primary(self.user.pk)
+        self.assertFalse(routers.replica_has_user_data(self.user.pk))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MediaServingTests(TestCase):
+    """Permission checks and byte ranges of budget/media.py"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, MEDIA_SENDFILE=None)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.content = bytes(range(256)) * 400
+        self.write('profile_pics/logo.1.png', self.content)
+
+    def write(self, name, content):
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(content)
+
+    def test_path_traversal_is_refused(self):
+        self.write('secret.txt', b'secret')
+        for path in ['/media/profile_pics/../secret.txt', '/media/profile_pics/logo.1.png/../../secret.txt',
+                     '/media//etc/passwd', '/media/../payflow/settings.py']:
+            with self.subTest(path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+    def test_public_files_are_served_anonymously(self):
+        response = self.client.get('/media/profile_pics/logo.1.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertIn('public', response['Cache-Control'])
+        # Only the listed names are public, not names that start with them
+        self.write('profile_pics/logo.1.png.bak', b'private')
+        self.assertEqual(self.client.get('/media/profile_pics/logo.1.png.bak').status_code, 404)
+
+    def test_proofs_are_only_shown_to_their_owner(self):
+        name = 'blobs/ab/cd/abcd.png'
+        self.write(name, b'proof')
+        owner = User.objects.create_user('proof-owner', password='pw')
+        category = Category.objects.create(user=owner, name='Rent', amount=10, due_date=timezone.localdate())
+        Payment.objects.create(category=category, amount_paid=10, payment_date=timezone.localdate(), proof_image=name)
+
+        self.assertEqual(self.client.get(f'/media/{name}').status_code, 404)
+        self.client.force_login(User.objects.create_user('someone-else', password='pw'))
+        self.assertEqual(self.client.get(f'/media/{name}').status_code, 404)
+        self.client.force_login(owner)
+        response = self.client.get(f'/media/{name}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_byte_ranges(self):
+        size = len(self.content)
+        response = self.client.get('/media/profile_pics/logo.1.png', HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 0-9/{size}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[:10])
+
+        response = self.client.get('/media/profile_pics/logo.1.png', HTTP_RANGE='bytes=-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes {size - 5}-{size - 1}/{size}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+
+        response = self.client.get('/media/profile_pics/logo.1.png', HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{size}')
+
+    async def test_asgi_streams_in_chunks(self):
+        response = await AsyncClient().get('/media/profile_pics/logo.1.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), self.content)
+
+        response = await AsyncClient().get('/media/profile_pics/logo.1.png', headers={'Range': 'bytes=100-199'})
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response.is_async)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), self.content[100:200])
+
+
+class BrotliPaddingTests(TestCase):
+    """Brotli HTML gets random-length padding against BREACH, JSON doesn't"""
+
+    def setUp(self):
+        # Stand-in for the optional Brotli package that returns its input
+        fake = mock.Mock()
+        fake.compress.side_effect = lambda data, quality: data
+        compressor = fake.Compressor.return_value
+        compressor.process.side_effect = lambda data: data
+        compressor.flush.return_value = b''
+        compressor.finish.return_value = b''
+        patcher = mock.patch.object(compression, 'brotli', fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_html_is_padded(self):
+        html = b'<p>csrf</p>'
+        outputs = [compression.compress(html, 'br', html=True) for _ in range(20)]
+        self.assertTrue(all(output.startswith(html + b'<!--') and output.endswith(b'-->') for output in outputs))
+        self.assertGreater(len({len(output) for output in outputs}), 1)
+
+        streamed = b''.join(compression.compress_stream(iter([b'<p>', b'csrf</p>']), 'br', html=True))
+        self.assertTrue(streamed.startswith(html + b'<!--'))
+
+    def test_json_is_not_padded(self):
+        self.assertEqual(compression.compress(b'{"a":1}', 'br'), b'{"a":1}')
+        self.assertEqual(b''.join(compression.compress_stream(iter([b'{"a":1}']), 'br')), b'{"a":1}')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ContentAddressedStorageTests(TestCase):
+    """Reference counting of budget/storage.py"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_same_content_is_stored_once(self):
+        first = default_storage.save('a.png', ContentFile(b'same bytes'))
+        second = default_storage.save('b.PNG', ContentFile(b'same bytes'))
+        self.assertEqual(first, second)
+        self.assertEqual(MediaBlob.objects.get(name=first).refcount, 2)
+        self.assertNotEqual(default_storage.save('c.png', ContentFile(b'other bytes')), first)
+
+    def test_file_is_removed_with_the_last_reference(self):
+        name = default_storage.save('a.png', ContentFile(b'same bytes'))
+        default_storage.save('b.png', ContentFile(b'same bytes'))
+
+        default_storage.delete(name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 1)
+
+        default_storage.delete(name)
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_missing_file_is_placed_again(self):
+        # What a save finds after losing the race against the last delete
+        name = default_storage.save('a.png', ContentFile(b'same bytes'))
+        os.remove(default_storage.path(name))
+        self.assertEqual(default_storage.save('b.png', ContentFile(b'same bytes')), name)
+        self.assertTrue(default_storage.exists(name))
+
+    def test_untracked_files_are_left_alone(self):
+        path = os.path.join(settings.MEDIA_ROOT, 'payment_proofs', 'old.png')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as file:
+            file.write(b'old upload')
+        default_storage.delete('payment_proofs/old.png')
+        self.assertTrue(os.path.exists(path))
+
+    def test_dedupe_media_marks_rows_changed(self):
+        user = User.objects.create_user('dedupe-user', password='pw')
+        category = Category.objects.create(user=user, name='Rent', amount=10, due_date=timezone.localdate())
+        for name in ['payment_proofs/one.png', 'payment_proofs/two.png']:
+            path = os.path.join(settings.MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(b'same screenshot')
+        payments = [
+            Payment.objects.create(category=category, amount_paid=5, payment_date=timezone.localdate(), proof_image=name)
+            for name in ['payment_proofs/one.png', 'payment_proofs/two.png']
+        ]
+        before = Payment.objects.get(pk=payments[0].pk).updated_at
+
+        call_command('dedupe_media', stdout=io.StringIO())
+        rows = list(Payment.objects.filter(pk__in=[payment.pk for payment in payments]))
+        self.assertEqual(len({row.proof_image.name for row in rows}), 1)
+        self.assertTrue(all(row.updated_at > before for row in rows))
+        self.assertEqual(MediaBlob.objects.get(name=rows[0].proof_image.name).refcount, 2)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class DataVersionTests(TestCase):
+    """Per-user data versions of budget/cache.py"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_bump_gets_a_new_version(self):
+        first = get_data_version(1)
+        versions = [bump_data_version(1) for _ in range(5)]
+        self.assertEqual(versions, sorted(set(versions)))
+        self.assertGreater(versions[0], first)
+        self.assertEqual(get_data_version(1), versions[-1])
+
+    def test_concurrent_bumps_never_share_a_version(self):
+        get_data_version(1)
+        results = []
+
+        def bump():
+            for _ in range(50):
+                results.append(bump_data_version(1))
+
+        threads = [threading.Thread(target=bump) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(results)), 400)
+
+    def test_evicted_counter_starts_above_old_versions(self):
+        old = bump_data_version(1)
+        cache.delete('payflow:data-version:1')
+        self.assertGreater(bump_data_version(1), old)
+
+    def test_last_modified_follows_bumps(self):
+        before = timezone.now() - timedelta(seconds=1)
+        bump_data_version(1)
+        self.assertGreater(get_data_last_modified(1), before)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MemoizedReadTests(TestCase):
+    """The per-user memoized dashboard reads never skip their writes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('memo', password='pw')
+
+    def test_budget_is_created_on_a_cache_hit(self):
+        budget, _ = current_month_summary(self.user)
+        # Deletes bump the data version on commit, which never comes inside
+        # the test transaction, so the next read is a cache hit
+        budget.delete()
+        budget, total = current_month_summary(self.user)
+        self.assertTrue(MonthlyBudget.objects.filter(pk=budget.pk).exists())
+        self.assertEqual(total, 0)
+
+    def test_month_rollover_runs_on_a_cache_hit(self):
+        today = timezone.now().date()
+        category = Category.objects.create(user=self.user, name='Rent', amount=100, due_date=today + timedelta(days=1))
+        self.assertEqual(due_soon_categories(self.user), [category])
+        Category.objects.filter(pk=category.pk).update(
+            payment_status='paid', payment_date=today.replace(day=1) - timedelta(days=1)
+        )
+        due_soon_categories(self.user)
+        category.refresh_from_db()
+        self.assertEqual(category.payment_status, 'unpaid')
+
+
+class SQLiteCacheTests(TestCase):
+    """payflow/sqlite_cache.py, on a fake clock"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.cache = SQLiteCache(os.path.join(directory, 'cache.sqlite3'), {'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_FREQUENCY': 2}})
+        self.now = 1_000_000.0
+        clock = mock.patch('payflow.sqlite_cache.time', mock.Mock(time=lambda: self.now))
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_entries_expire(self):
+        # Expiry times are computed by Django from the real clock
+        with mock.patch('django.core.cache.backends.base.time.time', return_value=self.now):
+            self.cache.set('short', 'value', timeout=10)
+            self.cache.set('forever', 'value', timeout=None)
+        self.now += 9
+        self.assertEqual(self.cache.get('short'), 'value')
+        self.now += 2
+        self.assertIsNone(self.cache.get('short'))
+        self.assertFalse(self.cache.has_key('short'))
+        self.assertEqual(self.cache.get('forever'), 'value')
+
+    def test_add_does_not_overwrite(self):
+        self.assertTrue(self.cache.add('key', 'first'))
+        self.assertFalse(self.cache.add('key', 'second'))
+        self.assertEqual(self.cache.get('key'), 'first')
+
+    def test_add_takes_over_an_expired_entry(self):
+        with mock.patch('django.core.cache.backends.base.time.time', return_value=self.now):
+            self.cache.set('key', 'old', timeout=10)
+        self.now += 11
+        self.assertTrue(self.cache.add('key', 'new'))
+        self.assertEqual(self.cache.get('key'), 'new')
+
+    def test_incr(self):
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.cache.set('count', 5)
+        self.assertEqual(self.cache.incr('count'), 6)
+        self.assertEqual(self.cache.incr('count', 10), 16)
+        self.assertEqual(self.cache.get('count'), 16)
+        self.cache.set('text', 'five')
+        with self.assertRaises(TypeError):
+            self.cache.incr('text')
+
+    def test_least_recently_used_entries_are_culled(self):
+        for i in range(CULL_CHECK_INTERVAL * 2):
+            self.now += 10
+            self.cache.set(f'key-{i}', i)
+            if i % CULL_CHECK_INTERVAL == CULL_CHECK_INTERVAL - 2:
+                # Reading an old entry just before each cull keeps it
+                self.assertEqual(self.cache.get('key-0'), 0)
+        count = self.cache._connection().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+        self.assertLessEqual(count, 10)
+        self.assertEqual(self.cache.get('key-0'), 0)
+        self.assertIsNone(self.cache.get('key-1'))
+        self.assertEqual(self.cache.get(f'key-{CULL_CHECK_INTERVAL * 2 - 1}'), CULL_CHECK_INTERVAL * 2 - 1)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class ImageUploadTests(TestCase):
+    """Uploads refused by budget/uploadhandlers.py show up as form errors"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user('uploader', password='pw')
+        self.client.force_login(self.user)
+
+    def image(self, image_format, size=(64, 64), noise=False):
+        if noise:
+            image = Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3))
+        else:
+            image = Image.new('RGB', size, 'teal')
+        buffer = io.BytesIO()
+        image.save(buffer, image_format)
+        return buffer.getvalue()
+
+    def upload(self, content, name='picture.jpg'):
+        """Post the profile form with the picture; returns the profile_picture errors"""
+        response = self.client.post(reverse('profile'), {
+            'username': 'uploader', 'first_name': 'Up', 'last_name': 'Loader', 'email': 'up@example.com',
+            'profile_picture': SimpleUploadedFile(name, content),
+        })
+        if response.status_code == 302:
+            return []
+        return response.context['form'].errors.get('profile_picture', [])
+
+    def assertNothingSaved(self):
+        self.assertFalse(UserProfile.objects.get(user=self.user).profile_picture)
+
+    def test_valid_jpeg_is_saved(self):
+        content = self.image('JPEG')
+        self.assertEqual(self.upload(content), [])
+        picture = UserProfile.objects.get(user=self.user).profile_picture
+        with picture.open('rb') as file:
+            self.assertEqual(file.read(), content)
+
+    @override_settings(MAX_UPLOAD_SIZE=4096)
+    def test_oversize_upload_is_refused(self):
+        content = self.image('JPEG', size=(256, 256), noise=True)
+        self.assertGreater(len(content), 4096)
+        self.assertEqual(self.upload(content), ['The file is larger than 4.0\xa0KB.'])
+        self.assertNothingSaved()
+
+    def test_non_image_is_refused(self):
+        errors = self.upload(b'%PDF-1.4 not a picture' * 10)
+        self.assertEqual(errors, ['Upload a valid image. The file is not an image or is corrupted.'])
+        self.assertNothingSaved()
+
+    def test_decompression_bomb_is_refused(self):
+        # A real 1x1 PNG whose header claims 20000x20000 pixels
+        content = bytearray(self.image('PNG', size=(1, 1)))
+        content[16:24] = (20000).to_bytes(4, 'big') * 2
+        content[29:33] = zlib.crc32(bytes(content[12:29])).to_bytes(4, 'big')
+        self.assertEqual(self.upload(bytes(content), 'bomb.png'), ['The image has too many pixels.'])
+        self.assertNothingSaved()
+
+    @override_settings(MAX_UPLOAD_PIXELS=1_000_000)
+    def test_too_many_pixels_is_refused(self):
+        errors = self.upload(self.image('PNG', size=(1001, 1000)), 'large.png')
+        self.assertEqual(errors, ['The image is 1001x1000 pixels; the limit is 1 megapixels.'])
+        self.assertNothingSaved()
+
+    def test_disallowed_format_is_refused(self):
+        errors = self.upload(self.image('BMP'), 'picture.bmp')
+        self.assertEqual(errors, ['BMP images are not supported. Use JPEG, PNG, WEBP, GIF.'])
+        self.assertNothingSaved()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SyncTests(TestCase):
+    """Delta sync of budget/sync.py and the sync_changes endpoint"""
+
+    def setUp(self):
+        # Rows written by the test are synced at once
+        settle = mock.patch('budget.sync.SYNC_SETTLE_SECONDS', 0)
+        settle.start()
+        self.addCleanup(settle.stop)
+        self.user = User.objects.create_user('syncer', password='pw')
+        today = timezone.now().date()
+        self.bill = Category.objects.create(user=self.user, name='Rent', amount=100, due_date=today)
+        self.other_bill = Category.objects.create(user=self.user, name='Water', amount=20, due_date=today)
+        self.payment = Payment.objects.create(category=self.bill, amount_paid=10, payment_date=today)
+        self.expense = Transaction.objects.create(
+            user=self.user, title='Rent', amount=10, transaction_type='expense', category=self.bill, date=today
+        )
+        self.cursor = self.sync()['cursor']
+
+    def sync(self, cursor=None):
+        data = changes_since(self.user, cursor)
+        self.assertFalse(data['more'])
+        return data
+
+    def ids(self, data, stream):
+        rows = data['changes'].get(stream, {'rows': []})['rows']
+        return [row[0] for row in rows]
+
+    def test_full_sync_returns_everything(self):
+        data = self.sync()
+        self.assertEqual(self.ids(data, 'categories'), [self.bill.id, self.other_bill.id])
+        self.assertEqual(self.ids(data, 'payments'), [self.payment.id])
+        self.assertEqual(self.ids(data, 'transactions'), [self.expense.id])
+
+    def test_edit_after_the_cursor_is_returned(self):
+        self.assertEqual(self.sync(self.cursor)['changes'], {})
+        self.other_bill.name = 'Water and sewer'
+        self.other_bill.save()
+        data = self.sync(self.cursor)
+        self.assertEqual(list(data['changes']), ['categories'])
+        fields, rows = data['changes']['categories']['fields'], data['changes']['categories']['rows']
+        self.assertEqual([dict(zip(fields, row))['name'] for row in rows], ['Water and sewer'])
+        self.assertEqual(self.sync(data['cursor'])['changes'], {})
+
+    def test_delete_leaves_a_tombstone(self):
+        bill_id = self.bill.id
+        self.bill.delete()
+        data = self.sync(self.cursor)
+        self.assertEqual(data['deleted'], {'categories': [bill_id], 'payments': [self.payment.id]})
+        # The expense lost its category, so it is sent again
+        fields, rows = data['changes']['transactions']['fields'], data['changes']['transactions']['rows']
+        self.assertEqual(dict(zip(fields, rows[0]))['category_id'], None)
+        self.assertEqual(self.sync(data['cursor'])['deleted'], {})
+
+    def test_deleting_the_account_leaves_no_tombstones(self):
+        # The tombstones would go with the account, so none are written
+        self.user.delete()
+        self.assertFalse(Tombstone.objects.exists())
+        self.assertFalse(Category.objects.exists())
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_old_cursor_forces_a_full_resync(self):
+        later = timezone.now() + timedelta(days=settings.SYNC_TOMBSTONE_DAYS + 1)
+        with mock.patch('budget.sync.timezone.now', return_value=later):
+            with self.assertRaises(SyncExpired):
+                changes_since(self.user, self.cursor)
+            self.assertEqual(self.ids(changes_since(self.user), 'categories'), [self.bill.id, self.other_bill.id])
+
+    @override_settings(SYNC_TOMBSTONE_DAYS=0)
+    def test_endpoint_refuses_an_expired_cursor(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('sync_changes'), {'since': self.cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.client.get(reverse('sync_changes'), {'since': 'garbage'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('sync_changes')).status_code, 200)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConditionalGetTests(TestCase):
+    """ETags, Last-Modified and max-age from user_data_conditional"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('conditional', password='pw')
+        self.client.force_login(self.user)
+        today = timezone.now().date()
+        # Enough rows for the JSON to be worth compressing
+        self.bills = [
+            Category.objects.create(user=self.user, name=f'Bill {i}', amount=10, due_date=today) for i in range(10)
+        ]
+        self.url = reverse('api_categories')
+
+    def test_repeat_get_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': response['ETag']}).status_code, 304)
+        self.assertEqual(
+            self.client.get(self.url, headers={'If-Modified-Since': response['Last-Modified']}).status_code, 304
+        )
+
+    def test_write_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        # The data version moves when the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bills[0].name = 'Renamed'
+            self.bills[0].save()
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_only_the_current_version_may_be_reused(self):
+        version = get_data_version(self.user.pk)
+        self.assertIn('max-age=3600', self.client.get(self.url, {'v': version})['Cache-Control'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bills[0].delete()
+        stale = self.client.get(self.url, {'v': version})['Cache-Control']
+        self.assertIn('max-age=0', stale)
+        self.assertIn('private', stale)
+        self.assertIn('max-age=0', self.client.get(self.url)['Cache-Control'])
+
+    def test_compressed_response_has_a_weak_etag(self):
+        plain = self.client.get(self.url)
+        gzipped = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(gzipped['ETag'], 'W/' + plain['ETag'])
+        # Either form revalidates (If-None-Match uses the weak comparison)
+        for etag in (plain['ETag'], gzipped['ETag']):
+            response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES)
+class MeasurePageSizesTests(TestCase):
+    """manage.py measure_page_sizes with a saved baseline"""
+
+    def test_compare_against_an_unminified_baseline(self):
+        User.objects.create_user('measured', password='pw')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        before = os.path.join(directory, 'before.json')
+        call_command('measure_page_sizes', unminified=True, save=before, stdout=io.StringIO())
+        with open(before) as file:
+            unminified = json.load(file)['pages']
+
+        out = io.StringIO()
+        call_command('measure_page_sizes', compare=before, stdout=out)
+        home = next(line for line in out.getvalue().splitlines() if line.startswith('home '))
+        html, change = int(home.split()[1]), int(home.split()[4])
+        self.assertLess(html, unminified['home']['html'])
+        self.assertEqual(change, html - unminified['home']['html'])
+        self.assertIn(f'against {before}', out.getvalue())
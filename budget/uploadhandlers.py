@@ -0,0 +1,103 @@
+"""
+Upload handler that validates images while they are being received.
+
+Django's default handlers keep small uploads in memory and accept anything
+of any size. This handler always streams to a temporary file on disk in
+chunks and checks each upload as it arrives:
+
+* the size is counted per chunk, so an oversized file is refused as soon
+  as it passes MAX_UPLOAD_SIZE instead of after it has been stored;
+* the first bytes are handed to Pillow, which reads only the header to
+  find the format and pixel dimensions, so a non-image or an image with
+  more than MAX_UPLOAD_PIXELS pixels is refused after one chunk.
+
+A refused file is skipped (the rest of the request is still parsed, so the
+form can be redisplayed) and the reason is stored in
+request.rejected_uploads[field_name]; forms using RejectedUploadsMixin turn
+it into a field error.
+"""
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+DEFAULT_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+DEFAULT_MAX_UPLOAD_PIXELS = 40_000_000
+DEFAULT_UPLOAD_IMAGE_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+
+# Give up on finding an image header after this many bytes (large EXIF
+# blocks can push a JPEG's size marker past the first chunk)
+MAX_HEADER_BYTES = 512 * 1024
+
+
+class ValidatingImageUploadHandler(TemporaryFileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = getattr(settings, 'MAX_UPLOAD_SIZE', DEFAULT_MAX_UPLOAD_SIZE)
+        self.max_pixels = getattr(settings, 'MAX_UPLOAD_PIXELS', DEFAULT_MAX_UPLOAD_PIXELS)
+        self.formats = getattr(settings, 'UPLOAD_IMAGE_FORMATS', DEFAULT_UPLOAD_IMAGE_FORMATS)
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+        self.checked = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.reject(f'The file is larger than {filesizeformat(self.max_size)}.')
+        if not self.checked:
+            self.header += raw_data
+            error = self.check_header()
+            if error:
+                self.reject(error)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if not self.checked:
+            # The whole file was smaller than the header Pillow needed.
+            # SkipFile isn't handled at this point, so drop the file by
+            # returning None instead.
+            error = self.check_header(final=True)
+            if error:
+                self.record_rejection(error)
+                self.file.close()
+                return None
+        return super().file_complete(file_size)
+
+    def check_header(self, final=False):
+        """Return why the upload is refused, or None"""
+        try:
+            # Image.open only parses the header; no pixels are decoded
+            with Image.open(BytesIO(self.header)) as image:
+                image_format, (width, height) = image.format, image.size
+        except Image.DecompressionBombError:
+            return 'The image has too many pixels.'
+        except Exception:
+            if final or len(self.header) >= MAX_HEADER_BYTES:
+                return 'Upload a valid image. The file is not an image or is corrupted.'
+            # Not enough of the header yet; try again with the next chunk
+            return None
+
+        self.checked = True
+        self.header = b''
+        if image_format not in self.formats:
+            return f'{image_format} images are not supported. Use {", ".join(self.formats)}.'
+        if width * height > self.max_pixels:
+            return f'The image is {width}x{height} pixels; the limit is {self.max_pixels // 1_000_000} megapixels.'
+        return None
+
+    def record_rejection(self, message):
+        if self.request is not None:
+            if not hasattr(self.request, 'rejected_uploads'):
+                self.request.rejected_uploads = {}
+            self.request.rejected_uploads[self.field_name] = message
+
+    def reject(self, message):
+        self.record_rejection(message)
+        # Drop what was written so far; the temporary file is deleted on close
+        self.file.close()
+        raise SkipFile(message)
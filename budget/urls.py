@@ -1,5 +1,12 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+# Async versions of the read-only JSON endpoints when running under ASGI
+if settings.ASYNC_VIEWS:
+    from . import async_views as api_views
+else:
+    api_views = views
 
 urlpatterns = [
     path('', views.welcome, name='welcome'),
@@ -8,8 +15,11 @@ urlpatterns = [
     path('home/', views.home, name='home'),
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('category/<int:category_id>/', views.category_detail, name='category_detail'),
+    path('category/<int:category_id>/payments/', views.category_payments, name='category_payments'),
     path('category/<int:category_id>/delete/', views.delete_category, name='delete_category'),
     path('category/<int:category_id>/toggle-payment/', views.toggle_payment_status, name='toggle_payment_status'),
+    path('pay-bills/', views.pay_bills, name='pay_bills'),
+    path('categories/bulk-edit/', views.bulk_edit_categories, name='bulk_edit_categories'),
     path('add-category/', views.add_category, name='add_category'),
     path('transactions/', views.transactions, name='transactions'),
     path('profile/', views.profile, name='profile'),
@@ -21,15 +31,24 @@ urlpatterns = [
     path('close-account/', views.close_account, name='close_account'),
     path('toggle-dashboard/', views.toggle_dashboard, name='toggle_dashboard'),
     path('update-budget/', views.update_budget, name='update_budget'),
-    path('monthly-overview/', views.monthly_overview, name='monthly_overview'),
-    path('month-transactions/<str:month_key>/', views.month_transactions, name='month_transactions'),
-    path('unpaid-bills/<int:month>/', views.unpaid_bills, name='unpaid_bills'),
-    path('search-suggestions/', views.search_suggestions, name='search_suggestions'),
+    path('monthly-overview/', api_views.monthly_overview, name='monthly_overview'),
+    path('month-transactions/<str:month_key>/', api_views.month_transactions, name='month_transactions'),
+    path('unpaid-bills/<int:month>/', api_views.unpaid_bills, name='unpaid_bills'),
+    path('search-suggestions/', api_views.search_suggestions, name='search_suggestions'),
+    path('events/', api_views.live_events, name='live_events'),
+    path('sync/', views.sync_changes, name='sync_changes'),
+    path('api/v1/categories/', api.categories, name='api_categories'),
+    path('api/v1/payments/', api.payments, name='api_payments'),
+    path('api/v1/transactions/', api.transactions, name='api_transactions'),
+    path('api/v1/budgets/', api.budgets, name='api_budgets'),
     path('search/', views.search_results, name='search_results'),
     path('admin-search-suggestions/', views.admin_search_suggestions, name='admin_search_suggestions'),
     # SEO and Google verification
     path('google2a6ee76082d4d9c7.html', views.google_verification, name='google_verification'),
     path('sitemap.xml', views.sitemap, name='sitemap'),
+    # Offline support; the worker must be served from the root to control every page
+    path('sw.js', views.service_worker, name='service_worker'),
+    path('manifest.webmanifest', views.web_manifest, name='web_manifest'),
     path('robots.txt', views.robots_txt, name='robots_txt'),
     # Removed legacy GCash payment routes in favor of unified Record Payment modal
 ] 
@@ -3,14 +3,31 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.urls import reverse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import Sum, Q
-from django.db import models
-from datetime import datetime, timedelta
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import condition
+from django.db.models import Count, Sum, Q, F, Value, Subquery, ExpressionWrapper
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db import models, transaction
+from django.forms.models import model_to_dict
+from datetime import datetime, timedelta, time
 from calendar import month_name
 from functools import wraps
+from decimal import Decimal
+import copy
+import hashlib
+import json
 from .models import UserProfile, Category, Payment, Transaction, MonthlyBudget, BudgetHistory
+from .cache import cached_per_user, get_data_version, get_data_last_modified, bump_data_version_on_commit
+from .routers import read_from_replica
+from .pagination import InvalidCursor, keyset_page
+from .sync import SyncExpired, changes_since
+from .responses import FastJsonResponse, dumps
 from .forms import UserRegistrationForm, UserProfileForm, CategoryForm, CategoryEditForm, PaymentForm, MonthlyBudgetForm, AdditionalBudgetForm
 
 
@@ -22,6 +39,38 @@ def redirect_staff_to_admin(view_func):
         return view_func(request, *args, **kwargs)
     return _wrapped_view
 
+# How long the browser may reuse a JSON response fetched with the current
+# data version (?v=...) before asking again
+JSON_CACHE_MAX_AGE = 60 * 60
+
+def _user_data_etag(request, *args, **kwargs):
+    version = get_data_version(request.user.pk)
+    key = f'{request.user.pk}:{version}:{timezone.localdate()}:{request.get_full_path()}'
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+def _user_data_last_modified(request, *args, **kwargs):
+    # Due soon/overdue state also changes when the day rolls over
+    start_of_today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    return max(get_data_last_modified(request.user.pk), start_of_today)
+
+def user_data_conditional(view_func):
+    """Answer unchanged requests with 304 before the view runs any queries.
+
+    ETag and Last-Modified come from the user's data version. Responses are
+    private; a request carrying the current version as ?v= may be reused by
+    the browser for JSON_CACHE_MAX_AGE, anything else is revalidated.
+    """
+    conditional_view = condition(etag_func=_user_data_etag, last_modified_func=_user_data_last_modified)(view_func)
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        current = request.GET.get('v') == str(get_data_version(request.user.pk))
+        patch_cache_control(response, private=True, max_age=JSON_CACHE_MAX_AGE if current else 0)
+        patch_vary_headers(response, ['Cookie'])
+        return response
+    return _wrapped_view
+
 def welcome(request):
     return render(request, 'budget/welcome.html')
 
@@ -68,47 +117,47 @@ def user_login(request):
             messages.error(request, 'Invalid username or password.')
     return render(request, 'budget/login.html')
 
-@login_required
-@redirect_staff_to_admin
-def home(request):
-    # Get user's categories
-    categories = Category.objects.filter(user=request.user, is_active=True)
-    
-    # Reset monthly categories if month has changed
-    for category in categories:
-        if category.is_monthly:
-            category.reset_for_new_month()
-    
-    # Get current month's budget
+@cached_per_user(ttl=60 * 60)
+def current_month_totals(user):
+    """Current month's budget (None if there is none yet) and total expenses"""
     current_month = timezone.now().date().replace(day=1)
-    monthly_budget, created = MonthlyBudget.objects.get_or_create(
-        user=request.user,
-        month=current_month,
-        defaults={'total_budget': 0}
-    )
+    monthly_budget = MonthlyBudget.objects.filter(user=user, month=current_month).first()
     
     # Get total expenses for current month
-    start_date = current_month
-    if current_month.month == 12:
-        end_date = current_month.replace(year=current_month.year + 1, month=1, day=1) - timedelta(days=1)
-    else:
-        end_date = current_month.replace(month=current_month.month + 1, day=1) - timedelta(days=1)
+    start_date, end_date = month_bounds(current_month)
     
     total_expenses = Transaction.objects.filter(
-        user=request.user,
+        user=user,
         transaction_type='expense',
         date__range=[start_date, end_date]
     ).aggregate(total=Sum('amount'))['total'] or 0
     
-    # Refresh categories after potential reset
-    categories = Category.objects.filter(user=request.user, is_active=True)
+    return monthly_budget, total_expenses
+
+def current_month_summary(user):
+    """Current month's budget and total expenses for the dashboard.
+
+    A missing budget is created here, outside the memoized read, so a cached
+    result can't skip it.
+    """
+    monthly_budget, total_expenses = current_month_totals(user)
+    if monthly_budget is None:
+        monthly_budget, created = MonthlyBudget.objects.get_or_create(
+            user=user,
+            month=timezone.now().date().replace(day=1),
+            defaults={'total_budget': 0}
+        )
+    return monthly_budget, total_expenses
+
+@login_required
+@redirect_staff_to_admin
+def home(request):
+    # Resets monthly categories first if the month has changed
+    due_soon = due_soon_categories(request.user)
+    monthly_budget, total_expenses = current_month_summary(request.user)
     
-    # Get due soon categories (unpaid only)
-    due_soon_categories = categories.filter(is_active=True, payment_status='unpaid')
-    due_soon = []
-    for category in due_soon_categories:
-        if category.is_due_soon or category.is_overdue:
-            due_soon.append(category)
+    # Only evaluated when the cached category fragment has to be rendered
+    categories = Category.objects.filter(user=request.user, is_active=True)
     
     context = {
         'categories': categories,
@@ -121,10 +170,11 @@ def home(request):
 
 
 @login_required
+@read_from_replica
 def admin_dashboard(request):
     if not request.user.is_staff:
         return redirect('home')
-    users = User.objects.all().order_by('-date_joined')
+    users = User.objects.select_related('userprofile').order_by('-date_joined')
     
     # Get user profiles for profile pictures
     users_with_profiles = []
@@ -140,11 +190,32 @@ def admin_dashboard(request):
     
     return render(request, 'budget/admin_dashboard.html', {'users_with_profiles': users_with_profiles})
 
+PAYMENTS_PAGE_SIZE = 10
+PAYMENT_ORDERING = ['-payment_date', '-id']
+
+def payment_json(payment):
+    return {
+        'id': payment.id,
+        'amount_paid': payment.amount_paid,
+        'payment_date': payment.payment_date.strftime('%b %d, %Y'),
+        'payment_type': payment.payment_type,
+        'payment_type_display': payment.get_payment_type_display(),
+        'payment_method': payment.payment_method,
+        'gcash_account_used': payment.gcash_account_used,
+        'transaction_id': payment.transaction_id,
+        'proof_url': payment.proof_display_url,
+        'proof_thumbnail_url': payment.proof_thumbnail_url,
+    }
+
 @login_required
 @redirect_staff_to_admin
 def category_detail(request, category_id):
     category = get_object_or_404(Category, id=category_id, user=request.user)
-    payments = Payment.objects.filter(category=category).order_by('-payment_date')
+    # Only the first page is rendered here; the rest is fetched on demand
+    # from category_payments
+    payments, next_cursor = keyset_page(
+        Payment.objects.filter(category=category), PAYMENT_ORDERING, page_size=PAYMENTS_PAGE_SIZE
+    )
     
     # Reset monthly category if month has changed
     if category.is_monthly:
@@ -155,11 +226,19 @@ def category_detail(request, category_id):
         if 'edit_category' in request.POST:
             form = CategoryEditForm(request.POST, instance=category)
             if form.is_valid():
-                form.save()
+                category = form.save(commit=False)
+                if 'amount' in form.changed_data:
+                    # An edited amount starts the bill over
+                    category.original_amount = category.amount
+                category.save()
                 messages.success(request, 'Category updated successfully!')
                 return redirect('category_detail', category_id=category.id)
         elif 'record_payment' in request.POST:
-            payment_form = PaymentForm(request.POST, request.FILES, category=category)
+            payment_form = PaymentForm(
+                request.POST, request.FILES,
+                category=category,
+                rejected_uploads=getattr(request, 'rejected_uploads', None)
+            )
             if payment_form.is_valid():
                 payment = payment_form.save(commit=False)
                 payment.category = category
@@ -173,6 +252,7 @@ def category_detail(request, category_id):
                     context = {
                         'category': category,
                         'payments': payments,
+                        'next_cursor': next_cursor,
                         'form': form,
                         'payment_form': payment_form,
                     }
@@ -188,18 +268,12 @@ def category_detail(request, category_id):
                 if payment.amount_paid > remaining_budget:
                     messages.error(request, 'Not enough balance in your monthly budget to process this payment.')
                     return redirect('home')
-                payment.save()
-                
-                # Handle full vs partial payment
-                if payment.payment_type == 'full':
-                    # Mark category as paid
-                    category.mark_as_paid()
-                    messages.success(request, 'PAYMENT_SUCCESS')
-                else:
-                    # Partial payment - reduce category amount but keep due date
-                    category.amount -= payment.amount_paid
-                    category.save()
-                    messages.success(request, 'PAYMENT_SUCCESS')
+                with transaction.atomic():
+                    payment.save()
+                    # Full payment marks the bill paid; partial payment reduces
+                    # the amount but keeps the due date
+                    category.record_payment(payment)
+                messages.success(request, 'PAYMENT_SUCCESS')
                 
                 # Create transaction record
                 payment_label = 'Full Payment' if payment.payment_type == 'full' else 'Partial Payment'
@@ -222,6 +296,12 @@ def category_detail(request, category_id):
                 )
                 
                 return redirect('category_detail', category_id=category.id)
+            else:
+                # The payment form lives in a modal, so report its errors as messages
+                for field, errors in payment_form.errors.items():
+                    for error in errors:
+                        messages.error(request, f'{field}: {error}')
+                return redirect('category_detail', category_id=category.id)
     else:
         form = CategoryEditForm(instance=category)
         payment_form = PaymentForm(category=category)
@@ -229,11 +309,38 @@ def category_detail(request, category_id):
     context = {
         'category': category,
         'payments': payments,
+        'next_cursor': next_cursor,
         'form': form,
         'payment_form': payment_form,
     }
     return render(request, 'budget/category_detail.html', context)
 
+@login_required
+@redirect_staff_to_admin
+@user_data_conditional
+@read_from_replica
+def category_payments(request, category_id):
+    """API endpoint for one page of a category's payment history.
+
+    Pass the next_cursor of the previous page as ?cursor= to get the page
+    after it.
+    """
+    if not Category.objects.filter(id=category_id, user=request.user).exists():
+        return FastJsonResponse({'error': 'Category not found'}, status=404)
+    try:
+        payments, next_cursor = keyset_page(
+            Payment.objects.filter(category_id=category_id),
+            PAYMENT_ORDERING,
+            cursor=request.GET.get('cursor'),
+            page_size=PAYMENTS_PAGE_SIZE
+        )
+    except InvalidCursor:
+        return FastJsonResponse({'error': 'Invalid cursor'}, status=400)
+    return FastJsonResponse({
+        'payments': [payment_json(payment) for payment in payments],
+        'next_cursor': next_cursor
+    })
+
 @login_required
 @redirect_staff_to_admin
 def add_category(request):
@@ -295,7 +402,11 @@ def profile(request):
         profile = UserProfile.objects.create(user=request.user)
     
     if request.method == 'POST':
-        form = UserProfileForm(request.POST, request.FILES, instance=profile)
+        form = UserProfileForm(
+            request.POST, request.FILES,
+            instance=profile,
+            rejected_uploads=getattr(request, 'rejected_uploads', None)
+        )
         if form.is_valid():
             # Check if username is unique (excluding current user)
             new_username = form.cleaned_data['username']
@@ -347,23 +458,9 @@ def close_account(request):
         user = request.user
         username = user.username  # Store username for confirmation message
         
-        # Delete all user data in the correct order to avoid foreign key constraints
-        # 1. Delete all transactions
-        Transaction.objects.filter(user=user).delete()
-        
-        # 2. Delete all payments (related to categories)
-        Payment.objects.filter(category__user=user).delete()
-        
-        # 3. Delete all categories
-        Category.objects.filter(user=user).delete()
-        
-        # 4. Delete all monthly budgets
-        MonthlyBudget.objects.filter(user=user).delete()
-        
-        # 5. Delete user profile
-        UserProfile.objects.filter(user=user).delete()
-        
-        # 6. Finally, delete the user account itself
+        # Deleting the user cascades to all of their data. Deleting it here
+        # through querysets first would make the delta-sync receivers write
+        # tombstones for rows of an account that is about to go away.
         user.delete()
         
         messages.success(request, f'Account "{username}" has been permanently deleted.')
@@ -379,184 +476,385 @@ def toggle_dashboard(request):
     if request.method == 'POST':
         # This would typically be stored in user preferences or session
         # For now, we'll just return a success response
-        return JsonResponse({'status': 'success'})
-    return JsonResponse({'status': 'error'})
+        return FastJsonResponse({'status': 'success'})
+    return FastJsonResponse({'status': 'error'})
+
+def month_bounds(month_date):
+    """First and last day of the month containing month_date"""
+    start_date = month_date.replace(day=1)
+    if start_date.month == 12:
+        end_date = start_date.replace(year=start_date.year + 1, month=1, day=1) - timedelta(days=1)
+    else:
+        end_date = start_date.replace(month=start_date.month + 1, day=1) - timedelta(days=1)
+    return start_date, end_date
+
+def remaining_budget_expression(user, month_date):
+    """Remaining budget for the month as a SQL subquery (NULL if no budget is set)"""
+    start_date, end_date = month_bounds(month_date)
+    expenses = Transaction.objects.filter(
+        user=user,
+        transaction_type='expense',
+        date__range=[start_date, end_date]
+    ).order_by().values('user').annotate(total=Sum('amount')).values('total')
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+    remaining = MonthlyBudget.objects.filter(user=user, month=start_date).annotate(
+        remaining=ExpressionWrapper(
+            F('total_budget') - Coalesce(Subquery(expenses, output_field=money), Value(Decimal('0')), output_field=money),
+            output_field=money,
+        )
+    ).values('remaining')[:1]
+    return Subquery(remaining, output_field=money)
+
+def remaining_budget(user, month_date):
+    """Remaining budget for the month, or None if no budget is set"""
+    return MonthlyBudget.objects.filter(
+        user=user,
+        month=month_date.replace(day=1)
+    ).annotate(
+        remaining=remaining_budget_expression(user, month_date)
+    ).values_list('remaining', flat=True).first()
+
+def paid_bill_changes(today):
+    """UPDATE arguments that mark unpaid bills paid in full with cash today"""
+    return {
+        'payment_status': 'paid',
+        'payment_date': today,
+        'paid_to_date': F('paid_to_date') + F('amount'),
+        'payment_count': F('payment_count') + 1,
+        'last_payment_date': today,
+        'updated_at': timezone.now(),
+    }
+
+def record_cash_payments(user, categories, today):
+    """Insert the expense transactions and payments for bills marked paid with paid_bill_changes()"""
+    Transaction.objects.bulk_create([
+        Transaction(
+            user=user,
+            title=f"Payment for {category.name}",
+            amount=category.amount,
+            transaction_type='expense',
+            category_id=category.id,
+            date=today,
+            description="The payment was processed through cash"
+        )
+        for category in categories
+    ])
+    Payment.objects.bulk_create([
+        Payment(
+            category_id=category.id,
+            amount_paid=category.amount,
+            payment_date=today,
+            status='paid',
+            payment_method='cash',
+            payment_type='full'
+        )
+        for category in categories
+    ])
 
 @login_required
 @redirect_staff_to_admin
 def toggle_payment_status(request, category_id):
-    """Toggle payment status of a category"""
+    """Toggle payment status of a category.
+
+    Runs as one transaction with conditional UPDATEs, so a double click can
+    never mark a bill paid twice or record two expense transactions.
+    """
     if request.method == 'POST':
-        category = get_object_or_404(Category, id=category_id, user=request.user)
-        
+        category = get_object_or_404(
+            Category.objects.only('id', 'name', 'amount', 'payment_status'),
+            id=category_id,
+            user=request.user
+        )
+        today = timezone.now().date()
+
         if category.payment_status == 'unpaid':
-            # Budget check for instant paid action
-            current_month = timezone.now().replace(day=1)
-            try:
-                monthly_budget = MonthlyBudget.objects.get(user=request.user, month=current_month)
-                remaining_budget = monthly_budget.remaining_budget
-            except MonthlyBudget.DoesNotExist:
-                remaining_budget = 0
-            if category.amount > remaining_budget:
-                return JsonResponse({
+            with transaction.atomic():
+                # Mark as paid only if still unpaid and the budget covers it
+                updated = Category.objects.filter(
+                    id=category.id,
+                    user=request.user,
+                    payment_status='unpaid',
+                    amount__lte=remaining_budget_expression(request.user, today)
+                ).update(**paid_bill_changes(today))
+                
+                if updated:
+                    # Same records as pay_bills
+                    record_cash_payments(request.user, [category], today)
+            
+            if not updated:
+                if Category.objects.filter(id=category.id, payment_status='paid').exists():
+                    # Another request (e.g. a double click) already paid it
+                    return FastJsonResponse({
+                        'status': 'success',
+                        'new_status': 'paid',
+                        'message': f'{category.name} is already marked as paid.'
+                    })
+                return FastJsonResponse({
                     'status': 'error',
                     'message': 'Not enough balance in your monthly budget to process this payment.'
                 })
-            # Mark as paid
-            category.mark_as_paid()
             
-            # Create transaction record
-            Transaction.objects.create(
-                user=request.user,
-                title=f"Payment for {category.name}",
-                amount=category.amount,
-                transaction_type='expense',
-                category=category,
-                date=category.payment_date,
-                description="The payment was processed through cash"
-            )
-            
-            return JsonResponse({
+            bump_data_version_on_commit(request.user.pk)
+            return FastJsonResponse({
                 'status': 'success',
                 'new_status': 'paid',
                 'message': f'{category.name} marked as paid!'
             })
         else:
             # Mark as unpaid
-            category.payment_status = 'unpaid'
-            category.payment_date = None
-            category.save()
-            return JsonResponse({
+            Category.objects.filter(
+                id=category.id,
+                user=request.user,
+                payment_status='paid'
+            ).update(payment_status='unpaid', payment_date=None, updated_at=timezone.now())
+            bump_data_version_on_commit(request.user.pk)
+            return FastJsonResponse({
                 'status': 'success',
                 'new_status': 'unpaid',
                 'message': f'{category.name} marked as unpaid!'
             })
     
-    return JsonResponse({'status': 'error', 'message': 'Invalid request method'})
+    return FastJsonResponse({'status': 'error', 'message': 'Invalid request method'})
 
 @login_required
 @redirect_staff_to_admin
-def monthly_overview(request):
-    """API endpoint to get monthly overview data for the last 12 months"""
-    from datetime import datetime, timedelta
-    from calendar import month_name
+def pay_bills(request):
+    """Pay several unpaid bills at once.
+
+    Checks the combined amount against the remaining budget once, marks the
+    bills paid with one UPDATE and records their transactions and payments
+    with bulk inserts, all in one database transaction.
+    """
+    if request.method != 'POST':
+        return FastJsonResponse({'status': 'error', 'message': 'Invalid request method'})
     
-    months = []
+    try:
+        category_ids = {int(value) for value in request.POST.getlist('category_ids')}
+    except ValueError:
+        return FastJsonResponse({'status': 'error', 'message': 'Invalid bill selection.'}, status=400)
+    if not category_ids:
+        return FastJsonResponse({'status': 'error', 'message': 'No bills selected.'})
     
-    # Get the last 12 months
-    current_date = timezone.now().date()
-    for i in range(12):
-        # Calculate month date (first day of the month)
-        if current_date.month - i <= 0:
-            month_date = current_date.replace(year=current_date.year - 1, month=12 + (current_date.month - i), day=1)
-        else:
-            month_date = current_date.replace(month=current_date.month - i, day=1)
-        
-        # Get budget for this month
-        try:
-            budget = MonthlyBudget.objects.get(user=request.user, month=month_date)
-            budget_amount = budget.total_budget
-        except MonthlyBudget.DoesNotExist:
-            budget_amount = 0
+    today = timezone.now().date()
+    with transaction.atomic():
+        categories = list(
+            Category.objects.select_for_update().filter(
+                id__in=category_ids,
+                user=request.user,
+                is_active=True,
+                payment_status='unpaid'
+            ).only('id', 'name', 'amount')
+        )
+        if not categories:
+            return FastJsonResponse({'status': 'error', 'message': 'The selected bills are already paid.'})
         
-        # Get expenses for this month
-        if month_date.month == 12:
-            end_date = month_date.replace(year=month_date.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            end_date = month_date.replace(month=month_date.month + 1, day=1) - timedelta(days=1)
+        total = sum(category.amount for category in categories)
+        remaining = remaining_budget(request.user, today)
+        if remaining is None or total > remaining:
+            return FastJsonResponse({
+                'status': 'error',
+                'message': 'Not enough balance in your monthly budget to pay the selected bills.'
+            })
         
-        expenses = Transaction.objects.filter(
-            user=request.user,
-            transaction_type='expense',
-            date__range=[month_date, end_date]
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        updated = Category.objects.filter(
+            id__in=[category.id for category in categories],
+            payment_status='unpaid'
+        ).update(**paid_bill_changes(today))
+        if updated != len(categories):
+            # Some bill was paid by another request in the meantime
+            transaction.set_rollback(True)
+            return FastJsonResponse({'status': 'error', 'message': 'Your bills changed, please try again.'})
         
-        # Get transaction count for this month
-        transaction_count = Transaction.objects.filter(
+        record_cash_payments(request.user, categories, today)
+        bump_data_version_on_commit(request.user.pk)
+    
+    paid_ids = {category.id for category in categories}
+    return FastJsonResponse({
+        'status': 'success',
+        'paid': [{'id': category.id, 'name': category.name, 'amount': category.amount} for category in categories],
+        'skipped': sorted(category_ids - paid_ids),
+        'total': total,
+        'message': f'{len(categories)} bill(s) marked as paid!'
+    })
+
+MAX_BULK_EDIT_ITEMS = 500
+
+@login_required
+@redirect_staff_to_admin
+def bulk_edit_categories(request):
+    """Apply a batch of partial category edits.
+
+    Expects a JSON body like {"updates": [{"id": 1, "due_date": "2024-07-05"},
+    {"id": 2, "amount": "1500.00"}]}. Each item is validated with
+    CategoryEditForm on top of the category's current values; the valid ones
+    are saved with one bulk_update in one database transaction and every item
+    gets its own result.
+    """
+    if request.method != 'POST':
+        return FastJsonResponse({'status': 'error', 'message': 'Invalid request method'})
+    
+    try:
+        updates = json.loads(request.body)['updates']
+        if not isinstance(updates, list) or not all(isinstance(item, dict) for item in updates):
+            raise ValueError
+        ids = [int(item['id']) for item in updates]
+    except (ValueError, KeyError, TypeError):
+        return FastJsonResponse({'status': 'error', 'message': 'Invalid update list.'}, status=400)
+    if not updates:
+        return FastJsonResponse({'status': 'error', 'message': 'No updates given.'})
+    if len(updates) > MAX_BULK_EDIT_ITEMS:
+        return FastJsonResponse({
+            'status': 'error',
+            'message': f'At most {MAX_BULK_EDIT_ITEMS} categories can be edited at once.'
+        }, status=400)
+    
+    form_fields = CategoryEditForm._meta.fields
+    results = []
+    changed = {}
+    with transaction.atomic():
+        categories = Category.objects.select_for_update().filter(
             user=request.user,
-            date__range=[month_date, end_date]
-        ).count()
+            id__in=ids
+        ).in_bulk()
+        for category_id, item in zip(ids, updates):
+            category = categories.get(category_id)
+            if category is None:
+                results.append({'id': category_id, 'ok': False, 'errors': {'id': ['Category not found.']}})
+                continue
+            unknown = set(item) - set(form_fields) - {'id'}
+            if unknown:
+                results.append({
+                    'id': category_id,
+                    'ok': False,
+                    'errors': {field: ['This field cannot be edited.'] for field in sorted(unknown)}
+                })
+                continue
+            data = model_to_dict(category, fields=form_fields)
+            data.update({field: value for field, value in item.items() if field != 'id'})
+            # Validation writes the values onto the form's instance, so it
+            # gets a copy; an invalid item must not leak into a later one
+            # for the same category or into the bulk_update
+            form = CategoryEditForm(data, instance=copy.copy(category))
+            if not form.is_valid():
+                results.append({'id': category_id, 'ok': False, 'errors': {field: list(errors) for field, errors in form.errors.items()}})
+                continue
+            for field in form.changed_data:
+                setattr(category, field, form.cleaned_data[field])
+            changed.setdefault(category_id, set()).update(form.changed_data)
+            if 'amount' in form.changed_data:
+                category.original_amount = category.amount
+                changed[category_id].add('original_amount')
+            results.append({'id': category_id, 'ok': True, 'changed': form.changed_data})
         
-        months.append({
+        fields = sorted(set().union(*changed.values())) if changed else []
+        if fields:
+            # bulk_update() doesn't apply auto_now
+            now = timezone.now()
+            for category_id in changed:
+                categories[category_id].updated_at = now
+            Category.objects.bulk_update([categories[category_id] for category_id in changed], fields + ['updated_at'])
+            bump_data_version_on_commit(request.user.pk)
+    
+    failed = sum(1 for result in results if not result['ok'])
+    return FastJsonResponse(
+        {'status': 'success' if not failed else 'partial', 'updated': len(results) - failed, 'failed': failed, 'results': results}
+    )
+
+def overview_months(today):
+    """First day of each of the last 12 months, newest first"""
+    months = []
+    for i in range(12):
+        if today.month - i <= 0:
+            months.append(today.replace(year=today.year - 1, month=12 + (today.month - i), day=1))
+        else:
+            months.append(today.replace(month=today.month - i, day=1))
+    return months
+
+def monthly_overview_queries(user, months):
+    """Budgets and per-month transaction totals for the overview.
+
+    Two grouped queries instead of three per month; the async view runs
+    them concurrently.
+    """
+    budgets = MonthlyBudget.objects.filter(user=user, month__in=months).values_list('month', 'total_budget')
+    totals = Transaction.objects.filter(
+        user=user,
+        date__range=[months[-1], month_bounds(months[0])[1]]
+    ).annotate(month=TruncMonth('date')).order_by().values('month').annotate(
+        expenses=Sum('amount', filter=Q(transaction_type='expense')),
+        transaction_count=Count('id')
+    )
+    return budgets, totals
+
+def monthly_overview_data(months, budgets, totals):
+    budgets = dict(budgets)
+    totals = {row['month']: row for row in totals}
+    data = []
+    for month_date in months:
+        month_totals = totals.get(month_date, {})
+        data.append({
             'month_key': f"{month_date.year}-{month_date.month:02d}",
             'month_name': month_name[month_date.month] + ' ' + str(month_date.year),
-            'budget': float(budget_amount),
-            'expenses': float(expenses),
-            'transaction_count': transaction_count
+            'budget': budgets.get(month_date, 0),
+            'expenses': month_totals.get('expenses') or 0,
+            'transaction_count': month_totals.get('transaction_count', 0)
         })
-    
-    return JsonResponse({'months': months})
+    return {'months': data}
 
 @login_required
 @redirect_staff_to_admin
+@user_data_conditional
+@read_from_replica
+def monthly_overview(request):
+    """API endpoint to get monthly overview data for the last 12 months"""
+    months = overview_months(timezone.now().date())
+    budgets, totals = monthly_overview_queries(request.user, months)
+    return FastJsonResponse(monthly_overview_data(months, budgets, totals))
+
+def parse_month_key(month_key):
+    """First and last day of a 'YYYY-MM' month; raises ValueError if invalid"""
+    year, month = month_key.split('-')
+    return month_bounds(datetime(int(year), int(month), 1).date())
+
+def month_transactions_queries(user, month_date, end_date):
+    """Querysets behind month_transactions; they don't depend on each other"""
+    budget = MonthlyBudget.objects.filter(user=user, month=month_date).values_list('total_budget', flat=True)
+    history = BudgetHistory.objects.filter(budget__user=user, budget__month=month_date).order_by('-added_at').values(
+        'notes', amount=F('amount_added'), date=F('added_at')
+    )
+    expenses = Transaction.objects.filter(
+        user=user,
+        transaction_type='expense',
+        date__range=[month_date, end_date]
+    )
+    # Dates are sent as ISO strings and formatted by the browser
+    transactions = Transaction.objects.filter(
+        user=user,
+        date__range=[month_date, end_date]
+    ).order_by('-date').values(
+        'title', 'amount', 'transaction_type', 'date', 'description', category_name=F('category__name')
+    )
+    return budget, history, expenses, transactions
+
+@login_required
+@redirect_staff_to_admin
+@user_data_conditional
+@read_from_replica
 def month_transactions(request, month_key):
     """API endpoint to get transactions for a specific month"""
-    from datetime import datetime, timedelta
-    from calendar import month_name
-    
     try:
-        year, month = month_key.split('-')
-        year, month = int(year), int(month)
-        
-        # Calculate month date range
-        month_date = datetime(year, month, 1).date()
-        if month == 12:
-            end_date = month_date.replace(year=month_date.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            end_date = month_date.replace(month=month_date.month + 1, day=1) - timedelta(days=1)
-        
-        # Get budget for this month
-        try:
-            budget = MonthlyBudget.objects.get(user=request.user, month=month_date)
-            budget_amount = budget.total_budget
-            
-            # Get budget history for this month
-            budget_history = BudgetHistory.objects.filter(budget=budget).order_by('-added_at')
-            history_data = []
-            for entry in budget_history:
-                history_data.append({
-                    'amount': float(entry.amount_added),
-                    'date': entry.added_at.strftime('%B %d, %Y %I:%M %p'),
-                    'notes': entry.notes or 'No notes'
-                })
-        except MonthlyBudget.DoesNotExist:
-            budget_amount = 0
-            history_data = []
-        
-        # Get expenses for this month
-        expenses = Transaction.objects.filter(
-            user=request.user,
-            transaction_type='expense',
-            date__range=[month_date, end_date]
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Get all transactions for this month
-        transactions = Transaction.objects.filter(
-            user=request.user,
-            date__range=[month_date, end_date]
-        ).order_by('-date')
-        
-        transactions_data = []
-        for transaction in transactions:
-            transactions_data.append({
-                'title': transaction.title,
-                'amount': float(transaction.amount),
-                'transaction_type': transaction.transaction_type,
-                'date': transaction.date.strftime('%B %d, %Y'),
-                'category': transaction.category.name if transaction.category else None,
-                'description': transaction.description
-            })
-        
-        return JsonResponse({
-            'month_name': month_name[month] + ' ' + str(year),
-            'budget': float(budget_amount),
-            'expenses': float(expenses),
-            'transactions': transactions_data,
-            'budget_history': history_data
-        })
-        
+        month_date, end_date = parse_month_key(month_key)
     except (ValueError, IndexError):
-        return JsonResponse({'error': 'Invalid month format'}, status=400)
+        return FastJsonResponse({'error': 'Invalid month format'}, status=400)
+    
+    budget, history, expenses, transactions = month_transactions_queries(request.user, month_date, end_date)
+    return FastJsonResponse({
+        'month_name': month_name[month_date.month] + ' ' + str(month_date.year),
+        'budget': budget.first() or 0,
+        'expenses': expenses.aggregate(total=Sum('amount'))['total'] or 0,
+        'transactions': transactions,
+        'budget_history': history
+    })
 
 @login_required
 @redirect_staff_to_admin
@@ -676,70 +974,103 @@ def process_gcash_payment(request, category_id):
     # Legacy route removed; redirect to category_detail
     return redirect('category_detail', category_id=category_id)
 
+def unpaid_bills_queryset(user, month_num):
+    """Unpaid active categories due in the given month of this year"""
+    return Category.objects.filter(
+        user=user, 
+        is_active=True, 
+        payment_status='unpaid',
+        due_date__month=month_num,
+        due_date__year=timezone.now().year
+    )
+
+def unpaid_bills_data(month_num, categories):
+    unpaid_categories = []
+    for category in categories:
+        # Include categories that are due soon or overdue
+        if category.is_due_soon or category.is_overdue:
+            status = 'overdue' if category.is_overdue else 'due_soon'
+            unpaid_categories.append({
+                'id': category.id,
+                'name': category.name,
+                'amount': category.amount,
+                'due_date': category.due_date,
+                'category_type': category.get_category_type_display(),
+                'is_monthly': category.is_monthly,
+                'status': status
+            })
+    return {
+        'month_name': month_name[month_num],
+        'unpaid_bills': unpaid_categories
+    }
+
 @login_required
 @redirect_staff_to_admin
+@user_data_conditional
 def unpaid_bills(request, month):
     """API endpoint to get unpaid bills for a specific month"""
-    from calendar import month_name
-    
-    try:
-        month_num = int(month)
-        if month_num < 1 or month_num > 12:
-            return JsonResponse({'error': 'Invalid month'}, status=400)
-        
-        current_year = timezone.now().year
-        
-        # Get all unpaid categories that are due soon or overdue
-        categories = Category.objects.filter(
-            user=request.user, 
-            is_active=True, 
-            payment_status='unpaid',
-            due_date__month=month_num,
-            due_date__year=current_year
-        )
-        
-        unpaid_categories = []
-        for category in categories:
-            # Include categories that are due soon or overdue
-            if category.is_due_soon or category.is_overdue:
-                status = 'overdue' if category.is_overdue else 'due_soon'
-                unpaid_categories.append({
-                    'id': category.id,
-                    'name': category.name,
-                    'amount': float(category.amount),
-                    'due_date': category.due_date.strftime('%B %d, %Y'),
-                    'category_type': category.get_category_type_display(),
-                    'is_monthly': category.is_monthly,
-                    'status': status
-                })
-        
-        return JsonResponse({
-            'month_name': month_name[month_num],
-            'unpaid_bills': unpaid_categories
-        })
-        
-    except ValueError:
-        return JsonResponse({'error': 'Invalid month format'}, status=400)
+    month_num = int(month)
+    if month_num < 1 or month_num > 12:
+        return FastJsonResponse({'error': 'Invalid month'}, status=400)
+    return FastJsonResponse(unpaid_bills_data(month_num, unpaid_bills_queryset(request.user, month_num)))
 
-@login_required
-@redirect_staff_to_admin
-def search_suggestions(request):
-    """API endpoint for search suggestions"""
-    query = request.GET.get('q', '').strip().lower()
-    if not query:
-        return JsonResponse({'results': []})
-    
-    results = []
-    
-    # Search categories
+SEARCH_MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 
+                 'july', 'august', 'september', 'october', 'november', 'december']
+
+SEARCH_CATEGORY_TYPES = ['rent', 'utilities', 'groceries', 'transportation', 'entertainment', 
+                         'healthcare', 'education', 'insurance', 'savings', 'other']
+
+def search_suggestion_queries(user, query):
+    """Querysets behind search_suggestions; they don't depend on each other.
+
+    month_counts and type_counts are (key, queryset) pairs to count.
+    """
     categories = Category.objects.filter(
-        user=request.user, 
+        user=user, 
         is_active=True
     ).filter(
         Q(name__icontains=query) | 
         Q(category_type__icontains=query)
     )[:5]
+    transactions = Transaction.objects.filter(
+        user=user
+    ).filter(
+        Q(title__icontains=query) |
+        Q(description__icontains=query)
+    )[:5]
+    payments = Payment.objects.filter(
+        category__user=user
+    ).filter(
+        Q(category__name__icontains=query)
+    ).select_related('category')[:3]
+    # Categories with due dates; matched against the query in Python
+    date_categories = Category.objects.filter(
+        user=user,
+        is_active=True,
+        due_date__isnull=False
+    )
+    # Unpaid bills in months matching the query
+    month_counts = [
+        (i, Category.objects.filter(
+            user=user,
+            is_active=True,
+            payment_status='unpaid',
+            due_date__month=i,
+            due_date__year=timezone.now().year
+        ))
+        for i, month in enumerate(SEARCH_MONTHS, 1) if query in month
+    ]
+    type_counts = [
+        (cat_type, Category.objects.filter(user=user, category_type=cat_type, is_active=True))
+        for cat_type in SEARCH_CATEGORY_TYPES if query in cat_type
+    ]
+    return categories, transactions, payments, date_categories, month_counts, type_counts
+
+def search_suggestions_data(query, categories, transactions, payments, date_categories, month_counts, type_counts):
+    """Build the suggestion list from evaluated queries and (key, count) pairs"""
+    results = []
     
+    # Search categories
     for category in categories:
         results.append({
             'name': category.name,
@@ -750,13 +1081,6 @@ def search_suggestions(request):
         })
     
     # Search transactions
-    transactions = Transaction.objects.filter(
-        user=request.user
-    ).filter(
-        Q(title__icontains=query) |
-        Q(description__icontains=query)
-    )[:5]
-    
     for transaction in transactions:
         results.append({
             'name': transaction.title,
@@ -767,12 +1091,6 @@ def search_suggestions(request):
         })
     
     # Search payments
-    payments = Payment.objects.filter(
-        category__user=request.user
-    ).filter(
-        Q(category__name__icontains=query)
-    )[:3]
-    
     for payment in payments:
         results.append({
             'name': f'Payment for {payment.category.name}',
@@ -782,23 +1100,14 @@ def search_suggestions(request):
             'details': f'₱{payment.amount_paid} - {payment.payment_date.strftime("%b %d, %Y")}'
         })
     
-    # Search for specific dates in due dates
-    from datetime import datetime
-    
     # Search for categories with due dates matching the query
-    date_categories = Category.objects.filter(
-        user=request.user,
-        is_active=True,
-        due_date__isnull=False
-    )
-    
     for category in date_categories:
         due_date_str = category.due_date.strftime('%B %d, %Y').lower()
-        month_name = category.due_date.strftime('%B').lower()
+        due_month = category.due_date.strftime('%B').lower()
         day_str = str(category.due_date.day)
         
         if (query in due_date_str or 
-            query in month_name or 
+            query in due_month or 
             query == day_str or
             query in category.due_date.strftime('%b').lower()):
             results.append({
@@ -810,26 +1119,15 @@ def search_suggestions(request):
             })
     
     # Search months for unpaid bills modal
-    months = ['january', 'february', 'march', 'april', 'may', 'june', 
-              'july', 'august', 'september', 'october', 'november', 'december']
-    
-    for i, month in enumerate(months, 1):
-        if query in month:
-            month_categories = Category.objects.filter(
-                user=request.user,
-                is_active=True,
-                payment_status='unpaid',
-                due_date__month=i,
-                due_date__year=timezone.now().year
-            ).count()
-            
-            results.append({
-                'name': f'{month.capitalize()} Bills',
-                'type': 'Month',
-                'icon': 'fas fa-calendar',
-                'url': f'javascript:viewUnpaidBills({i})',
-                'details': f'{month_categories} unpaid bills in {month.capitalize()}'
-            })
+    for i, month_categories in month_counts:
+        month = SEARCH_MONTHS[i - 1]
+        results.append({
+            'name': f'{month.capitalize()} Bills',
+            'type': 'Month',
+            'icon': 'fas fa-calendar',
+            'url': f'javascript:viewUnpaidBills({i})',
+            'details': f'{month_categories} unpaid bills in {month.capitalize()}'
+        })
     
     # Search budget-related terms
     budget_terms = {
@@ -857,24 +1155,15 @@ def search_suggestions(request):
             })
     
     # Search category types
-    category_types = ['rent', 'utilities', 'groceries', 'transportation', 'entertainment', 
-                     'healthcare', 'education', 'insurance', 'savings', 'other']
-    
-    for cat_type in category_types:
-        if query in cat_type:
-            matching_categories = Category.objects.filter(
-                user=request.user, 
-                category_type=cat_type,
-                is_active=True
-            ).count()
-            if matching_categories > 0:
-                results.append({
-                    'name': f'{cat_type.capitalize()} Categories',
-                    'type': 'Category Type',
-                    'icon': 'fas fa-tags',
-                    'url': '/',
-                    'details': f'{matching_categories} {cat_type} categories'
-                })
+    for cat_type, matching_categories in type_counts:
+        if matching_categories > 0:
+            results.append({
+                'name': f'{cat_type.capitalize()} Categories',
+                'type': 'Category Type',
+                'icon': 'fas fa-tags',
+                'url': '/',
+                'details': f'{matching_categories} {cat_type} categories'
+            })
     
     # Add static pages
     static_pages = [
@@ -896,10 +1185,27 @@ def search_suggestions(request):
                 'details': f'{page["type"]} - PayFlow App'
             })
     
-    return JsonResponse({'results': results[:20]})
+    return {'results': results[:20]}
+
+@login_required
+@redirect_staff_to_admin
+@read_from_replica
+def search_suggestions(request):
+    """API endpoint for search suggestions"""
+    query = request.GET.get('q', '').strip().lower()
+    if not query:
+        return FastJsonResponse({'results': []})
+    
+    categories, transactions, payments, date_categories, month_counts, type_counts = search_suggestion_queries(request.user, query)
+    return FastJsonResponse(search_suggestions_data(
+        query, categories, transactions, payments, date_categories,
+        [(i, queryset.count()) for i, queryset in month_counts],
+        [(cat_type, queryset.count()) for cat_type, queryset in type_counts]
+    ))
 
 @login_required
 @redirect_staff_to_admin
+@read_from_replica
 def search_results(request):
     """Full search results page"""
     query = request.GET.get('q', '').strip()
@@ -944,11 +1250,11 @@ def search_results(request):
 def admin_search_suggestions(request):
     """API endpoint for admin user search suggestions"""
     if not request.user.is_staff:
-        return JsonResponse({'results': []})
+        return FastJsonResponse({'results': []})
     
     query = request.GET.get('q', '').strip().lower()
     if not query:
-        return JsonResponse({'results': []})
+        return FastJsonResponse({'results': []})
     
     results = []
     
@@ -995,27 +1301,155 @@ def admin_search_suggestions(request):
             'details': f'{user_count} regular users'
         })
     
-    return JsonResponse({'results': results[:15]})
+    return FastJsonResponse({'results': results[:15]})
+
+def reset_monthly_categories(user):
+    """Start a new cycle for monthly bills paid in an earlier month; returns how many.
+
+    Not memoized: one query that usually matches nothing, and the reset must
+    happen even when the reads below are served from the cache.
+    """
+    categories = list(
+        Category.objects.filter(
+            user=user, is_active=True, is_monthly=True, payment_status='paid', payment_date__isnull=False
+        ).exclude(payment_date__month=timezone.now().date().month)
+    )
+    for category in categories:
+        category.reset_for_new_month()
+    return len(categories)
+
+@cached_per_user(ttl=60 * 60)
+def unpaid_due_soon_categories(user):
+    """Unpaid categories that are due soon (1-2 days) or overdue"""
+    categories = Category.objects.filter(user=user, is_active=True, payment_status='unpaid')
+    due_soon = []
+    
+    for category in categories:
+        if category.is_due_soon or category.is_overdue:
+            due_soon.append(category)
+    
+    return due_soon
+
+def due_soon_categories(user):
+    """Due soon or overdue categories, after resetting monthly bills if the month has changed.
+
+    Only the reads are memoized, so a cached result never skips the reset.
+    """
+    if reset_monthly_categories(user):
+        # The version moves on commit, which may not have happened yet
+        return unpaid_due_soon_categories.uncached(user)
+    return unpaid_due_soon_categories(user)
 
 def get_notifications_context(request):
     """Context processor to add notifications to all templates"""
     if request.user.is_authenticated:
-        # Reset monthly categories if month has changed
-        categories = Category.objects.filter(user=request.user, is_active=True, is_monthly=True)
-        for category in categories:
-            category.reset_for_new_month()
-        
-        # Get categories that are due soon (1-2 days) or overdue and are unpaid
-        categories = Category.objects.filter(user=request.user, is_active=True, payment_status='unpaid')
-        due_soon = []
-        
-        for category in categories:
-            if category.is_due_soon or category.is_overdue:
-                due_soon.append(category)
-        
-        return {'due_soon': due_soon}
+        # Lazy, so pages whose notification fragment is cached skip the lookup
+        return {'due_soon': SimpleLazyObject(lambda: due_soon_categories(request.user))}
     return {'due_soon': []}
 
+def get_data_version_context(request):
+    """Context processor exposing the user's data version to templates"""
+    if request.user.is_authenticated:
+        return {
+            'data_version': get_data_version(request.user.pk),
+            'data_date': timezone.localdate(),
+        }
+    return {}
+
+# Live updates are sent as server-sent events. Under ASGI the stream stays
+# open and checks the user's data version every LIVE_POLL_SECONDS (see
+# budget/async_views.py). Under WSGI an open stream would hold a worker
+# thread, so live_events sends one snapshot and the browser reconnects
+# after LIVE_WSGI_RETRY_MS.
+LIVE_POLL_SECONDS = 5
+LIVE_HEARTBEAT_SECONDS = 30
+LIVE_STREAM_SECONDS = 30 * 60
+LIVE_RETRY_MS = 5 * 1000
+LIVE_WSGI_RETRY_MS = 60 * 1000
+
+def live_event_id(user_id):
+    """Names a live snapshot; it changes with the data version and the date"""
+    return f'{get_data_version(user_id)}-{timezone.localdate().isoformat()}'
+
+def live_state(user):
+    """Due-soon bills and this month's budget, as sent to the notification bell and budget tiles"""
+    monthly_budget, total_expenses = current_month_summary(user)
+    return {
+        'data_version': get_data_version(user.pk),
+        'due_soon': [
+            {
+                'id': category.id,
+                'name': category.name,
+                'amount': category.amount,
+                'due_date': category.due_date,
+                'is_monthly': category.is_monthly,
+                'status': 'overdue' if category.is_overdue else 'due_soon',
+            }
+            for category in due_soon_categories(user)
+        ],
+        'budget': {
+            'month': monthly_budget.month.strftime('%Y-%m'),
+            'budget': monthly_budget.total_budget,
+            'expenses': total_expenses,
+            'remaining': monthly_budget.total_budget - total_expenses,
+        },
+    }
+
+def sse_message(data=None, event_id=None, event='update', retry=None):
+    """Encode one server-sent event"""
+    lines = []
+    if retry is not None:
+        lines.append(f'retry: {retry}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if data is not None:
+        lines.append(f'event: {event}')
+        lines.append('data: ' + dumps(data).decode())
+    return ('\n'.join(lines) + '\n\n').encode()
+
+def live_last_event_id(request):
+    # EventSource sends Last-Event-ID when it reconnects; the first
+    # connection passes the page's snapshot as ?last_event_id=
+    return request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+
+def live_events_response(content):
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tell nginx not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@login_required
+@redirect_staff_to_admin
+def live_events(request):
+    """Live notification and budget updates (WSGI version: one snapshot per connection)"""
+    event_id = live_event_id(request.user.pk)
+    if live_last_event_id(request) == event_id:
+        # The browser already has this snapshot
+        message = sse_message(retry=LIVE_WSGI_RETRY_MS)
+    else:
+        message = sse_message(live_state(request.user), event_id, retry=LIVE_WSGI_RETRY_MS)
+    return live_events_response(iter([message]))
+
+@login_required
+@redirect_staff_to_admin
+def sync_changes(request):
+    """API endpoint for the rows changed and deleted since a sync cursor.
+
+    Pass the cursor of the previous response as ?since= (none for a full
+    sync) and keep asking while "more" is true. Reads the primary database:
+    a lagging replica could hand out a cursor past rows it hasn't seen yet.
+    """
+    try:
+        data = changes_since(request.user, request.GET.get('since'))
+    except InvalidCursor:
+        return FastJsonResponse({'error': 'Invalid cursor'}, status=400)
+    except SyncExpired as exc:
+        return FastJsonResponse({'error': str(exc)}, status=410)
+    response = FastJsonResponse(data)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
 def google_verification(request):
     """Google Search Console verification file"""
     return HttpResponse('google-site-verification: google2a6ee76082d4d9c7.html', content_type='text/html')
@@ -1052,4 +1486,50 @@ Disallow: /admin/
 Disallow: /profile/
 Disallow: /category/
 Sitemap: https://payflow-budget-app.onrender.com/sitemap.xml'''
-    return HttpResponse(robots_content, content_type='text/plain')
\ No newline at end of file
+    return HttpResponse(robots_content, content_type='text/plain')
+
+PWA_SHELL_FILES = ['css/base.css', 'css/home.css', 'css/transactions.css', 'js/base.js', 'js/home.js', 'img/icon-192.png']
+PWA_SHELL_CDN = [
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
+]
+# Pages kept for offline use; the first is the fallback for any other page
+PWA_PAGES = ['home', 'transactions']
+
+def service_worker(request):
+    """The service worker (static/js/sw.js) with the current app shell URLs.
+
+    Served from the site root rather than STATIC_URL so its scope covers
+    every page, and revalidated on every visit so a deploy reaches browsers
+    right away.
+    """
+    with open(finders.find('js/sw.js'), encoding='utf-8') as source:
+        script = source.read()
+    config = {
+        'shell': [static(path) for path in PWA_SHELL_FILES] + PWA_SHELL_CDN + [reverse('web_manifest')],
+        'pages': [reverse(name) for name in PWA_PAGES],
+        'login': reverse('login'),
+    }
+    # A new version (new bundle hashes or a changed worker) replaces the shell cache
+    config['version'] = hashlib.sha256((json.dumps(config) + script).encode()).hexdigest()[:12]
+    response = HttpResponse(f'const SW_CONFIG = {json.dumps(config)};\n\n{script}', content_type='text/javascript')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+def web_manifest(request):
+    """Web app manifest, so the app can be installed to the home screen"""
+    return FastJsonResponse({
+        'name': 'PayFlow - Budget Management App',
+        'short_name': 'PayFlow',
+        'description': 'Track expenses, manage budgets and get bill reminders.',
+        'start_url': reverse('home'),
+        'scope': '/',
+        'display': 'standalone',
+        'background_color': '#ffffff',
+        'theme_color': '#f07ea8',
+        'icons': [
+            {'src': static('img/icon-192.png'), 'sizes': '192x192', 'type': 'image/png'},
+            {'src': static('img/icon-512.png'), 'sizes': '512x512', 'type': 'image/png'},
+        ],
+    }, content_type='application/manifest+json')
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'payflow.settings')
+# Serve the read-only JSON endpoints with the async views (budget/async_views.py)
+os.environ.setdefault('PAYFLOW_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
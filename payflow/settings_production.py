@@ -0,0 +1,52 @@
+"""
+Production settings for payflow.
+
+Select with DJANGO_SETTINGS_MODULE=payflow.settings_production (for example
+in the gunicorn service environment). Everything not overridden here comes
+from payflow/settings.py.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, SECRET_KEY, TEMPLATES
+import os
+
+DEBUG = False
+
+# Log views that go over their query budget instead of failing the request
+QUERY_BUDGET_STRICT = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+
+# Database
+# Keep connections open between requests instead of reconnecting each time
+
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(os.environ.get('DJANGO_CONN_MAX_AGE', 600))
+    database['CONN_HEALTH_CHECKS'] = True
+
+# WAL lets readers run while a payment is being written; NORMAL is durable
+# in WAL mode and skips an fsync per commit
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+}
+
+
+# Sessions
+# Read from the shared cache, written through to the database
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
+# Templates
+# Parse each template once per process
+
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
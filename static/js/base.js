@@ -0,0 +1,759 @@
+// Tag JSON fetches with the user's data version so the browser can
+// reuse cached responses until something changes
+function withDataVersion(url) {
+    const version = document.body.dataset.dataVersion;
+    if (!version) return url;
+    return url + (url.includes('?') ? '&' : '?') + 'v=' + encodeURIComponent(version);
+}
+
+// Format an ISO date ("2024-03-05") or datetime from the JSON API for display
+function formatDate(value) {
+    if (!value) return '';
+    if (value.length === 10) {
+        const [year, month, day] = value.split('-').map(Number);
+        return new Date(year, month - 1, day).toLocaleDateString('en-US', { year: 'numeric', month: 'long', day: 'numeric' });
+    }
+    return new Date(value).toLocaleString('en-US', {
+        year: 'numeric', month: 'long', day: 'numeric', hour: '2-digit', minute: '2-digit'
+    });
+}
+
+function escapeHtml(value) {
+    return String(value ?? '').replace(/[&<>"']/g, ch => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
+}
+
+// Live updates: the server pushes due-soon bills and this month's budget as
+// server-sent events, so the bell and budget tiles stay current without a
+// reload. Pages can listen for the 'payflow:live-update' event.
+function renderNotifications(dueSoon) {
+    const button = document.getElementById('notificationBtn');
+    if (button) {
+        let badge = button.querySelector('.notification-badge');
+        if (dueSoon.length && !badge) {
+            badge = document.createElement('span');
+            badge.className = 'notification-badge';
+            button.appendChild(badge);
+        }
+        if (badge) {
+            if (dueSoon.length) badge.textContent = dueSoon.length;
+            else badge.remove();
+        }
+    }
+
+    const content = document.getElementById('notificationContent');
+    if (!content) return;
+    if (!dueSoon.length) {
+        content.innerHTML = `
+            <div class="text-center py-4">
+                <i class="fas fa-check-circle text-success" style="font-size: 3rem;"></i>
+                <h6 class="mt-3">All caught up!</h6>
+                <p class="text-muted">No payments due soon.</p>
+            </div>`;
+        return;
+    }
+    content.innerHTML = '<div class="notification-list">' + dueSoon.map(bill => {
+        const overdue = bill.status === 'overdue';
+        const [year, month, day] = bill.due_date.split('-').map(Number);
+        const due = new Date(year, month - 1, day).toLocaleDateString('en-US', { month: 'short', day: '2-digit', year: 'numeric' });
+        const amount = Number(bill.amount).toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+        return `
+            <div class="notification-item ${overdue ? 'overdue' : 'due-soon'}">
+                <div class="notification-icon">
+                    <i class="fas ${overdue ? 'fa-exclamation-triangle text-danger' : 'fa-clock text-warning'}"></i>
+                </div>
+                <div class="notification-content">
+                    <h6 class="notification-title">${escapeHtml(bill.name)}</h6>
+                    <p class="notification-details">
+                        Amount: ₱${amount}<br>
+                        Due: ${due}
+                        ${bill.is_monthly ? '<i class="fas fa-sync-alt" title="Monthly reminder"></i>' : ''}
+                    </p>
+                    ${overdue ? '<span class="badge bg-danger">Overdue</span>' : '<span class="badge bg-warning text-dark">Due Soon</span>'}
+                </div>
+                <div class="notification-actions">
+                    <a href="/category/${bill.id}/" class="btn btn-sm btn-primary">
+                        <i class="fas fa-eye" style="color: white;"></i>
+                    </a>
+                </div>
+            </div>`;
+    }).join('') + '</div>';
+}
+
+function startLiveUpdates() {
+    const url = document.body.dataset.liveUrl;
+    if (!url || !window.EventSource) return;
+    // The page already shows the snapshot it was rendered with
+    const lastEventId = document.body.dataset.liveEventId;
+    const source = new EventSource(lastEventId ? `${url}?last_event_id=${encodeURIComponent(lastEventId)}` : url);
+    source.addEventListener('update', function(event) {
+        const data = JSON.parse(event.data);
+        document.body.dataset.dataVersion = data.data_version;
+        renderNotifications(data.due_soon);
+        document.dispatchEvent(new CustomEvent('payflow:live-update', { detail: data }));
+    });
+}
+
+document.addEventListener('DOMContentLoaded', startLiveUpdates);
+
+// Offline support (static/js/sw.js): cached app shell and dashboard data,
+// and payments made offline are sent once the connection is back
+function registerServiceWorker() {
+    const url = document.body.dataset.serviceWorker;
+    if (!url || !('serviceWorker' in navigator)) return;
+    navigator.serviceWorker.register(url, { scope: '/' }).catch(function(error) {
+        console.error('Service worker registration failed:', error);
+    });
+    navigator.serviceWorker.addEventListener('message', function(event) {
+        if (!event.data || event.data.type !== 'payflow:replayed') return;
+        alert(event.data.results.map(result => result.message).join('\n'));
+        window.location.reload();
+    });
+    // Browsers without background sync replay when the page sees the connection return
+    window.addEventListener('online', function() {
+        navigator.serviceWorker.ready.then(registration => registration.active && registration.active.postMessage('replay'));
+    });
+}
+
+document.addEventListener('DOMContentLoaded', registerServiceWorker);
+
+// Toggle dashboard visibility
+function toggleDashboard() {
+    const dashboard = document.getElementById('dashboard');
+    if (dashboard) {
+        dashboard.style.display = dashboard.style.display === 'none' ? 'block' : 'none';
+    }
+}
+
+// Theme Functionality
+function toggleDarkMode() {
+    const body = document.body;
+    const darkModeToggle = document.getElementById('darkModeToggle');
+    const blueThemeToggle = document.getElementById('blueThemeToggle');
+    const greenThemeToggle = document.getElementById('greenThemeToggle');
+
+    if (darkModeToggle && darkModeToggle.checked) {
+        body.classList.add('dark-mode');
+        body.classList.remove('blue-theme', 'green-theme');
+        localStorage.setItem('darkMode', 'enabled');
+        localStorage.setItem('blueTheme', 'disabled');
+        localStorage.setItem('greenTheme', 'disabled');
+        if (blueThemeToggle) blueThemeToggle.checked = false;
+        if (greenThemeToggle) greenThemeToggle.checked = false;
+    } else {
+        body.classList.remove('dark-mode');
+        localStorage.setItem('darkMode', 'disabled');
+    }
+}
+
+function toggleBlueTheme() {
+    const body = document.body;
+    const blueThemeToggle = document.getElementById('blueThemeToggle');
+    const darkModeToggle = document.getElementById('darkModeToggle');
+    const greenThemeToggle = document.getElementById('greenThemeToggle');
+
+    if (blueThemeToggle && blueThemeToggle.checked) {
+        body.classList.add('blue-theme');
+        body.classList.remove('dark-mode', 'green-theme');
+        localStorage.setItem('blueTheme', 'enabled');
+        localStorage.setItem('darkMode', 'disabled');
+        localStorage.setItem('greenTheme', 'disabled');
+        if (darkModeToggle) darkModeToggle.checked = false;
+        if (greenThemeToggle) greenThemeToggle.checked = false;
+    } else {
+        body.classList.remove('blue-theme');
+        localStorage.setItem('blueTheme', 'disabled');
+    }
+}
+
+function toggleGreenTheme() {
+    const body = document.body;
+    const greenThemeToggle = document.getElementById('greenThemeToggle');
+    const darkModeToggle = document.getElementById('darkModeToggle');
+    const blueThemeToggle = document.getElementById('blueThemeToggle');
+
+    if (greenThemeToggle && greenThemeToggle.checked) {
+        body.classList.add('green-theme');
+        body.classList.remove('dark-mode', 'blue-theme');
+        localStorage.setItem('greenTheme', 'enabled');
+        localStorage.setItem('darkMode', 'disabled');
+        localStorage.setItem('blueTheme', 'disabled');
+        if (darkModeToggle) darkModeToggle.checked = false;
+        if (blueThemeToggle) blueThemeToggle.checked = false;
+    } else {
+        body.classList.remove('green-theme');
+        localStorage.setItem('greenTheme', 'disabled');
+    }
+}
+
+// Load saved theme on page load
+document.addEventListener('DOMContentLoaded', function() {
+    // Apply saved theme
+    const darkMode = localStorage.getItem('darkMode');
+    const blueTheme = localStorage.getItem('blueTheme');
+    const greenTheme = localStorage.getItem('greenTheme');
+
+    if (darkMode === 'enabled') {
+        document.body.classList.add('dark-mode');
+        const toggle = document.getElementById('darkModeToggle');
+        if (toggle) toggle.checked = true;
+    } else if (blueTheme === 'enabled') {
+        document.body.classList.add('blue-theme');
+        const toggle = document.getElementById('blueThemeToggle');
+        if (toggle) toggle.checked = true;
+    } else if (greenTheme === 'enabled') {
+        document.body.classList.add('green-theme');
+        const toggle = document.getElementById('greenThemeToggle');
+        if (toggle) toggle.checked = true;
+    }
+
+    // Auto-hide notifications after 5 seconds
+    const alerts = document.querySelectorAll('.alert');
+    alerts.forEach(function(alert) {
+        // Check for payment messages
+        if (alert.textContent.includes('PAYMENT_SUCCESS')) {
+            alert.style.display = 'none'; // Hide the alert
+            showPaymentSuccessModal(); // Show success modal
+        } else if (alert.textContent.includes('PAYMENT_ERROR')) {
+            alert.style.display = 'none'; // Hide the alert
+            showPaymentErrorModal(); // Show error modal
+        } else {
+            setTimeout(function() {
+                const bsAlert = new bootstrap.Alert(alert);
+                bsAlert.close();
+            }, 5000);
+        }
+    });
+
+    // Check for due soon notifications and show browser notification if supported
+    if ('Notification' in window && Notification.permission === 'granted') {
+        const dueSoonCount = document.querySelectorAll('.notification-badge').length;
+        if (dueSoonCount > 0) {
+            new Notification('Payflow Payment Reminder', {
+                body: `You have ${dueSoonCount} payment(s) due soon!`,
+                icon: '/static/favicon.ico'
+            });
+        }
+    }
+});
+
+// Request notification permission
+function requestNotificationPermission() {
+    if ('Notification' in window && Notification.permission === 'default') {
+        Notification.requestPermission();
+    }
+}
+
+// Call this when user clicks notification bell
+document.addEventListener('DOMContentLoaded', function() {
+    const notificationBtn = document.getElementById('notificationBtn');
+    const notificationModal = document.getElementById('notificationModal');
+
+    if (notificationBtn) {
+        notificationBtn.addEventListener('click', function() {
+            requestNotificationPermission();
+        });
+    }
+
+    // Add loading state to notification modal
+    if (notificationModal) {
+        notificationModal.addEventListener('show.bs.modal', function() {
+            const loading = document.getElementById('notificationLoading');
+            const content = document.getElementById('notificationContent');
+
+            // Show loading, hide content
+            loading.style.display = 'block';
+            content.style.display = 'none';
+
+            // Simulate loading delay and show content
+            setTimeout(() => {
+                loading.style.display = 'none';
+                content.style.display = 'block';
+            }, 800);
+        });
+    }
+
+
+
+
+    // Load recent searches from localStorage
+    function loadRecentSearches() {
+        const recent = JSON.parse(localStorage.getItem('recentSearches') || '[]');
+        if (recent.length > 0) {
+            recentSearches.style.display = 'block';
+            recentList.innerHTML = recent.map(term => 
+                `<div class="recent-item" onclick="searchTerm('${term}')">${term}</div>`
+            ).join('');
+        } else {
+            recentSearches.style.display = 'none';
+        }
+    }
+
+    // Save search term to recent searches
+    function saveRecentSearch(term) {
+        const recent = JSON.parse(localStorage.getItem('recentSearches') || '[]');
+        if (!recent.includes(term)) {
+            recent.unshift(term);
+            if (recent.length > 5) {
+                recent.pop();
+            }
+            localStorage.setItem('recentSearches', JSON.stringify(recent));
+        }
+    }
+
+    // Clear recent searches
+    function clearRecentSearches() {
+        localStorage.removeItem('recentSearches');
+        recentSearches.style.display = 'none';
+    }
+
+    // Search for suggestions
+    function searchSuggestions(query) {
+        console.log('Searching for:', query);
+        if (query.length < 1) {
+            searchSuggestions.style.display = 'none';
+            return;
+        }
+
+        fetch(`/search-suggestions/?q=${encodeURIComponent(query)}`)
+            .then(response => {
+                console.log('Response status:', response.status);
+                return response.json();
+            })
+            .then(data => {
+                console.log('Search results:', data);
+                if (data.results && data.results.length > 0) {
+                    suggestionsList.innerHTML = data.results.map(result => `
+                        <div class="suggestion-item" onclick="navigateToResult('${result.url}')">
+                            <div class="suggestion-icon">
+                                <i class="${result.icon}"></i>
+                            </div>
+                            <div class="suggestion-content">
+                                <div class="suggestion-name">${result.name}</div>
+                                <div class="suggestion-type">${result.type} • ${result.page_location || 'Application'}</div>
+                            </div>
+                        </div>
+                    `).join('');
+                    searchSuggestions.style.display = 'block';
+                    viewAllResultsBtn.href = `/search/?q=${encodeURIComponent(query)}`;
+                    viewAllResultsBtn.style.display = 'inline-block';
+                } else {
+                    searchSuggestions.style.display = 'none';
+                }
+            })
+            .catch(error => {
+                console.error('Search error:', error);
+                searchSuggestions.style.display = 'none';
+            });
+    }
+
+    // Navigate to search result
+    function navigateToResult(url) {
+        window.location.href = url;
+    }
+
+    // Search for a term
+    function searchTerm(term) {
+        searchInput.value = term;
+        searchSuggestions(term);
+    }
+
+    // Event listeners
+    if (searchInput) {
+        searchInput.addEventListener('input', function() {
+            clearTimeout(searchTimeout);
+            const query = this.value.trim();
+
+            if (query.length >= 1) {
+                searchTimeout = setTimeout(() => {
+                    searchSuggestions(query);
+                }, 300);
+            } else {
+                searchSuggestions.style.display = 'none';
+                loadRecentSearches();
+            }
+        });
+
+        searchInput.addEventListener('keydown', function(e) {
+            if (e.key === 'Enter') {
+                e.preventDefault();
+                const query = this.value.trim();
+                if (query) {
+                    saveRecentSearch(query);
+                    window.location.href = `/search/?q=${encodeURIComponent(query)}`;
+                }
+            }
+        });
+    }
+
+    // Search submit button
+    const searchSubmitBtn = document.getElementById('searchSubmitBtn');
+    if (searchSubmitBtn) {
+        searchSubmitBtn.addEventListener('click', function() {
+            const query = searchInput.value.trim();
+            if (query) {
+                saveRecentSearch(query);
+                window.location.href = `/search/?q=${encodeURIComponent(query)}`;
+            }
+        });
+    }
+
+    // Clear recent searches button
+    const clearRecentBtn = document.getElementById('clearRecentBtn');
+    if (clearRecentBtn) {
+        clearRecentBtn.addEventListener('click', function() {
+            clearRecentSearches();
+        });
+    }
+
+    // Hide suggestions when clicking outside
+    document.addEventListener('click', function(e) {
+        if (!e.target.closest('.position-relative') && !e.target.closest('#searchSuggestions')) {
+            hideSuggestions();
+        }
+    });
+
+    // Load recent searches when modal opens
+    const searchModal = document.getElementById('searchModal');
+    if (searchModal) {
+        searchModal.addEventListener('shown.bs.modal', function() {
+            loadRecentSearches();
+            searchInput.focus();
+        });
+
+        searchModal.addEventListener('hidden.bs.modal', function() {
+            searchInput.value = '';
+            searchSuggestions.style.display = 'none';
+            viewAllResultsBtn.style.display = 'none';
+        });
+    }
+});
+
+
+// Search functionality
+function performSearch() {
+    const searchInput = document.getElementById('navSearchInput');
+    const query = searchInput.value.trim();
+    console.log('performSearch called with:', query);
+    if (query) {
+        hideSuggestions();
+        openSearchModal(query);
+    }
+}
+
+function openSearchModal(query) {
+    const modal = new bootstrap.Modal(document.getElementById('searchModal'));
+    const content = document.getElementById('searchModalContent');
+
+    content.innerHTML = '<div class="text-center py-4"><div class="spinner-border" role="status"></div></div>';
+    modal.show();
+
+    fetch(`/search-suggestions/?q=${encodeURIComponent(query)}`)
+        .then(response => response.json())
+        .then(data => {
+            let html = `<h6 class="mb-3">Search Results for "${query}"</h6>`;
+
+            if (data.results && data.results.length > 0) {
+                html += '<div class="list-group">';
+                data.results.forEach(result => {
+                    html += `
+                        <div class="list-group-item list-group-item-action" style="cursor: pointer;" onclick="navigateToResult('${result.url}')">
+                            <div class="d-flex align-items-center">
+                                <i class="${result.icon} me-3 text-primary"></i>
+                                <div>
+                                    <h6 class="mb-1">${result.name}</h6>
+                                    <small class="text-muted">${result.type} • ${result.details}</small>
+                                </div>
+                                <i class="fas fa-chevron-right ms-auto text-muted"></i>
+                            </div>
+                        </div>
+                    `;
+                });
+                html += '</div>';
+            } else {
+                html += '<div class="text-center py-4"><i class="fas fa-search fa-2x text-muted mb-2"></i><p>No results found</p></div>';
+            }
+
+            content.innerHTML = html;
+        })
+        .catch(error => {
+            content.innerHTML = '<div class="text-center py-4 text-danger">Error loading results</div>';
+        });
+}
+
+function filterCategories(query) {
+    const categories = document.querySelectorAll('.category-item');
+    const lowerQuery = query.toLowerCase();
+    let visibleCount = 0;
+
+    categories.forEach(category => {
+        const categoryName = category.querySelector('.category-name')?.textContent.toLowerCase() || '';
+        const categoryType = category.querySelector('.category-type')?.textContent.toLowerCase() || '';
+
+        if (categoryName.includes(lowerQuery) || categoryType.includes(lowerQuery)) {
+            category.style.display = 'block';
+            visibleCount++;
+        } else {
+            category.style.display = 'none';
+        }
+    });
+
+    // Show/hide no results message
+    let noResultsMsg = document.getElementById('noSearchResults');
+    if (visibleCount === 0) {
+        if (!noResultsMsg) {
+            noResultsMsg = document.createElement('div');
+            noResultsMsg.id = 'noSearchResults';
+            noResultsMsg.className = 'text-center text-muted py-4';
+            noResultsMsg.innerHTML = `<i class="fas fa-search"></i><br>No categories found for "${query}"`;
+            document.querySelector('.categories-section').appendChild(noResultsMsg);
+        }
+    } else if (noResultsMsg) {
+        noResultsMsg.remove();
+    }
+}
+
+// Search functionality variables
+let searchTimeout;
+
+function showSuggestions(query) {
+    console.log('showSuggestions called with:', query);
+    if (query.length < 1) {
+        hideSuggestions();
+        return;
+    }
+
+    // Show loading state
+    const suggestionsList = document.getElementById('suggestionsList');
+    const suggestionsContainer = document.getElementById('searchSuggestions');
+    suggestionsList.innerHTML = '<div class="p-2 text-center"><div class="spinner-border spinner-border-sm" role="status"></div> <span class="ms-2">Searching...</span></div>';
+    suggestionsContainer.style.display = 'block';
+
+    console.log('Fetching suggestions for:', query);
+    fetch(`/search-suggestions/?q=${encodeURIComponent(query)}`)
+        .then(response => {
+            console.log('Response status:', response.status);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            console.log('Search data received:', data);
+            // Add slight delay to show loading state
+            setTimeout(() => {
+                const suggestionsList = document.getElementById('suggestionsList');
+                const suggestionsContainer = document.getElementById('searchSuggestions');
+
+            if (data.results && data.results.length > 0) {
+                suggestionsList.innerHTML = data.results.map(result => `
+                    <div class="suggestion-item p-2 border-bottom" style="cursor: pointer; color: #333;" onclick="navigateToSuggestion('${result.url}')" onmouseover="this.style.backgroundColor='#f8f9fa'" onmouseout="this.style.backgroundColor='white'">
+                        <div class="d-flex align-items-center">
+                            <i class="${result.icon} me-2" style="color: #6c757d;"></i>
+                            <div>
+                                <div class="fw-bold">${result.name}</div>
+                                <small class="text-muted">${result.type} • ${result.details}</small>
+                            </div>
+                            <i class="fas fa-chevron-right ms-auto text-muted"></i>
+                        </div>
+                    </div>
+                `).join('');
+                suggestionsContainer.style.display = 'block';
+                console.log('Suggestions displayed');
+            } else {
+                suggestionsList.innerHTML = '<div class="p-2 text-muted text-center">No results found</div>';
+                suggestionsContainer.style.display = 'block';
+                console.log('No results found');
+            }
+            }, 300); // 300ms delay to show loading
+        })
+        .catch(error => {
+            console.error('Search error:', error);
+            hideSuggestions();
+        });
+}
+
+function hideSuggestions() {
+    document.getElementById('searchSuggestions').style.display = 'none';
+}
+
+function navigateToResult(url) {
+    // Close modal first
+    const modal = bootstrap.Modal.getInstance(document.getElementById('searchModal'));
+    if (modal) {
+        modal.hide();
+    }
+    // Navigate after modal closes
+    setTimeout(() => {
+        window.location.href = url;
+    }, 300);
+}
+
+function navigateToSuggestion(url) {
+    // Hide suggestions dropdown
+    hideSuggestions();
+    // Clear search input
+    document.getElementById('navSearchInput').value = '';
+
+    // Handle JavaScript URLs for month bills
+    if (url.startsWith('javascript:')) {
+        eval(url.substring(11)); // Remove 'javascript:' and execute
+    } else {
+        // Navigate to regular URLs
+        window.location.href = url;
+    }
+}
+
+// Enhanced search input event listeners
+document.addEventListener('DOMContentLoaded', function() {
+    const searchInput = document.getElementById('navSearchInput');
+    if (searchInput) {
+        searchInput.addEventListener('input', function() {
+            clearTimeout(searchTimeout);
+            const query = this.value.trim();
+
+            if (query === '') {
+                hideSuggestions();
+            } else {
+                searchTimeout = setTimeout(() => {
+                    showSuggestions(query);
+                }, 300);
+            }
+        });
+
+        // Removed blur event to fix double-tap issue
+
+        searchInput.addEventListener('focus', function() {
+            const query = this.value.trim();
+            if (query) {
+                showSuggestions(query);
+            }
+        });
+    }
+});
+
+// Mobile search toggle
+function toggleMobileSearch() {
+    const searchBar = document.querySelector('.d-none.d-md-block');
+    if (searchBar) {
+        searchBar.classList.toggle('d-none');
+        searchBar.classList.toggle('d-block');
+        if (!searchBar.classList.contains('d-none')) {
+            document.getElementById('navSearchInput').focus();
+        }
+    }
+}
+
+function showPaymentSuccessModal() {
+    const modal = new bootstrap.Modal(document.getElementById('paymentSuccessModal'));
+    const animationContainer = document.getElementById('moneyAnimation');
+
+    // Clear previous animations
+    animationContainer.innerHTML = '';
+
+    // Create money falling animation
+    for (let i = 0; i < 15; i++) {
+        setTimeout(() => {
+            const money = document.createElement('span');
+            money.textContent = '₱';
+            money.style.cssText = `
+                position: absolute;
+                left: ${Math.random() * 100}%;
+                top: -20px;
+                font-size: ${Math.random() * 1 + 1}rem;
+                color: #28a745;
+                animation: moneyFall 3s linear forwards;
+                pointer-events: none;
+            `;
+            animationContainer.appendChild(money);
+
+            // Remove element after animation
+            setTimeout(() => {
+                if (money.parentNode) {
+                    money.parentNode.removeChild(money);
+                }
+            }, 3000);
+        }, i * 200);
+    }
+
+    modal.show();
+}
+
+function showPaymentErrorModal() {
+    const modal = new bootstrap.Modal(document.getElementById('paymentErrorModal'));
+    modal.show();
+}
+
+function viewUnpaidBills(month) {
+    const modal = new bootstrap.Modal(document.getElementById('unpaidBillsModal'));
+    const content = document.getElementById('unpaidBillsContent');
+
+    content.innerHTML = `
+        <div class="text-center py-4">
+            <div class="spinner-border text-primary" role="status">
+                <span class="visually-hidden">Loading...</span>
+            </div>
+        </div>
+    `;
+
+    modal.show();
+
+    fetch(withDataVersion(`/unpaid-bills/${month}/`))
+        .then(response => response.json())
+        .then(data => {
+            if (data.unpaid_bills && data.unpaid_bills.length > 0) {
+                content.innerHTML = `
+                    <h6 class="mb-3">${data.month_name} Unpaid Bills</h6>
+                    <div class="notification-list">
+                        ${data.unpaid_bills.map(bill => `
+                            <div class="notification-item ${bill.status === 'overdue' ? 'overdue' : 'due-soon'}">
+                                <div class="notification-icon">
+                                    ${bill.status === 'overdue' ? 
+                                        '<i class="fas fa-exclamation-triangle text-danger"></i>' : 
+                                        '<i class="fas fa-clock text-warning"></i>'
+                                    }
+                                </div>
+                                <div class="notification-content">
+                                    <h6 class="notification-title">${bill.name}</h6>
+                                    <p class="notification-details">
+                                        Amount: ₱${bill.amount.toLocaleString()}<br>
+                                        Due: ${formatDate(bill.due_date)}<br>
+                                        Type: ${bill.category_type}
+                                        ${bill.is_monthly ? '<i class="fas fa-sync-alt" title="Monthly reminder"></i>' : ''}
+                                    </p>
+                                    ${bill.status === 'overdue' ? 
+                                        '<span class="badge bg-danger">Overdue</span>' : 
+                                        '<span class="badge bg-warning text-dark">Due Soon</span>'
+                                    }
+                                </div>
+                                <div class="notification-actions">
+                                    <a href="/category/${bill.id}/" class="btn btn-sm btn-primary">
+                                        <i class="fas fa-eye" style="color: white;"></i>
+                                    </a>
+                                </div>
+                            </div>
+                        `).join('')}
+                    </div>
+                `;
+            } else {
+                content.innerHTML = `
+                    <div class="text-center py-4">
+                        <i class="fas fa-check-circle text-success" style="font-size: 3rem;"></i>
+                        <h6 class="mt-3">No unpaid bills!</h6>
+                        <p class="text-muted">All bills for ${data.month_name} are up to date.</p>
+                    </div>
+                `;
+            }
+        })
+        .catch(error => {
+            console.error('Error fetching unpaid bills:', error);
+            content.innerHTML = `
+                <div class="text-center py-4">
+                    <i class="fas fa-exclamation-triangle text-danger" style="font-size: 3rem;"></i>
+                    <h6 class="mt-3">Error loading bills</h6>
+                    <p class="text-muted">Please try again later.</p>
+                </div>
+            `;
+        });
+}
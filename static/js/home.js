@@ -0,0 +1,511 @@
+// The payment forms come from a cached fragment, so they take this
+// page's CSRF token instead of a cached one
+document.addEventListener('DOMContentLoaded', function() {
+    const token = document.querySelector('[name=csrfmiddlewaretoken]');
+    if (!token) return;
+    document.querySelectorAll('form[data-csrf-form]').forEach(function(form) {
+        form.appendChild(token.cloneNode());
+    });
+});
+
+let selectedMonth = '';
+let selectedYear = 2025;
+
+// Load saved month and year on page load
+document.addEventListener('DOMContentLoaded', function() {
+    const savedMonth = localStorage.getItem('selectedMonth');
+    const savedYear = localStorage.getItem('selectedYear');
+    if (savedYear) {
+        selectedYear = parseInt(savedYear);
+        document.getElementById('selectedYearText').textContent = selectedYear;
+    }
+    if (savedMonth) {
+        selectedMonth = savedMonth;
+        loadMonthData(savedMonth);
+    }
+});
+
+function selectYear(year) {
+    selectedYear = year;
+    document.getElementById('selectedYearText').textContent = year;
+    localStorage.setItem('selectedYear', year);
+
+    // Reload month data if a month is selected
+    if (selectedMonth) {
+        loadMonthData(selectedMonth);
+    }
+}
+
+function loadMonthData(month) {
+    if (!month) return;
+
+    selectedMonth = month;
+    localStorage.setItem('selectedMonth', month);
+
+    const monthKey = `${selectedYear}-${month.padStart(2, '0')}`;
+
+    // Show loading state
+    document.getElementById('budgetAmount').innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+    document.getElementById('expenseAmount').innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+
+    // Fetch month data
+    fetch(withDataVersion(`/month-transactions/${monthKey}/`))
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('budgetAmount').textContent = `₱${data.budget.toLocaleString()}`;
+            document.getElementById('expenseAmount').textContent = `₱${data.expenses.toLocaleString()}`;
+
+            // Update the dropdown button text
+            const monthNames = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December'];
+            const monthName = monthNames[parseInt(month) - 1];
+            document.querySelector('.month-dropdown-btn').innerHTML = `<i class="fas fa-calendar"></i> ${monthName}`;
+        })
+        .catch(error => {
+            console.error('Error loading month data:', error);
+            document.getElementById('budgetAmount').textContent = '₱0';
+            document.getElementById('expenseAmount').textContent = '₱0';
+        });
+}
+
+// Keep the budget tiles current when the live stream reports a change to
+// the month they show
+document.addEventListener('payflow:live-update', function(event) {
+    const budget = event.detail.budget;
+    const shownMonth = selectedMonth ? `${selectedYear}-${selectedMonth.padStart(2, '0')}` : budget.month;
+    if (shownMonth !== budget.month) return;
+    document.getElementById('budgetAmount').textContent = `₱${budget.budget.toLocaleString()}`;
+    document.getElementById('expenseAmount').textContent = `₱${budget.expenses.toLocaleString()}`;
+});
+
+function viewSelectedMonthTransactions() {
+    if (!selectedMonth) {
+        alert('Please select a month first.');
+        return;
+    }
+
+    const monthKey = `${selectedYear}-${selectedMonth.padStart(2, '0')}`;
+    viewMonthTransactions(monthKey);
+}
+
+function viewSelectedMonthBudgetHistory() {
+    if (!selectedMonth) {
+        alert('Please select a month first.');
+        return;
+    }
+
+    const monthKey = `${selectedYear}-${selectedMonth.padStart(2, '0')}`;
+    viewBudgetHistory(monthKey);
+}
+
+function viewSelectedMonthDetails() {
+    if (!selectedMonth) {
+        alert('Please select a month first.');
+        return;
+    }
+
+    const monthKey = `${selectedYear}-${selectedMonth.padStart(2, '0')}`;
+    viewMonthDetails(monthKey);
+}
+
+function editSelectedMonthBudget() {
+    const modal = new bootstrap.Modal(document.getElementById('editBudgetModal'));
+
+    // Set month and year in hidden fields
+    const month = selectedMonth || new Date().getMonth() + 1;
+    const year = selectedYear || new Date().getFullYear();
+
+    document.getElementById('budgetMonth').value = month;
+    document.getElementById('budgetYear').value = year;
+    document.getElementById('additionalBudgetMonth').value = month;
+    document.getElementById('additionalBudgetYear').value = year;
+
+    // Load current budget amount
+    const currentBudget = document.getElementById('budgetAmount').textContent.replace('₱', '').replace(/,/g, '');
+    document.getElementById('id_total_budget').value = currentBudget;
+
+    modal.show();
+}
+
+function viewMonthDetails(monthKey) {
+    const modal = new bootstrap.Modal(document.getElementById('monthlyDetailsModal'));
+    modal.show();
+
+    // Show loading state
+    const content = document.getElementById('monthlyDetailsContent');
+    content.innerHTML = '<div class="text-center"><i class="fas fa-spinner fa-spin"></i> Loading monthly details...</div>';
+
+    // Load transactions for the specific month
+    fetch(withDataVersion(`/month-transactions/${monthKey}/`))
+        .then(response => response.json())
+        .then(data => {
+            const isGreenTheme = document.body.classList.contains('green-theme');
+            const isBlueTheme = document.body.classList.contains('blue-theme');
+            const themeColor = isGreenTheme ? '#2d8659' : isBlueTheme ? '#3182ce' : 'var(--primary-pink)';
+            const themeDarkColor = isGreenTheme ? '#1e7e5e' : isBlueTheme ? '#2b6cb0' : 'var(--dark-pink)';
+            const themeGradient = isGreenTheme ? 'linear-gradient(135deg, #2d8659, #1e7e5e)' : isBlueTheme ? 'linear-gradient(135deg, #3182ce, #2b6cb0)' : 'linear-gradient(135deg, var(--primary-pink), var(--dark-pink))';
+
+            let html = `
+                <div class="d-flex justify-content-between align-items-center mb-3">
+                    <h5>${data.month_name} Details</h5>
+                    <button class="btn btn-sm btn-outline-secondary" data-bs-dismiss="modal">
+                        <i class="fas fa-times"></i> Close
+                    </button>
+                </div>
+                <div class="row mb-4">
+                    <div class="col-md-4">
+                        <div class="card text-center" style="background: ${themeGradient}; color: white;">
+                            <div class="card-body">
+                                <div class="fw-bold fs-4">₱${data.budget.toLocaleString()}</div>
+                                <small>Monthly Budget</small>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="col-md-4">
+                        <div class="card text-center bg-info">
+                            <div class="card-body">
+                                <div class="fw-bold fs-4" style="color: white;">₱${data.expenses.toLocaleString()}</div>
+                                <small style="color: rgba(255,255,255,0.9);">Total Expenses</small>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="col-md-4">
+                        <div class="card text-center bg-success">
+                            <div class="card-body">
+                                <div class="fw-bold fs-4" style="color: white;">₱${(data.budget - data.expenses).toLocaleString()}</div>
+                                <small style="color: rgba(255,255,255,0.9);">Remaining Balance</small>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            `;
+
+            if (data.transactions && data.transactions.length > 0) {
+                html += `
+                    <h6 class="mb-3">Transaction History</h6>
+                    <div class="list-group">
+                `;
+
+                data.transactions.forEach(transaction => {
+                    const amountClass = transaction.transaction_type === 'income' ? 'text-success' : 'text-danger';
+                    const badgeClass = transaction.transaction_type === 'income' ? 'bg-success' : '';
+                    const badgeStyle = transaction.transaction_type === 'income' ? '' : `style="background-color: ${themeColor}; color: white;"`;
+                    const paymentMethod = transaction.description && transaction.description.includes('GCash') ? 
+                        `<span class="badge ms-2" style="background-color: ${themeColor}; color: white;"><i class="fas fa-mobile-alt" style="color: white;"></i> GCash</span>` : 
+                        `<span class="badge ms-2" style="background-color: ${themeDarkColor}; color: white;"><i class="fas fa-money-bill" style="color: white;"></i> Cash</span>`;
+
+                    html += `
+                        <div class="list-group-item">
+                            <div class="d-flex justify-content-between align-items-center">
+                                <div class="flex-grow-1">
+                                    <h6 class="mb-1">${transaction.title}</h6>
+                                    <small class="text-muted">
+                                        <i class="fas fa-calendar"></i> ${formatDate(transaction.date)}
+                                        ${transaction.category_name ? `<i class="fas fa-tag ms-2"></i> ${transaction.category_name}` : ''}
+                                        ${paymentMethod}
+                                    </small>
+                                    ${transaction.description ? `<div class="mt-1"><small class="text-muted">${transaction.description}</small></div>` : ''}
+                                </div>
+                                <div class="text-end">
+                                    <span class="${amountClass} fw-bold">
+                                        ${transaction.transaction_type === 'income' ? '+' : '-'}₱${transaction.amount}
+                                    </span>
+                                    <br>
+                                    <span class="badge ${badgeClass}" ${badgeStyle || ''}>${transaction.transaction_type}</span>
+                                </div>
+                            </div>
+                        </div>
+                    `;
+                });
+
+                html += '</div>';
+            } else {
+                html += '<div class="text-center text-muted py-4">No transactions found for this month</div>';
+            }
+
+            content.innerHTML = html;
+        })
+        .catch(error => {
+            console.error('Error loading month details:', error);
+            content.innerHTML = '<div class="text-center text-danger">Error loading monthly details</div>';
+        });
+}
+
+// Function to view budget history for a month
+function viewBudgetHistory(monthKey) {
+    const modal = new bootstrap.Modal(document.getElementById('monthlyDetailsModal'));
+    modal.show();
+
+    // Show loading state
+    const content = document.getElementById('monthlyDetailsContent');
+    content.innerHTML = '<div class="text-center"><i class="fas fa-spinner fa-spin"></i> Loading budget history...</div>';
+
+    // Load budget history for the specific month
+    fetch(withDataVersion(`/month-transactions/${monthKey}/`))
+        .then(response => response.json())
+        .then(data => {
+            let html = `
+                <div class="d-flex justify-content-between align-items-center mb-3">
+                    <h5><i class="fas fa-wallet"></i> ${data.month_name} Budget History</h5>
+                </div>
+                <div class="row mb-3">
+                    <div class="col-md-12">
+                        <div class="card text-center" style="background: ${document.body.classList.contains('green-theme') ? 'linear-gradient(135deg, #2d8659, #1e7e5e)' : document.body.classList.contains('blue-theme') ? 'linear-gradient(135deg, #3182ce, #2b6cb0)' : 'linear-gradient(135deg, var(--primary-pink), var(--dark-pink))'}; color: white;">
+                            <div class="card-body">
+                                <div class="fw-bold fs-4">₱${data.budget.toLocaleString()}</div>
+                                <small>Total Monthly Budget</small>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            `;
+
+            if (data.budget_history && data.budget_history.length > 0) {
+                html += `
+                    <h6 class="mb-3"><i class="fas fa-history"></i> Budget Additions History</h6>
+                    <div class="list-group">
+                `;
+
+                data.budget_history.forEach((entry, index) => {
+                    html += `
+                        <div class="list-group-item">
+                            <div class="d-flex justify-content-between align-items-center">
+                                <div class="flex-grow-1">
+                                    <h6 class="mb-1">
+                                        <i class="fas fa-plus-circle"></i> Budget Addition #${data.budget_history.length - index}
+                                    </h6>
+                                    <small class="text-muted">
+                                        <i class="fas fa-calendar"></i> ${formatDate(entry.date)}
+                                    </small>
+                                    ${entry.notes && entry.notes !== 'No notes' ? `<div class="mt-1"><small class="text-muted"><i class="fas fa-sticky-note"></i> ${entry.notes}</small></div>` : ''}
+                                </div>
+                                <div class="text-end">
+                                    <span class="fw-bold fs-5" style="color: #38a169;">
+                                        +₱${parseFloat(entry.amount).toLocaleString()}
+                                    </span>
+                                </div>
+                            </div>
+                        </div>
+                    `;
+                });
+
+                html += '</div>';
+            } else {
+                html += '<div class="text-center text-muted py-4"><i class="fas fa-info-circle"></i> No budget history found for this month</div>';
+            }
+
+            content.innerHTML = html;
+        })
+        .catch(error => {
+            console.error('Error loading budget history:', error);
+            content.innerHTML = '<div class="text-center text-danger">Error loading budget history</div>';
+        });
+}
+
+// Function to view month transactions (compatible with transactions.html)
+function viewMonthTransactions(monthKey) {
+    const modal = new bootstrap.Modal(document.getElementById('monthlyDetailsModal'));
+    modal.show();
+
+    // Show loading state
+    const content = document.getElementById('monthlyDetailsContent');
+    content.innerHTML = '<div class="text-center"><i class="fas fa-spinner fa-spin"></i> Loading transactions...</div>';
+
+    // Load transactions for the specific month
+    fetch(withDataVersion(`/month-transactions/${monthKey}/`))
+        .then(response => response.json())
+        .then(data => {
+            const isGreenTheme = document.body.classList.contains('green-theme');
+            const isBlueTheme = document.body.classList.contains('blue-theme');
+            const themeColor = isGreenTheme ? '#2d8659' : isBlueTheme ? '#3182ce' : 'var(--primary-pink)';
+            const themeDarkColor = isGreenTheme ? '#1e7e5e' : isBlueTheme ? '#2b6cb0' : 'var(--dark-pink)';
+
+            let html = `
+                <div class="d-flex justify-content-between align-items-center mb-3">
+                    <h5>${data.month_name} Transactions</h5>
+
+                </div>
+                <div class="row mb-3">
+                    <div class="col-md-4">
+                        <div class="card text-center">
+                            <div class="card-body">
+                                <div class="fw-bold fs-4" style="color: ${themeColor};">₱${data.budget.toLocaleString()}</div>
+                                <small class="text-muted">Monthly Budget</small>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="col-md-4">
+                        <div class="card text-center">
+                            <div class="card-body">
+                                <div class="text-secondary fw-bold fs-4">₱${data.expenses.toLocaleString()}</div>
+                                <small class="text-muted">Total Expenses</small>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="col-md-4">
+                        <div class="card text-center">
+                            <div class="card-body">
+                                <div class="text-success fw-bold fs-4">₱${(data.budget - data.expenses).toLocaleString()}</div>
+                                <small class="text-muted">Remaining</small>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            `;
+
+            if (data.transactions && data.transactions.length > 0) {
+                html += '<div class="list-group">';
+                data.transactions.forEach(transaction => {
+                    const amountClass = transaction.transaction_type === 'income' ? 'text-success' : 'text-danger';
+                    const badgeClass = transaction.transaction_type === 'income' ? 'bg-success' : '';
+                    const badgeStyle = transaction.transaction_type === 'income' ? '' : `style="background-color: ${themeColor}; color: white;"`;
+                    const paymentMethod = transaction.description && transaction.description.includes('GCash') ? 
+                        `<span class="badge ms-2" style="background-color: ${themeColor}; color: white;"><i class="fas fa-mobile-alt" style="color: white;"></i> GCash</span>` : 
+                        `<span class="badge ms-2" style="background-color: ${themeDarkColor}; color: white;"><i class="fas fa-money-bill" style="color: white;"></i> Cash</span>`;
+
+                    html += `
+                        <div class="list-group-item">
+                            <div class="d-flex justify-content-between align-items-center">
+                                <div class="flex-grow-1">
+                                    <h6 class="mb-1">${transaction.title}</h6>
+                                    <small class="text-muted">
+                                        <i class="fas fa-calendar"></i> ${formatDate(transaction.date)}
+                                        ${transaction.category_name ? `<i class="fas fa-tag ms-2"></i> ${transaction.category_name}` : ''}
+                                        ${paymentMethod}
+                                    </small>
+                                    ${transaction.description ? `<div class="mt-1"><small class="text-muted">${transaction.description}</small></div>` : ''}
+                                </div>
+                                <div class="text-end">
+                                    <span class="${amountClass} fw-bold">
+                                        ${transaction.transaction_type === 'income' ? '+' : '-'}₱${transaction.amount}
+                                    </span>
+                                    <br>
+                                    <span class="badge ${badgeClass}" ${badgeStyle || ''}>${transaction.transaction_type}</span>
+                                </div>
+                            </div>
+                        </div>
+                    `;
+                });
+                html += '</div>';
+            } else {
+                html += '<div class="text-center text-muted py-4">No transactions found for this month</div>';
+            }
+
+            content.innerHTML = html;
+        })
+        .catch(error => {
+            console.error('Error loading month transactions:', error);
+            content.innerHTML = '<div class="text-center text-danger">Error loading transactions</div>';
+        });
+}
+
+// Toggle GCash-only fields per modal based on method selection
+document.addEventListener('change', function(e){
+    if (e.target && e.target.id && e.target.id.startsWith('id_payment_method_')) {
+        const select = e.target;
+        const categoryId = select.getAttribute('data-category');
+        const isGcash = select.value === 'gcash';
+        const gcashOnlyElems = document.querySelectorAll('.gcash-only-' + categoryId);
+        gcashOnlyElems.forEach(function(el){
+            if (isGcash) {
+                el.classList.remove('d-none');
+                const input = el.querySelector('input');
+                if (input) input.required = true;
+            } else {
+                el.classList.add('d-none');
+                const input = el.querySelector('input');
+                if (input) input.required = false;
+            }
+        });
+    }
+
+    // Handle payment type selection
+    if (e.target && e.target.id && e.target.id.startsWith('id_payment_type_')) {
+        const select = e.target;
+        const categoryId = select.getAttribute('data-category');
+        const amountField = document.getElementById('id_amount_paid_' + categoryId);
+        const categoryAmount = parseFloat(amountField.getAttribute('max'));
+
+        if (select.value === 'full') {
+            amountField.value = categoryAmount;
+            amountField.readOnly = true;
+        } else {
+            amountField.readOnly = false;
+            amountField.value = '';
+            amountField.focus();
+        }
+    }
+});
+
+// Delete category modal function
+function openDeleteModal(categoryId, categoryName) {
+    document.getElementById('categoryNameToDelete').textContent = categoryName;
+    document.getElementById('deleteCategoryForm').action = `/category/${categoryId}/delete/`;
+    const modal = new bootstrap.Modal(document.getElementById('deleteCategoryModal'));
+    modal.show();
+}
+
+function updateBillSelection() {
+    const count = document.querySelectorAll('.bill-select:checked').length;
+    document.getElementById('selectedBillCount').textContent = count;
+    document.getElementById('paySelectedBtn').classList.toggle('d-none', count === 0);
+}
+
+// Pay every selected bill in one request
+function paySelectedBills() {
+    const selected = Array.from(document.querySelectorAll('.bill-select:checked'));
+    if (selected.length === 0) return;
+    if (!confirm(`Mark ${selected.length} bill(s) as paid?`)) return;
+
+    const button = document.getElementById('paySelectedBtn');
+    button.disabled = true;
+    const formData = new FormData();
+    selected.forEach(checkbox => formData.append('category_ids', checkbox.value));
+
+    fetch('/pay-bills/', {
+        method: 'POST',
+        headers: {'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value},
+        body: formData
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                window.location.reload();
+            } else if (data.status === 'queued') {
+                // Offline: the service worker sends these bills later and
+                // reloads the page, so they can't be picked again until then
+                alert(data.message);
+                selected.forEach(checkbox => {
+                    checkbox.checked = false;
+                    checkbox.disabled = true;
+                });
+                button.disabled = false;
+                updateBillSelection();
+            } else {
+                alert(data.message);
+                button.disabled = false;
+            }
+        })
+        .catch(error => {
+            console.error('Error paying bills:', error);
+            alert('Could not pay the selected bills. Please try again.');
+            button.disabled = false;
+        });
+}
+
+function checkBeforeAddCategory() {
+    if (!selectedMonth) {
+        const modal = new bootstrap.Modal(document.getElementById('selectMonthModal'));
+        modal.show();
+        return;
+    }
+
+    const budgetAmount = document.getElementById('budgetAmount').textContent.replace('₱', '').replace(/,/g, '');
+    if (budgetAmount === '0' || budgetAmount === '') {
+        const modal = new bootstrap.Modal(document.getElementById('addBudgetModal'));
+        modal.show();
+        return;
+    }
+
+    const addCategoryModal = new bootstrap.Modal(document.getElementById('addCategoryModal'));
+    addCategoryModal.show();
+}
@@ -0,0 +1,249 @@
+// PayFlow service worker.
+//
+// Served at /sw.js by budget.views.service_worker, which puts SW_CONFIG in
+// front of this file: the version, the (hashed) app shell URLs, the pages
+// kept for offline use and the login URL.
+//
+// - The app shell (CSS, JS, icons, CDN files) is cached on install and
+//   served from the cache.
+// - The dashboard JSON (monthly overview, month transactions) is
+//   stale-while-revalidate. Its URLs carry the user's data version (?v=), so
+//   a copy cached at the same version is still current and is served without
+//   touching the network. After a change the new copy is fetched, and the stale
+//   one is served if that takes longer than NETWORK_TIMEOUT_MS or fails.
+// - Pages are network-first with the last copy as the offline fallback.
+// - Bills paid while offline (pay-bills) are queued in IndexedDB and replayed
+//   when the connection is back. pay-bills skips bills that are already paid,
+//   so a late replay can't pay a bill twice. Signing out drops the queue
+//   along with the cached pages and data.
+
+const SHELL_CACHE = `payflow-shell-${SW_CONFIG.version}`;
+const DATA_CACHE = 'payflow-data';
+const PAGE_CACHE = 'payflow-pages';
+const NETWORK_TIMEOUT_MS = 4000;
+const QUEUE_DB = 'payflow-offline';
+const QUEUE_STORE = 'requests';
+const REPLAY_TAG = 'payflow-replay';
+
+const DATA_PATHS = [/^\/monthly-overview\/$/, /^\/month-transactions\/[^/]+\/$/];
+const QUEUED_PATHS = [/^\/pay-bills\/$/];
+const SHELL_URLS = new Set(SW_CONFIG.shell.map(url => new URL(url, self.location.origin).href));
+const PAGE_URLS = new Set(SW_CONFIG.pages.map(url => new URL(url, self.location.origin).pathname));
+
+self.addEventListener('install', event => {
+    // One unreachable CDN file shouldn't stop the rest from being cached
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => Promise.all([...SHELL_URLS].map(url => cache.add(url).catch(() => null))))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key.startsWith('payflow-shell-') && key !== SHELL_CACHE).map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+            .then(() => replayQueue())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    const sameOrigin = url.origin === self.location.origin;
+
+    if (request.method === 'POST') {
+        if (sameOrigin && QUEUED_PATHS.some(path => path.test(url.pathname))) {
+            event.respondWith(sendOrQueue(request));
+        }
+        return;
+    }
+    if (request.method !== 'GET') return;
+
+    if (sameOrigin && DATA_PATHS.some(path => path.test(url.pathname))) {
+        event.respondWith(staleWhileRevalidate(event, request, url));
+    } else if (request.mode === 'navigate') {
+        event.respondWith(networkFirstPage(request));
+    } else if (
+        SHELL_URLS.has(url.href) ||
+        (sameOrigin && url.pathname.startsWith('/static/')) ||
+        (!sameOrigin && ['style', 'script', 'font'].includes(request.destination))
+    ) {
+        // Static and CDN URLs are versioned, so a cached copy never goes stale
+        event.respondWith(cacheFirst(request));
+    }
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag === REPLAY_TAG) {
+        // Rejecting makes the browser retry the sync later
+        event.waitUntil(replayQueue().then(remaining => {
+            if (remaining) throw new Error('Still offline');
+        }));
+    }
+});
+
+self.addEventListener('message', event => {
+    if (event.data === 'replay') event.waitUntil(replayQueue());
+});
+
+async function cacheFirst(request) {
+    const cached = await caches.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok || response.type === 'opaque') {
+        const cache = await caches.open(SHELL_CACHE);
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+function withoutVersion(url) {
+    const key = new URL(url);
+    key.searchParams.delete('v');
+    return key.href;
+}
+
+async function staleWhileRevalidate(event, request, url) {
+    const cache = await caches.open(DATA_CACHE);
+    const key = withoutVersion(url);
+    const version = url.searchParams.get('v') || '';
+    const cached = await cache.match(key);
+    if (cached && version && cached.headers.get('X-Data-Version') === version) {
+        return cached;
+    }
+
+    const network = fetch(request).then(async response => {
+        if (response.ok) {
+            // The stored copy is already decoded, and it records the data
+            // version it was fetched at
+            const headers = new Headers(response.headers);
+            headers.delete('Content-Encoding');
+            headers.delete('Content-Length');
+            headers.set('X-Data-Version', version);
+            const body = await response.clone().arrayBuffer();
+            await cache.put(key, new Response(body, {status: response.status, headers}));
+        }
+        return response;
+    });
+    if (!cached) return network;
+
+    // Keep the refresh going even if the stale copy answers first
+    event.waitUntil(network.catch(() => null));
+    const timeout = new Promise(resolve => setTimeout(() => resolve(cached), NETWORK_TIMEOUT_MS));
+    return Promise.race([network.catch(() => cached), timeout]);
+}
+
+async function networkFirstPage(request) {
+    try {
+        const response = await fetch(request);
+        const path = new URL(response.url).pathname;
+        if (path === new URL(SW_CONFIG.login, self.location.origin).pathname) {
+            // Signed out: don't leave this user's pages, data or unsent
+            // payments on the device, where the next user would replay them
+            await Promise.all([
+                caches.delete(PAGE_CACHE),
+                caches.delete(DATA_CACHE),
+                withQueue('readwrite', store => store.clear()).catch(() => null)
+            ]);
+        } else if (response.ok && !response.redirected && PAGE_URLS.has(path)) {
+            const cache = await caches.open(PAGE_CACHE);
+            await cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await caches.match(request, {cacheName: PAGE_CACHE});
+        if (cached) return cached;
+        const home = await caches.match(SW_CONFIG.pages[0], {cacheName: PAGE_CACHE});
+        return home || new Response(
+            '<!DOCTYPE html><meta name="viewport" content="width=device-width, initial-scale=1">' +
+            '<title>PayFlow - Offline</title><p style="font-family: sans-serif; padding: 2rem">' +
+            'You are offline. Reconnect and try again.</p>',
+            {status: 503, headers: {'Content-Type': 'text/html; charset=utf-8'}}
+        );
+    }
+}
+
+// Offline payment queue
+
+function openQueue() {
+    return new Promise((resolve, reject) => {
+        const open = indexedDB.open(QUEUE_DB, 1);
+        open.onupgradeneeded = () => open.result.createObjectStore(QUEUE_STORE, {keyPath: 'id', autoIncrement: true});
+        open.onsuccess = () => resolve(open.result);
+        open.onerror = () => reject(open.error);
+    });
+}
+
+async function withQueue(mode, run) {
+    const db = await openQueue();
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction(QUEUE_STORE, mode);
+        const request = run(transaction.objectStore(QUEUE_STORE));
+        transaction.oncomplete = () => resolve(request.result);
+        transaction.onerror = () => reject(transaction.error);
+    });
+}
+
+async function sendOrQueue(request) {
+    const copy = request.clone();
+    try {
+        return await fetch(request);
+    } catch (error) {
+        // The CSRF header and the multipart boundary travel with the request
+        const item = {url: copy.url, headers: [...copy.headers], body: await copy.arrayBuffer(), queuedAt: Date.now()};
+        await withQueue('readwrite', store => store.add(item));
+        if (self.registration.sync) {
+            self.registration.sync.register(REPLAY_TAG).catch(() => null);
+        }
+        return new Response(JSON.stringify({
+            status: 'queued',
+            message: "You're offline. The payment will be sent when you're back online."
+        }), {status: 202, headers: {'Content-Type': 'application/json'}});
+    }
+}
+
+let replaying = null;
+
+// Send queued payments in order; resolves to the number still queued
+function replayQueue() {
+    if (!replaying) {
+        replaying = replayQueued().finally(() => { replaying = null; });
+    }
+    return replaying;
+}
+
+async function replayQueued() {
+    const items = await withQueue('readonly', store => store.getAll());
+    const results = [];
+    let sent = 0;
+    for (const item of items) {
+        let response;
+        try {
+            response = await fetch(item.url, {
+                method: 'POST',
+                headers: item.headers,
+                body: item.body,
+                credentials: 'same-origin'
+            });
+        } catch (error) {
+            break;
+        }
+        sent += 1;
+        await withQueue('readwrite', store => store.delete(item.id));
+        // A redirect means the session ended (to the login page)
+        const data = response.ok && !response.redirected ? await response.json().catch(() => null) : null;
+        results.push({
+            ok: Boolean(data && data.status === 'success'),
+            message: data && data.message ? data.message : 'A payment made while offline could not be sent. Please try again.'
+        });
+    }
+    if (results.length) {
+        const clients = await self.clients.matchAll({type: 'window'});
+        clients.forEach(client => client.postMessage({type: 'payflow:replayed', results}));
+    }
+    return items.length - sent;
+}